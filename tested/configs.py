@@ -9,11 +9,16 @@ from attrs import define, evolve, field
 
 from tested.parsing import fallback_field, get_converter
 from tested.testsuite import ExecutionMode, Suite, SupportedLanguage
-from tested.utils import get_identifier, smart_close
+from tested.utils import MemoCache, ResourceCache, get_identifier, smart_close
 
 # Prevent circular imports
 if TYPE_CHECKING:
     from tested.languages import Language
+    from tested.serialisation import Value
+
+# The structural hashes of expected values, by the id of the value. The values are
+# kept with their hash, so their id cannot be reused.
+ValueHashes = dict[int, tuple["Value", int | None]]
 
 _logger = logging.getLogger(__name__)
 
@@ -64,6 +69,40 @@ class Options:
     Longer exercises, or exercises where the solution might depend on optimization
     may need this option.
     """
+    readable_limit: int | None = None
+    """
+    The maximal length of the values that are shown in the feedback (approximately,
+    in characters). Larger values are truncated between their elements, which is
+    marked with "...". By default, values are shown in full.
+    """
+    parallel_oracles: bool = False
+    """
+    Evaluate the oracles in a pool of processes, so CPU-heavy oracles (such as
+    programmed oracles or comparisons of large values) use multiple cores. This is
+    only used if the contexts are also executed in parallel (see ``parallel``).
+    """
+    deterministic: bool = True
+    """
+    If the outcome of the judgement only depends on the submission. Set this to
+    False if it also depends on other things, such as randomness or timing. In that
+    case, judgements are never replayed from the replay cache.
+    """
+    stream_contexts: bool = False
+    """
+    Report the feedback of a context as soon as it is completed, while the rest of
+    its execution unit is still running. This is only used if the units are
+    executed sequentially, for units with multiple contexts. The output of the
+    submission is then followed while it is running, and processes started by the
+    submission are stopped together with it.
+    """
+    single_process: bool = False
+    """
+    Execute all units in one process, for languages that support it (Java, Kotlin,
+    runhaskell and Bash). This avoids starting the runtime (or loading the
+    submission) for each unit. For Java and Kotlin, the units are executed in the working
+    directory of the judgement, so exercises checking files written by the
+    submission should not enable this.
+    """
 
 
 @fallback_field(get_converter(), {"testplan": "test_suite", "plan_name": "test_suite"})
@@ -83,6 +122,26 @@ class DodonaConfig:
     options: Options = Options()
     output_limit: int = 10240 * 1024  # Default value for backward compatibility.
     timing_statistics: bool = False
+    # The directory of the replay cache, or None to disable the cache.
+    replay_cache: Path | None = None
+    # The maximal number of rendered statements kept during a judgement (no maximum
+    # if None).
+    render_cache_size: int | None = None
+    # The directory of the class-data sharing archives for the JVM (used for Java
+    # and Kotlin), or None to not use them.
+    jvm_cache: Path | None = None
+    # The directory of the compiled harness modules for Haskell, which are shared
+    # by all judgements, or None to use the prepared harness (see tested.prepare),
+    # or to compile them with each submission without one. Submissions are only
+    # linked dynamically if the harness could be compiled for it.
+    ghc_cache: Path | None = None
+    # The directory of the compiled harness files for C, which are shared by all
+    # judgements, or None to use the prepared harness (see tested.prepare), or to
+    # compile them with each submission without one.
+    gcc_cache: Path | None = None
+    # The directory of the prepared harnesses (see tested.prepare), or None to use
+    # the evaluation folder of the exercise.
+    harness_cache: Path | None = None
 
     # Sometimes, we need to offset the source code.
     source_offset: int = 0
@@ -128,6 +187,9 @@ class Bundle:
     language: "Language"
     global_config: GlobalConfig
     out: IO
+    render_cache: MemoCache = field(factory=MemoCache)
+    resource_cache: ResourceCache = field(factory=ResourceCache)
+    value_hashes: ValueHashes = field(factory=dict)
 
     @property
     def config(self) -> DodonaConfig:
@@ -206,6 +268,8 @@ def create_bundle(
     output: IO,
     suite: Suite,
     language: str | None = None,
+    resource_cache: ResourceCache | None = None,
+    value_hashes: ValueHashes | None = None,
 ) -> Bundle:
     """
     Create a configuration bundle.
@@ -215,6 +279,11 @@ def create_bundle(
     :param suite: The test suite.
     :param language: Optional programming language. If None, the one from the Dodona
                      configuration will be used.
+    :param resource_cache: Optional cache for the resource files, to share it
+                           between judgements. By default, a new cache is used.
+    :param value_hashes: Optional hashes of the expected values in the test suite
+                         (see tested.oracles.value.hash_expected_values), to share
+                         them between judgements of the same test suite.
 
     :return: The configuration bundle.
     """
@@ -231,4 +300,11 @@ def create_bundle(
         suite=suite,
     )
     lang_config = langs.get_language(global_config, language)
-    return Bundle(language=lang_config, global_config=global_config, out=output)
+    return Bundle(
+        language=lang_config,
+        global_config=global_config,
+        out=output,
+        render_cache=MemoCache(adjusted_config.render_cache_size),
+        resource_cache=resource_cache or ResourceCache(),
+        value_hashes=value_hashes if value_hashes is not None else dict(),
+    )
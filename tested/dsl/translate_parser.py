@@ -61,6 +61,8 @@ from tested.testsuite import (
     Testcase,
     TextData,
     TextOutputChannel,
+    TimeMeasure,
+    TimeOutputChannel,
     ValueOutputChannel,
 )
 from tested.utils import get_args
@@ -412,6 +414,20 @@ def _convert_advanced_value_output_channel(stream: YamlObject) -> ValueOutputCha
         return ValueOutputChannel(value=yaml_value)
 
 
+def _convert_time_output_channel(stream: YamlObject) -> TimeOutputChannel:
+    if isinstance(stream, (int, float)):
+        return TimeOutputChannel(budget=float(stream))
+    assert isinstance(stream, dict)
+    budget = stream["budget"]
+    tolerance = stream.get("tolerance", 0)
+    assert isinstance(budget, (int, float)) and isinstance(tolerance, (int, float))
+    return TimeOutputChannel(
+        budget=float(budget),
+        tolerance=float(tolerance),
+        measure=TimeMeasure(stream.get("measure", TimeMeasure.WALL)),
+    )
+
+
 def _validate_testcase_combinations(testcase: YamlDict):
     if ("stdin" in testcase or "arguments" in testcase) and (
         "statement" in testcase or "expression" in testcase
@@ -487,6 +503,8 @@ def _convert_testcase(testcase: YamlDict, context: DslContext) -> Testcase:
     if (result := testcase.get("return")) is not None:
         assert not return_channel
         output.result = _convert_advanced_value_output_channel(result)
+    if (time := testcase.get("time")) is not None:
+        output.time = _convert_time_output_channel(time)
 
     if (description := testcase.get("description")) is not None:
         if isinstance(description, str):
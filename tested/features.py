@@ -42,6 +42,9 @@ class Construct(StrEnum):
     # Global variables
     GLOBAL_VARIABLES = "global_variables"
 
+    # The harness can measure the time needed for each testcase.
+    TIMING = "timing"
+
 
 @define
 class FeatureSet:
@@ -1,11 +1,16 @@
+import itertools
 import logging
 import shutil
 import time
-from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
 
+from attrs import evolve
+
 from tested.configs import Bundle
 from tested.dodona import (
+    AppendMessage,
     CloseContext,
     CloseJudgement,
     CloseTab,
@@ -17,17 +22,19 @@ from tested.dodona import (
     StatusMessage,
     report_update,
 )
-from tested.features import is_supported
+from tested.features import Construct, is_supported
 from tested.internationalization import get_i18n_string, set_locale
 from tested.judge.collector import OutputManager
 from tested.judge.compilation import precompile
 from tested.judge.evaluation import evaluate_context_results, terminate
 from tested.judge.execution import (
+    ContextResult,
     ExecutionResult,
     compile_unit,
     execute_unit,
     set_up_unit,
 )
+from tested.judge.harness import generate_harness, load_harness
 from tested.judge.linter import run_linter
 from tested.judge.planning import (
     CompilationResult,
@@ -37,13 +44,23 @@ from tested.judge.planning import (
     PlanStrategy,
     plan_test_suite,
 )
+from tested.judge.pool import (
+    EvaluatedContext,
+    OraclePool,
+    failed_context,
+    replay_updates,
+)
+from tested.judge.replay import (
+    RecordingOutput,
+    judgement_key,
+    replay_judgement,
+    store_judgement,
+)
+from tested.judge.runner import create_unit_runner
 from tested.judge.utils import copy_from_paths_to_path
+from tested.languages import LANGUAGES
 from tested.languages.conventionalize import submission_file
-from tested.languages.generation import (
-    generate_execution,
-    generate_selector,
-    generate_statement,
-)
+from tested.languages.generation import generate_suite_statement
 from tested.serialisation import Statement
 from tested.testsuite import LanguageLiterals, MainInput, TextData
 
@@ -91,13 +108,58 @@ def judge(bundle: Bundle):
        b. Execute the unit.
        c. Process the results.
 
+    If the replay cache is enabled, the judgement of an identical submission is
+    replayed instead, see tested.judge.replay.
+
     :param bundle: The configuration bundle.
     """
+    key = judgement_key(bundle)
+    if key is None:
+        _judge(bundle)
+    elif not replay_judgement(bundle, key):
+        recording = RecordingOutput(bundle.out)
+        _judge(evolve(bundle, out=recording))
+        store_judgement(bundle, key, recording.recorded.getvalue())
+
+    cache = bundle.render_cache
+    _logger.info(
+        f"Render cache: {cache.hits} hits, {cache.misses} misses "
+        f"(hit rate {cache.hit_rate():.0%})"
+    )
+
+
+def _unsupported_messages(bundle: Bundle) -> list[str]:
+    """
+    Explain why the test suite is not supported in the programming language, if
+    the reason is a feature that only some languages have.
+    """
+    required = bundle.suite.get_used_features().constructs
+    if (
+        Construct.TIMING not in required
+        or Construct.TIMING in bundle.language.supported_constructs()
+    ):
+        return []
+    languages = sorted(
+        name
+        for name, language in LANGUAGES.items()
+        if Construct.TIMING in language(None).supported_constructs()
+    )
+    message = get_i18n_string(
+        "judge.core.unsupported.timing",
+        lang=bundle.config.programming_language,
+        languages=", ".join(languages),
+    )
+    return [message]
+
+
+def _judge(bundle: Bundle):
     # Begin by checking if the given test suite is executable in this language.
     _logger.info("Checking supported features...")
     set_locale(bundle.config.natural_language)
     if not is_supported(bundle.language):
         report_update(bundle.out, StartJudgement())
+        for message in _unsupported_messages(bundle):
+            report_update(bundle.out, AppendMessage(message=message))
         report_update(
             bundle.out,
             CloseJudgement(
@@ -158,19 +220,56 @@ def judge(bundle: Bundle):
 
     _logger.info("Starting execution")
 
+    plan.runner = create_unit_runner(bundle)
+    try:
+        if bundle.config.options.parallel:
+            result_status = _execute_in_parallel(
+                bundle, plan, compilation_results, collector
+            )
+        else:
+            result_status = _execute_sequentially(
+                bundle, plan, compilation_results, collector
+            )
+    finally:
+        if plan.runner is not None:
+            plan.runner.close()
+    if result_status is not None:
+        terminate(bundle, collector, result_status)
+        return
+
+    # Close the last tab.
+    terminate(bundle, collector, Status.CORRECT)
+
+
+# The statuses that stop the judgement.
+_FATAL_STATUSES = (
+    Status.TIME_LIMIT_EXCEEDED,
+    Status.MEMORY_LIMIT_EXCEEDED,
+    Status.OUTPUT_LIMIT_EXCEEDED,
+)
+
+
+def _execute_in_parallel(
+    bundle: Bundle,
+    plan: ExecutionPlan,
+    compilation_results: CompilationResult | None,
+    collector: OutputManager,
+) -> Status | None:
+    """
+    Execute all units concurrently, processing the results of each unit in order.
+
+    :return: The status that stopped the judgement, if any.
+    """
+
     def _process_one_unit(
         index: int,
     ) -> tuple[CompilationResult, ExecutionResult | None, Path]:
         return _execute_one_unit(bundle, plan, compilation_results, index)
 
-    if bundle.config.options.parallel:
-        max_workers = None
-    else:
-        max_workers = 1
-
-    _logger.debug(f"Executing with {max_workers} workers")
+    if bundle.config.options.parallel_oracles:
+        return _execute_with_oracle_pool(bundle, plan, _process_one_unit, collector)
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    with ThreadPoolExecutor() as executor:
         remaining_time = plan.remaining_time()
         results = executor.map(
             _process_one_unit, range(len(plan.units)), timeout=remaining_time
@@ -194,20 +293,163 @@ def judge(bundle: Bundle):
                     currently_open_tab=currently_open_tab,
                 )
 
-                if result_status in (
-                    Status.TIME_LIMIT_EXCEEDED,
-                    Status.MEMORY_LIMIT_EXCEEDED,
-                    Status.OUTPUT_LIMIT_EXCEEDED,
-                ):
+                if result_status in _FATAL_STATUSES:
                     del results
-                    terminate(bundle, collector, result_status)
-                    return
+                    return result_status
         except TimeoutError:
-            terminate(bundle, collector, Status.TIME_LIMIT_EXCEEDED)
-            return
+            return Status.TIME_LIMIT_EXCEEDED
+    return None
 
-    # Close the last tab.
-    terminate(bundle, collector, Status.CORRECT)
+
+def _execute_with_oracle_pool(
+    bundle: Bundle,
+    plan: ExecutionPlan,
+    process_one_unit: Callable[
+        [int], tuple[CompilationResult, ExecutionResult | None, Path]
+    ],
+    collector: OutputManager,
+) -> Status | None:
+    """
+    Execute all units concurrently, and evaluate their contexts in a pool of
+    processes (see tested.judge.pool). The contexts of a unit are sent to the pool
+    as soon as the unit is executed. The feedback of a unit is reported as soon as
+    its contexts are evaluated and the previous units are reported, so it is
+    reported in the order of the test suite.
+
+    :return: The status that stopped the judgement, if any.
+    """
+    units = plan.units
+    submitted: dict[
+        int, tuple[CompilationResult, ExecutionResult | None, Path, list[Future]]
+    ] = dict()
+    currently_open_tab = -1
+
+    def report(index: int) -> Status | None:
+        nonlocal currently_open_tab
+        _logger.debug(f"Processing results for execution unit {index}")
+        compilation, execution_result, execution_dir, evaluations = submitted[index]
+        result_status, currently_open_tab = _process_results(
+            bundle=bundle,
+            unit=units[index],
+            execution_result=execution_result,
+            execution_dir=execution_dir,
+            compilation_results=compilation,
+            collector=collector,
+            currently_open_tab=currently_open_tab,
+            evaluations=evaluations,
+        )
+        return result_status
+
+    with ThreadPoolExecutor() as executor, OraclePool(bundle) as oracles:
+        executions = [executor.submit(process_one_unit, i) for i in range(len(units))]
+        reported = 0
+        while reported < len(units):
+            # Send the units that are executed to the oracles.
+            for i, execution in enumerate(executions):
+                if i not in submitted and execution.done():
+                    compilation, execution_result, execution_dir = execution.result()
+                    evaluations = oracles.submit_unit(
+                        units[i], execution_result, compilation, execution_dir
+                    )
+                    submitted[i] = (
+                        compilation,
+                        execution_result,
+                        execution_dir,
+                        evaluations,
+                    )
+
+            # Report the next unit if its contexts are evaluated.
+            pending = []
+            if reported in submitted:
+                pending = [f for f in submitted[reported][3] if not f.done()]
+                if not pending:
+                    result_status = report(reported)
+                    if result_status in _FATAL_STATUSES:
+                        return result_status
+                    reported += 1
+                    continue
+
+            # Wait until a unit is executed or a context is evaluated.
+            running = [e for e in executions if not e.done()]
+            timeout = plan.remaining_time() if running else None
+            done, _ = wait(running + pending, timeout, FIRST_COMPLETED)
+            if not done:
+                break
+
+        if reported == len(units):
+            return None
+
+        # Report the units that were executed in time.
+        while reported in submitted:
+            result_status = report(reported)
+            if result_status in _FATAL_STATUSES:
+                return result_status
+            reported += 1
+        for execution in executions:
+            execution.cancel()
+    return Status.TIME_LIMIT_EXCEEDED
+
+
+def _execute_sequentially(
+    bundle: Bundle,
+    plan: ExecutionPlan,
+    compilation_results: CompilationResult | None,
+    collector: OutputManager,
+) -> Status | None:
+    """
+    Execute the units one after the other.
+
+    If enabled (see Options.stream_contexts), the feedback of a context is reported
+    as soon as the context is completed, while the rest of the unit is still
+    executing (see ContextStream). If a later context of the unit exceeds the time
+    limit, the completed contexts are still reported as usual.
+
+    :return: The status that stopped the judgement, if any.
+    """
+    currently_open_tab = -1
+    for i, planned_unit in enumerate(plan.units):
+        if plan.remaining_time() <= 0:
+            return Status.TIME_LIMIT_EXCEEDED
+        reported = 0
+
+        def report_context(
+            context_result: ContextResult,
+            execution_dir: Path,
+            local_compilation_results: CompilationResult,
+        ):
+            nonlocal currently_open_tab, reported
+            _logger.debug(f"Processing streamed results for context {reported}")
+            _, currently_open_tab = _process_context(
+                bundle=bundle,
+                collector=collector,
+                planned=planned_unit.contexts[reported],
+                context_result=context_result,
+                execution_dir=execution_dir,
+                compilation_results=local_compilation_results,
+                currently_open_tab=currently_open_tab,
+            )
+            reported += 1
+
+        stream = (
+            bundle.config.options.stream_contexts and len(planned_unit.contexts) > 1
+        )
+        local_compilation_results, execution_result, execution_dir = _execute_one_unit(
+            bundle, plan, compilation_results, i, report_context if stream else None
+        )
+        _logger.debug(f"Processing results for execution unit {i}")
+        result_status, currently_open_tab = _process_results(
+            bundle=bundle,
+            unit=planned_unit,
+            execution_result=execution_result,
+            execution_dir=execution_dir,
+            compilation_results=local_compilation_results,
+            collector=collector,
+            currently_open_tab=currently_open_tab,
+            reported=reported,
+        )
+        if result_status in _FATAL_STATUSES:
+            return result_status
+    return None
 
 
 def _execute_one_unit(
@@ -215,6 +457,9 @@ def _execute_one_unit(
     plan: ExecutionPlan,
     compilation_results: CompilationResult | None,
     index: int,
+    on_context: (
+        Callable[[ContextResult, Path, CompilationResult], None] | None
+    ) = None,
 ) -> tuple[CompilationResult, ExecutionResult | None, Path]:
     planned_unit = plan.units[index]
     # Prepare the unit.
@@ -231,8 +476,22 @@ def _execute_one_unit(
     # Execute the unit.
     if local_compilation_results.status == Status.CORRECT:
         remaining_time = plan.remaining_time()
+        if on_context is not None:
+            compilation = local_compilation_results
+
+            def report_context(context_result: ContextResult):
+                on_context(context_result, execution_dir, compilation)
+
+        else:
+            report_context = None
         execution_result, status = execute_unit(
-            bundle, planned_unit, execution_dir, dependencies, remaining_time
+            bundle,
+            planned_unit,
+            execution_dir,
+            dependencies,
+            remaining_time,
+            report_context,
+            plan.runner,
         )
         local_compilation_results.status = status
     else:
@@ -267,32 +526,20 @@ def _generate_files(
     # Allow modifications of the submission file.
     bundle.language.modify_solution(solution_path)
 
-    # The names of the executions for the test suite.
-    execution_names = []
-    # Generate the files for each execution.
-    for execution_unit in execution_plan:
-        _logger.debug(f"Generating file for execution {execution_unit.name}")
-        generated, evaluators = generate_execution(
-            bundle=bundle, destination=common_dir, execution_unit=execution_unit
-        )
+    # Use the prepared harness if there is one, otherwise generate it.
+    harness = load_harness(bundle, common_dir, execution_plan)
+    if harness is None:
+        harness = generate_harness(bundle, common_dir, execution_plan)
 
-        # Copy functions to the directory.
-        for evaluator in evaluators:
+    # Copy functions to the directory.
+    for unit in harness.units:
+        for evaluator in unit.evaluators:
             source = Path(bundle.config.resources) / evaluator
             _logger.debug(f"Copying oracle from {source} to {common_dir}")
             shutil.copy2(source, common_dir)
 
-        dependencies.extend(evaluators)
-        dependencies.append(generated)
-        execution_names.append(execution_unit.name)
-
-    if bundle.language.needs_selector():
-        _logger.debug("Generating selector.")
-        generated = generate_selector(bundle, common_dir, execution_names)
-        dependencies.append(generated)
-    else:
-        generated = None
-    return common_dir, dependencies, generated
+    dependencies.extend(harness.files())
+    return common_dir, dependencies, harness.selector
 
 
 def _process_results(
@@ -303,25 +550,75 @@ def _process_results(
     execution_result: ExecutionResult | None,
     execution_dir: Path,
     currently_open_tab: int,
+    reported: int = 0,
+    evaluations: list[Future[EvaluatedContext]] | None = None,
 ) -> tuple[Status | None, int]:
+    """
+    Report the feedback for the contexts of an execution unit.
+
+    :param reported: The number of contexts that were already reported while the
+                     unit was executing.
+    :param evaluations: The contexts evaluated by the oracle pool, if it is used.
+    """
     if execution_result:
         context_results = execution_result.to_context_results()
     else:
         context_results = [None] * len(unit.contexts)
 
-    for planned, context_result in zip(unit.contexts, context_results):
-        planned: PlannedContext
-        if currently_open_tab < planned.tab_index:
-            # Close the previous tab if necessary.
-            if collector.open_stack[-1] == "tab":
-                collector.add(CloseTab(), currently_open_tab)
-            currently_open_tab = currently_open_tab + 1
-            tab = bundle.suite.tabs[currently_open_tab]
-            collector.add(StartTab(title=tab.name, hidden=tab.hidden))
+    for index, (planned, context_result) in itertools.islice(
+        enumerate(zip(unit.contexts, context_results)), reported, None
+    ):
+        continue_, currently_open_tab = _process_context(
+            bundle=bundle,
+            collector=collector,
+            planned=planned,
+            context_result=context_result,
+            execution_dir=execution_dir,
+            compilation_results=compilation_results,
+            currently_open_tab=currently_open_tab,
+            evaluated=(
+                _evaluated_context(bundle, planned, evaluations[index])
+                if evaluations
+                else None
+            ),
+        )
+        if continue_ in (Status.TIME_LIMIT_EXCEEDED, Status.MEMORY_LIMIT_EXCEEDED):
+            return continue_, currently_open_tab
+
+    return None, currently_open_tab
 
-        # Handle the contexts.
-        collector.add(StartContext(description=planned.context.description))
 
+def _evaluated_context(
+    bundle: Bundle, planned: PlannedContext, evaluation: Future[EvaluatedContext]
+) -> EvaluatedContext:
+    try:
+        return evaluation.result()
+    except Exception as e:
+        return failed_context(bundle, planned.context, e)
+
+
+def _process_context(
+    bundle: Bundle,
+    collector: OutputManager,
+    planned: PlannedContext,
+    context_result: ContextResult | None,
+    execution_dir: Path,
+    compilation_results: CompilationResult,
+    currently_open_tab: int,
+    evaluated: EvaluatedContext | None = None,
+) -> tuple[Status | None, int]:
+    if currently_open_tab < planned.tab_index:
+        # Close the previous tab if necessary.
+        if collector.open_stack[-1] == "tab":
+            collector.add(CloseTab(), currently_open_tab)
+        currently_open_tab = currently_open_tab + 1
+        tab = bundle.suite.tabs[currently_open_tab]
+        collector.add(StartTab(title=tab.name, hidden=tab.hidden))
+
+    # Handle the contexts.
+    collector.add(StartContext(description=planned.context.description))
+
+    if evaluated is None:
         continue_ = evaluate_context_results(
             bundle,
             context=planned.context,
@@ -330,48 +627,48 @@ def _process_results(
             collector=collector,
             compilation_results=compilation_results,
         )
-
-        if bundle.language.supports_debug_information():
-            # TODO: this is currently very Python-specific
-            # See if we need a callback to the language modules in the future.
-            # TODO: we could probably re-use the "readable_input" function here,
-            #       since it only differs a bit.
-            meta_statements = []
-            meta_stdin = None
-            for case in planned.context.testcases:
-                if case.is_main_testcase():
-                    assert isinstance(case.input, MainInput)
-                    if isinstance(case.input.stdin, TextData):
-                        meta_stdin = case.input.stdin.get_data_as_string(
-                            bundle.config.resources
-                        )
-                elif isinstance(case.input, Statement):
-                    stmt = generate_statement(bundle, case.input)
-                    meta_statements.append(stmt)
-                elif isinstance(case.input, LanguageLiterals):
-                    stmt = case.input.get_for(bundle.config.programming_language)
-                    meta_statements.append(stmt)
-                else:
-                    raise AssertionError(f"Found unknown case input type: {case.input}")
-
-            if meta_statements:
-                meta_statements = "\n".join(meta_statements)
-            else:
-                # Don't add empty statements
-                meta_statements = None
-
-            collector.add(
-                CloseContext(
-                    data=Metadata(
-                        statements=meta_statements,
-                        stdin=meta_stdin,
+    else:
+        continue_, _ = evaluated
+        replay_updates(collector, evaluated)
+
+    if bundle.language.supports_debug_information():
+        # TODO: this is currently very Python-specific
+        # See if we need a callback to the language modules in the future.
+        # TODO: we could probably re-use the "readable_input" function here,
+        #       since it only differs a bit.
+        meta_statements = []
+        meta_stdin = None
+        for case in planned.context.testcases:
+            if case.is_main_testcase():
+                assert isinstance(case.input, MainInput)
+                if isinstance(case.input.stdin, TextData):
+                    meta_stdin = case.input.stdin.get_data_as_string(
+                        bundle.config.resources, bundle.resource_cache
                     )
-                ),
-                planned.context_index,
-            )
-        else:
-            collector.add(CloseContext(), planned.context_index)
-        if continue_ in (Status.TIME_LIMIT_EXCEEDED, Status.MEMORY_LIMIT_EXCEEDED):
-            return continue_, currently_open_tab
+            elif isinstance(case.input, Statement):
+                stmt = generate_suite_statement(bundle, case.input)
+                meta_statements.append(stmt)
+            elif isinstance(case.input, LanguageLiterals):
+                stmt = case.input.get_for(bundle.config.programming_language)
+                meta_statements.append(stmt)
+            else:
+                raise AssertionError(f"Found unknown case input type: {case.input}")
 
-    return None, currently_open_tab
+        if meta_statements:
+            meta_statements = "\n".join(meta_statements)
+        else:
+            # Don't add empty statements
+            meta_statements = None
+
+        collector.add(
+            CloseContext(
+                data=Metadata(
+                    statements=meta_statements,
+                    stdin=meta_stdin,
+                )
+            ),
+            planned.context_index,
+        )
+    else:
+        collector.add(CloseContext(), planned.context_index)
+    return continue_, currently_open_tab
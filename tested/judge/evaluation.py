@@ -34,6 +34,7 @@ from tested.languages.generation import (
 )
 from tested.oracles import get_oracle
 from tested.oracles.common import OracleResult
+from tested.oracles.timing import readable_limit
 from tested.testsuite import (
     Context,
     EmptyChannel,
@@ -49,6 +50,8 @@ from tested.testsuite import (
     Testcase,
     TextOutput,
     TextOutputChannel,
+    TimeOutput,
+    TimeOutputChannel,
     ValueOutput,
     ValueOutputChannel,
 )
@@ -69,6 +72,7 @@ class Channel(StrEnum):
     STDERR = "stderr"
     EXIT = "exit code"
     RETURN = "return"
+    TIME = "time"
 
 
 def _evaluate_channel(
@@ -314,6 +318,16 @@ def evaluate_context_results(
             timeout=exec_results.timeout and len(values) == i + 1,
             memory=exec_results.memory and len(values) == i + 1,
         )
+        missing_time = _evaluate_channel(
+            bundle,
+            context_dir,
+            t_col,
+            Channel.TIME,
+            output.time,
+            exec_results.timings.get(i),
+            timeout=exec_results.timeout and i not in exec_results.timings,
+            memory=exec_results.memory and i not in exec_results.timings,
+        )
 
         # If this is the last testcase, do the exit channel.
         if i == len(context.testcases) - 1:
@@ -342,6 +356,7 @@ def evaluate_context_results(
                 or missing_stdout
                 or missing_return
                 or missing_exit
+                or missing_time
             ):
                 t_col.add(
                     AppendMessage(message=get_i18n_string("judge.evaluation.missing"))
@@ -418,6 +433,9 @@ def should_show(
     elif channel == Channel.EXCEPTION:
         assert isinstance(test, ExceptionOutput)
         return not isinstance(test, SpecialOutputChannel)
+    elif channel == Channel.TIME:
+        assert isinstance(test, TimeOutput)
+        return not isinstance(test, IgnoredChannel)
     else:
         raise AssertionError(f"Unknown channel {channel}")
 
@@ -436,9 +454,9 @@ def guess_expected_value(bundle: Bundle, test: OutputChannel) -> str:
     if isinstance(test, SpecialOutputChannel):
         return ""
     elif isinstance(test, TextOutputChannel):
-        return test.get_data_as_string(bundle.config.resources)
+        return test.get_data_as_string(bundle.config.resources, bundle.resource_cache)
     elif isinstance(test, FileOutputChannel):
-        return test.get_data_as_string(bundle.config.resources)
+        return test.get_data_as_string(bundle.config.resources, bundle.resource_cache)
     elif isinstance(test, ExceptionOutputChannel):
         return (
             test.exception.readable(bundle.config.programming_language)
@@ -453,6 +471,8 @@ def guess_expected_value(bundle: Bundle, test: OutputChannel) -> str:
         )
     elif isinstance(test, ExitCodeOutputChannel):
         return str(test.value)
+    elif isinstance(test, TimeOutputChannel):
+        return readable_limit(test)
     _logger.warning(f"Unknown output type {test}")
     return ""
 
@@ -513,6 +533,7 @@ def complete_evaluation(bundle: Bundle, collector: OutputManager):
                 _add_channel(bundle, output.file, Channel.FILE, updates)
                 _add_channel(bundle, output.exception, Channel.EXCEPTION, updates)
                 _add_channel(bundle, output.result, Channel.RETURN, updates)
+                _add_channel(bundle, output.time, Channel.TIME, updates)
 
                 # If last testcase, do exit code.
                 if j == len(tab.contexts) - 1:
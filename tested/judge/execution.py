@@ -1,22 +1,36 @@
 import itertools
 import logging
 import shutil
+import time
+from collections import deque
+from collections.abc import Callable
 from pathlib import Path
 
-from attrs import define
+from attrs import define, field
 
 from tested.configs import Bundle
 from tested.dodona import Status
 from tested.judge.compilation import process_compile_results, run_compilation
 from tested.judge.planning import CompilationResult, ExecutionPlan, PlannedExecutionUnit
+from tested.judge.runner import UnitRunner, runner_files
 from tested.judge.utils import (
     BaseExecutionResult,
+    FileFollower,
     copy_workdir_files,
     filter_files,
     run_command,
+    stream_command,
 )
 from tested.languages.conventionalize import selector_name
-from tested.languages.preparation import exception_file, value_file
+from tested.languages.preparation import (
+    context_separator,
+    exception_file,
+    secret_environment,
+    testcase_separator,
+    timing_file,
+    value_file,
+)
+from tested.testsuite import IgnoredChannel
 from tested.utils import safe_del
 
 _logger = logging.getLogger(__name__)
@@ -35,6 +49,26 @@ class ContextResult(BaseExecutionResult):
     separator: str
     results: str
     exceptions: str
+    timings: dict[int, str] = field(factory=dict)
+    """The measured times ("wall cpu", in seconds), by index of the testcase."""
+
+
+def split_timings(timings: str) -> dict[int, dict[int, str]]:
+    """
+    Split the contents of the timing file by context and testcase.
+
+    :param timings: The complete lines of the timing file.
+    :return: The measured times ("wall cpu"), by index of the context and index of
+             the testcase.
+    """
+    result: dict[int, dict[int, str]] = dict()
+    for line in timings.splitlines():
+        parts = line.split(" ", maxsplit=2)
+        if len(parts) != 3 or not parts[0].isdigit() or not parts[1].isdigit():
+            _logger.warning(f"Ignoring invalid timing {line!r}")
+            continue
+        result.setdefault(int(parts[0]), dict())[int(parts[1])] = parts[2]
+    return result
 
 
 @define
@@ -51,6 +85,7 @@ class ExecutionResult(BaseExecutionResult):
     testcase_separator: str
     results: str
     exceptions: str
+    timings: str = ""
 
     def to_context_results(
         self,
@@ -68,6 +103,7 @@ class ExecutionResult(BaseExecutionResult):
         safe_del(results, 0, lambda e: e == "")
 
         size = max(len(results), len(exceptions), len(stderr), len(stdout))
+        timings = split_timings(self.timings)
 
         if size == 0:
             return [
@@ -80,6 +116,7 @@ class ExecutionResult(BaseExecutionResult):
                     memory=self.memory,
                     separator=self.testcase_separator,
                     results="",
+                    timings=timings.get(0, dict()),
                 )
             ]
 
@@ -97,12 +134,146 @@ class ExecutionResult(BaseExecutionResult):
                     stderr=err or "",
                     timeout=self.timeout and index == size - 1,
                     memory=self.memory and index == size - 1,
+                    timings=timings.get(index, dict()),
                 )
             )
 
         return context_execution_results
 
 
+class _StreamedChannel:
+    """
+    The output of one channel of a running execution, and the positions of the
+    context separators in that output. Only the output of the contexts that were
+    not requested yet is kept.
+    """
+
+    def __init__(self, separator: str):
+        self.separator = separator
+        self.length = 0
+        self.positions: list[int] = []
+        self._chunks: deque[str] = deque()
+        # The position of the first chunk that is kept.
+        self._start = 0
+        # The end of the output, in case a separator is split over two chunks.
+        self._tail = ""
+
+    def append(self, text: str):
+        if not text:
+            return
+        window = self._tail + text
+        offset = self.length - len(self._tail)
+        start = 0
+        while (found := window.find(self.separator, start)) != -1:
+            self.positions.append(offset + found)
+            start = found + len(self.separator)
+        self._chunks.append(text)
+        self.length += len(text)
+        self._tail = window[max(start, len(window) - len(self.separator) + 1) :]
+
+    def context(self, index: int) -> str:
+        """
+        Get the output of a completed context. The contexts must be requested in
+        order, since the output before the context is discarded.
+        """
+        begin = self.positions[index] + len(self.separator)
+        end = self.positions[index + 1]
+        while self._chunks and self._start + len(self._chunks[0]) <= begin:
+            self._start += len(self._chunks.popleft())
+        parts = []
+        offset = self._start
+        for chunk in self._chunks:
+            if offset >= end:
+                break
+            parts.append(chunk[max(begin - offset, 0) : end - offset])
+            offset += len(chunk)
+        return "".join(parts)
+
+
+class ContextStream:
+    """
+    Detects the contexts that are completed while an execution unit is running.
+
+    A context is completed once the separator of the next context is present in
+    all output channels. The result of a completed context is the same as the one
+    from ExecutionResult.to_context_results, except for the exit code, which is
+    not known yet. Contexts checking the exit code and the last context of a unit
+    are therefore never streamed, nor are the contexts after them.
+    """
+
+    def __init__(
+        self,
+        bundle: Bundle,
+        unit: PlannedExecutionUnit,
+        execution_dir: Path,
+        on_context: Callable[[ContextResult], None],
+    ):
+        separator = context_separator(bundle)
+        self.testcase_separator = testcase_separator(bundle)
+        self.on_context = on_context
+        self.reported = 0
+        self.stopped = False
+        self.stdout = _StreamedChannel(separator)
+        self.stderr = _StreamedChannel(separator)
+        self.values = _StreamedChannel(separator)
+        self.exceptions = _StreamedChannel(separator)
+        self._value_file = FileFollower(value_file(bundle, execution_dir))
+        self._exception_file = FileFollower(exception_file(bundle, execution_dir))
+        self._timing_file = FileFollower(timing_file(bundle, execution_dir))
+        self._timings = ""
+        self.streamable = 0
+        for planned in unit.contexts[:-1]:
+            if planned.context.testcases[-1].output.exit_code != IgnoredChannel.IGNORED:
+                break
+            self.streamable += 1
+
+    def __call__(self, stdout: str, stderr: str):
+        if self.stopped:
+            return
+        self.stdout.append(stdout)
+        self.stderr.append(stderr)
+        try:
+            self.values.append(self._value_file.read_new())
+            self.exceptions.append(self._exception_file.read_new())
+            # The timings of a context are written before its end, so this is
+            # read last.
+            self._timings += self._timing_file.read_new()
+        except UnicodeDecodeError:
+            self.stopped = True
+            return
+
+        channels = (self.values, self.exceptions, self.stderr, self.stdout)
+        for channel in channels:
+            if channel.length >= len(channel.separator) and (
+                not channel.positions or channel.positions[0] != 0
+            ):
+                # There is output before the first context, so the contexts would
+                # not line up with the ones from ExecutionResult.to_context_results.
+                self.stopped = True
+                return
+
+        completed = min(len(channel.positions) for channel in channels) - 1
+        if self.reported < min(completed, self.streamable):
+            complete_lines = self._timings[: self._timings.rfind("\n") + 1]
+            timings = split_timings(complete_lines)
+        while self.reported < min(completed, self.streamable):
+            index = self.reported
+            self.reported += 1
+            self.on_context(
+                ContextResult(
+                    separator=self.testcase_separator,
+                    exit=0,
+                    results=self.values.context(index),
+                    exceptions=self.exceptions.context(index),
+                    stdout=self.stdout.context(index),
+                    stderr=self.stderr.context(index),
+                    timeout=False,
+                    memory=False,
+                    timings=timings.get(index, dict()),
+                )
+            )
+
+
 def execute_file(
     bundle: Bundle,
     executable_name: str,
@@ -110,6 +281,7 @@ def execute_file(
     remaining: float | None,
     stdin: str | None = None,
     argument: str | None = None,
+    on_output: Callable[[str, str], None] | None = None,
 ) -> BaseExecutionResult:
     """
     Execute a file.
@@ -124,6 +296,8 @@ def execute_file(
     :param executable_name: The executable that should be executed. This file
                             will not be present in the dependency list.
     :param remaining: The max amount of time.
+    :param on_output: Optional callback receiving the output while the file is
+                      executing, see stream_command.
 
     :return: The result of the execution.
     """
@@ -136,7 +310,15 @@ def execute_file(
     )
     _logger.debug(f"Executing {command} in directory {working_directory}")
 
-    result = run_command(working_directory, remaining, command, stdin)
+    environment = bundle.language.secret_variables(
+        working_directory, secret_environment(bundle, working_directory)
+    )
+    if on_output is None:
+        result = run_command(working_directory, remaining, command, stdin, environment)
+    else:
+        result = stream_command(
+            working_directory, remaining, command, on_output, stdin, environment
+        )
 
     assert result is not None
     return result
@@ -208,6 +390,8 @@ def execute_unit(
     execution_dir: Path,
     dependencies: list[Path],
     remaining_time: float,
+    on_context: Callable[[ContextResult], None] | None = None,
+    runner: UnitRunner | None = None,
 ) -> tuple[ExecutionResult | None, Status]:
     """
     Execute a unit.
@@ -220,6 +404,12 @@ def execute_unit(
     :param execution_dir: The directory in which we execute.
     :param dependencies: The dependencies.
     :param remaining_time: The remaining time for this execution.
+    :param on_context: Optional callback receiving the results of the contexts
+                       that are completed while the unit is still running (see
+                       ContextStream), in order. The returned result still
+                       contains all contexts.
+    :param runner: Optional runner that executes the unit instead of a new process
+                   (see tested.judge.runner).
     """
     _logger.info(f"Executing unit {unit.name}")
 
@@ -239,23 +429,57 @@ def execute_unit(
         return None, status
 
     files.remove(executable)
-    stdin = unit.get_stdin(bundle.config.resources)
+    stdin = unit.get_stdin(bundle.config.resources, bundle.resource_cache)
 
-    # Do the execution.
-    base_result = execute_file(
-        bundle,
-        executable_name=executable.name,
-        working_directory=execution_dir,
-        stdin=stdin,
-        argument=argument,
-        remaining=remaining_time,
+    stream = (
+        ContextStream(bundle, unit, execution_dir, on_context)
+        if on_context is not None
+        else None
     )
 
-    testcase_identifier = f"--{bundle.testcase_separator_secret}-- SEP"
-    context_identifier = f"--{bundle.context_separator_secret}-- SEP"
+    # Do the execution.
+    base_result = None
+    if runner is not None:
+        start = time.perf_counter()
+        base_result = runner.execute(
+            execution_dir,
+            Path(executable.name).stem,
+            argument,
+            stdin,
+            remaining_time,
+            stream,
+        )
+        if base_result is None:
+            # Start over, without reporting the contexts that were reported.
+            for file in (
+                value_file(bundle, execution_dir),
+                exception_file(bundle, execution_dir),
+                *runner_files(bundle, execution_dir),
+            ):
+                file.unlink(missing_ok=True)
+            if stream is not None:
+                reported = stream.reported
+                stream = ContextStream(bundle, unit, execution_dir, on_context)
+                stream.reported = reported
+            remaining_time -= time.perf_counter() - start
+    if base_result is None:
+        base_result = execute_file(
+            bundle,
+            executable_name=executable.name,
+            working_directory=execution_dir,
+            stdin=stdin,
+            argument=argument,
+            remaining=remaining_time,
+            on_output=stream,
+        )
+
+    testcase_identifier = testcase_separator(bundle)
+    context_identifier = context_separator(bundle)
 
     values = _get_contents_or_empty(value_file(bundle, execution_dir))
     exceptions = _get_contents_or_empty(exception_file(bundle, execution_dir))
+    timing_path = timing_file(bundle, execution_dir)
+    timings = timing_path.read_text() if timing_path.exists() else ""
 
     result = ExecutionResult(
         stdout=base_result.stdout,
@@ -265,6 +489,7 @@ def execute_unit(
         testcase_separator=testcase_identifier,
         results=values,
         exceptions=exceptions,
+        timings=timings,
         timeout=base_result.timeout,
         memory=base_result.memory,
     )
@@ -0,0 +1,203 @@
+"""
+Generation of the test harness, and support for harnesses that were generated
+ahead of time.
+
+The harness is the generated code for each execution unit, together with the
+selector (if the language needs one). Since the generated code does not depend
+on the secrets of a judgement, the harness can be generated once when an exercise
+is published (see tested.prepare). It is then stored next to the test suite, and
+reused for each submission.
+"""
+import functools
+import hashlib
+import logging
+import shutil
+from pathlib import Path
+
+from attrs import define, field
+
+from tested.configs import Bundle
+from tested.judge.planning import PlannedExecutionUnit
+from tested.languages.generation import generate_execution, generate_selector
+from tested.languages.utils import HARNESS_FOLDER
+from tested.parsing import get_converter
+
+_logger = logging.getLogger(__name__)
+
+# The name of the file describing a prepared harness.
+MANIFEST_FILE = "manifest.json"
+
+
+@define
+class HarnessUnit:
+    """The generated files for one execution unit."""
+
+    name: str
+    file: str
+    evaluators: list[str] = field(factory=list)
+
+
+@define
+class Harness:
+    """
+    The generated files for all execution units of a test suite.
+
+    The version and suite attributes are only used for prepared harnesses: they
+    identify the version of TESTed and the test suite for which the harness was
+    generated. A harness is only reused if both match.
+    """
+
+    units: list[HarnessUnit]
+    selector: str | None = None
+    version: str = ""
+    suite: str = ""
+
+    def files(self) -> list[str]:
+        """
+        :return: The generated files, in the order they must be used as dependencies.
+        """
+        result = []
+        for unit in self.units:
+            result.extend(unit.evaluators)
+            result.append(unit.file)
+        if self.selector:
+            result.append(self.selector)
+        return result
+
+
+@functools.cache
+def judge_version() -> str:
+    """
+    Get an identifier for the version of TESTed that is running. This is a hash
+    of the source code and templates, which guarantees that a prepared harness
+    is regenerated when TESTed is updated.
+    """
+    package = Path(__file__).parent.parent
+    digest = hashlib.sha256()
+    for path in sorted(package.rglob("*")):
+        if path.is_file() and "__pycache__" not in path.parts:
+            digest.update(str(path.relative_to(package)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def suite_hash(bundle: Bundle) -> str:
+    """
+    Get a hash of the test suite in the bundle.
+    """
+    serialised = get_converter().dumps(bundle.suite)
+    return hashlib.sha256(serialised.encode()).hexdigest()
+
+
+def harness_directory(bundle: Bundle) -> Path:
+    """
+    Get the directory in which the prepared harness for the programming language
+    of the bundle is stored.
+    """
+    if bundle.config.harness_cache is not None:
+        folder = Path(bundle.config.harness_cache)
+    else:
+        folder = Path(bundle.config.resources) / HARNESS_FOLDER
+    return folder / bundle.config.programming_language
+
+
+def generate_harness(
+    bundle: Bundle, destination: Path, execution_plan: list[PlannedExecutionUnit]
+) -> Harness:
+    """
+    Generate the code for each execution unit and the selector if needed.
+
+    :param bundle: The configuration bundle.
+    :param destination: The directory where the generated files should go.
+    :param execution_plan: The execution units to generate.
+
+    :return: A description of the generated files.
+    """
+    units = []
+    for execution_unit in execution_plan:
+        _logger.debug(f"Generating file for execution {execution_unit.name}")
+        generated, evaluators = generate_execution(
+            bundle=bundle, destination=destination, execution_unit=execution_unit
+        )
+        units.append(
+            HarnessUnit(name=execution_unit.name, file=generated, evaluators=evaluators)
+        )
+
+    if bundle.language.needs_selector():
+        _logger.debug("Generating selector.")
+        names = [unit.name for unit in units]
+        selector = generate_selector(bundle, destination, names)
+    else:
+        selector = None
+    return Harness(units=units, selector=selector)
+
+
+def save_harness(bundle: Bundle, harness: Harness, source: Path) -> Path:
+    """
+    Store a generated harness as a prepared harness for the exercise.
+
+    :param bundle: The configuration bundle.
+    :param harness: The generated harness.
+    :param source: The directory containing the generated files.
+
+    :return: The directory containing the prepared harness.
+    """
+    destination = harness_directory(bundle)
+    if destination.exists():
+        shutil.rmtree(destination)
+    destination.mkdir(parents=True)
+
+    for unit in harness.units:
+        shutil.copy2(source / unit.file, destination)
+    if harness.selector:
+        shutil.copy2(source / harness.selector, destination)
+
+    harness.version = judge_version()
+    harness.suite = suite_hash(bundle)
+    with open(destination / MANIFEST_FILE, "w") as manifest:
+        manifest.write(get_converter().dumps(harness))
+    return destination
+
+
+def load_harness(
+    bundle: Bundle, destination: Path, execution_plan: list[PlannedExecutionUnit]
+) -> Harness | None:
+    """
+    Copy a prepared harness to the destination, if a usable one is available.
+
+    A prepared harness is usable if it was generated by the same version of TESTed,
+    for the same test suite and the same execution units. It is never used if the
+    generated code depends on the submission.
+
+    :param bundle: The configuration bundle.
+    :param destination: The directory where the generated files should go.
+    :param execution_plan: The execution units that will be executed.
+
+    :return: The prepared harness, or None if there is no usable one.
+    """
+    if bundle.language.generation_uses_submission():
+        return None
+
+    directory = harness_directory(bundle)
+    try:
+        with open(directory / MANIFEST_FILE, "r") as manifest:
+            harness = get_converter().loads(manifest.read(), Harness)
+    except FileNotFoundError:
+        return None
+
+    if harness.version != judge_version():
+        _logger.warning("Ignoring prepared harness from another version of TESTed.")
+        return None
+    if harness.suite != suite_hash(bundle):
+        _logger.warning("Ignoring prepared harness for another test suite.")
+        return None
+    if [u.name for u in harness.units] != [u.name for u in execution_plan]:
+        _logger.warning("Ignoring prepared harness for other execution units.")
+        return None
+
+    _logger.debug(f"Using prepared harness from {directory}")
+    for unit in harness.units:
+        shutil.copy2(directory / unit.file, destination)
+    if harness.selector:
+        shutil.copy2(directory / harness.selector, destination)
+    return harness
@@ -4,7 +4,7 @@ This module decides what and when things are executed.
 import time
 from enum import Enum, auto
 from pathlib import Path
-from typing import cast
+from typing import TYPE_CHECKING, cast
 
 from attrs import define, field
 
@@ -13,6 +13,10 @@ from tested.dodona import AnnotateCode, Message, Status
 from tested.languages.config import FileFilter
 from tested.languages.conventionalize import execution_name
 from tested.testsuite import Context, EmptyChannel, MainInput
+from tested.utils import ResourceCache
+
+if TYPE_CHECKING:
+    from tested.judge.runner import UnitRunner
 
 
 @define
@@ -45,8 +49,8 @@ class PlannedExecutionUnit:
     # Which position in the execution plan this execution has.
     index: int
 
-    def get_stdin(self, resources: Path) -> str:
-        potential = [c.context.get_stdin(resources) for c in self.contexts]
+    def get_stdin(self, resources: Path, cache: ResourceCache | None = None) -> str:
+        potential = [c.context.get_stdin(resources, cache) for c in self.contexts]
         return "".join(p for p in potential if p)
 
     def has_main_testcase(self) -> bool:
@@ -68,6 +72,7 @@ class ExecutionPlan:
 
     # Stuff that is set after the plan has been made.
     files: list[str] | FileFilter  # The files we need for execution.
+    runner: "UnitRunner | None" = None  # Executes the units, if enabled.
 
     def remaining_time(self) -> float:
         return self.max_time - (time.perf_counter() - self.start_time)
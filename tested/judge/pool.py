@@ -0,0 +1,193 @@
+"""
+Evaluation of the oracles in a pool of processes.
+
+Normally, the results of each context are evaluated in the main process. With the
+option ``parallel_oracles``, each context is sent to a worker process instead. The
+worker records the updates it would report, which are then reported by the main
+process in the order of the test suite.
+
+The workers are not forked from the main process, which has threads executing the
+units, but started by a fork server (or spawned, if that is not available).
+"""
+import io
+import logging
+import multiprocessing
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+
+from tested.configs import Bundle, GlobalConfig
+from tested.dodona import (
+    AppendMessage,
+    CloseTestcase,
+    EscalateStatus,
+    ExtendedMessage,
+    Permission,
+    StartTestcase,
+    Status,
+    StatusMessage,
+    Update,
+)
+from tested.internationalization import get_i18n_string, set_locale
+from tested.judge.collector import OutputManager
+from tested.judge.evaluation import evaluate_context_results
+from tested.judge.execution import ContextResult, ExecutionResult
+from tested.judge.planning import CompilationResult, PlannedExecutionUnit
+from tested.languages.generation import attempt_readable_input
+from tested.testsuite import Context
+
+_logger = logging.getLogger(__name__)
+
+# The bundle of the worker process.
+_bundle: Bundle | None = None
+
+# The status of a context and the updates to report for it.
+EvaluatedContext = tuple[Status | None, list[tuple[Update, int | None]]]
+
+
+class UpdateRecorder(OutputManager):
+    """
+    Records the updates instead of reporting them, so they can be reported later.
+    """
+
+    __slots__ = ["updates"]
+
+    def __init__(self):
+        super().__init__(io.StringIO())
+        self.updates: list[tuple[Update, int | None]] = []
+
+    def add(self, command: Update, index: int | None = None):
+        self.updates.append((command, index))
+
+
+def replay_updates(collector: OutputManager, evaluated: EvaluatedContext):
+    """
+    Report the recorded updates of a context.
+
+    :param collector: Where the updates are reported.
+    :param evaluated: The evaluated context.
+    """
+    _, updates = evaluated
+    for command, index in updates:
+        collector.add(command, index)
+
+
+def failed_context(
+    bundle: Bundle, context: Context, error: BaseException
+) -> EvaluatedContext:
+    """
+    Get the updates to report for a context that could not be evaluated, e.g.
+    because an oracle crashed or the worker stopped.
+
+    :param bundle: The configuration bundle.
+    :param context: The context that was not evaluated.
+    :param error: The reason.
+    """
+    _logger.error("Could not evaluate context", exc_info=error)
+    recorder = UpdateRecorder()
+    recorder.add(StartTestcase(description=attempt_readable_input(bundle, context)))
+    recorder.add(
+        AppendMessage(
+            message=ExtendedMessage(
+                description="".join(traceback.format_exception(error)),
+                format="code",
+                permission=Permission.STAFF,
+            )
+        )
+    )
+    recorder.add(
+        EscalateStatus(
+            status=StatusMessage(
+                enum=Status.INTERNAL_ERROR,
+                human=get_i18n_string("judge.programmed.student"),
+            )
+        )
+    )
+    recorder.add(CloseTestcase(accepted=False), 0)
+    return Status.INTERNAL_ERROR, recorder.updates
+
+
+def _initialise_worker(global_config: GlobalConfig):
+    import tested.languages as langs
+
+    global _bundle
+    language = langs.get_language(
+        global_config, global_config.dodona.programming_language
+    )
+    _bundle = Bundle(language=language, global_config=global_config, out=io.StringIO())
+    set_locale(global_config.dodona.natural_language)
+
+
+def _evaluate_context(
+    tab_index: int,
+    context_index: int,
+    context_result: ContextResult | None,
+    compilation_results: CompilationResult,
+    context_dir: Path,
+) -> EvaluatedContext:
+    assert _bundle is not None, "Worker was not initialised."
+    context = _bundle.suite.tabs[tab_index].contexts[context_index]
+    recorder = UpdateRecorder()
+    status = evaluate_context_results(
+        _bundle,
+        context=context,
+        exec_results=context_result,
+        compilation_results=compilation_results,
+        context_dir=context_dir,
+        collector=recorder,
+    )
+    return status, recorder.updates
+
+
+class OraclePool:
+    """
+    A pool of processes to evaluate the results of contexts.
+    """
+
+    def __init__(self, bundle: Bundle, workers: int | None = None):
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("forkserver")
+        else:
+            context = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_initialise_worker,
+            initargs=(bundle.global_config,),
+        )
+
+    def __enter__(self) -> "OraclePool":
+        return self
+
+    def __exit__(self, *args):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def submit_unit(
+        self,
+        unit: PlannedExecutionUnit,
+        execution_result: ExecutionResult | None,
+        compilation_results: CompilationResult,
+        execution_dir: Path,
+    ) -> list[Future[EvaluatedContext]]:
+        """
+        Start evaluating the contexts of an execution unit.
+
+        :return: The evaluated contexts, in the order of the contexts in the unit.
+                 Contexts without results are not included.
+        """
+        if execution_result:
+            context_results = execution_result.to_context_results()
+        else:
+            context_results = [None] * len(unit.contexts)
+        _logger.debug(f"Submitting the contexts of unit {unit.name}")
+        return [
+            self._executor.submit(
+                _evaluate_context,
+                planned.tab_index,
+                planned.context_index,
+                context_result,
+                compilation_results,
+                execution_dir,
+            )
+            for planned, context_result in zip(unit.contexts, context_results)
+        ]
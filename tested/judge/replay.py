@@ -0,0 +1,183 @@
+"""
+A cache of judgements, to replay the judgement of identical submissions.
+
+If the submission, the test suite, the resources, the programming language (and
+the version of its compiler or interpreter), the options and TESTed itself are all
+the same, the output of a judgement will be the same. This is common: students
+often resubmit the same code. With the cache enabled (see
+DodonaConfig.replay_cache), the output of a judgement is stored, and replayed for
+the next identical submission, without compiling or executing anything.
+
+Judgements are not stored if their outcome might depend on timing (e.g. a time
+limit was exceeded or the test suite measures the time of testcases), or if the
+exercise is marked as non-deterministic (see Options.deterministic).
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from typing import IO
+
+from tested.configs import Bundle
+from tested.dodona import Status
+from tested.features import Construct
+from tested.judge.harness import HARNESS_FOLDER, judge_version, suite_hash
+from tested.parsing import get_converter
+
+_logger = logging.getLogger(__name__)
+
+# Judgements with these statuses depend on the load of the machine.
+_TIMING_DEPENDENT = {
+    Status.TIME_LIMIT_EXCEEDED,
+    Status.MEMORY_LIMIT_EXCEEDED,
+    Status.INTERNAL_ERROR,
+}
+
+
+class RecordingOutput:
+    """
+    Passes everything written to it to the actual output, while keeping a copy.
+    """
+
+    __slots__ = ["out", "recorded"]
+
+    def __init__(self, out: IO):
+        self.out = out
+        self.recorded = StringIO()
+
+    def write(self, text: str) -> int:
+        self.recorded.write(text)
+        return self.out.write(text)
+
+    def flush(self):
+        self.out.flush()
+
+
+def _resources_hash(resources: Path) -> str:
+    # The size and modification time identify the version of a file, so the files
+    # are not read for each judgement.
+    digest = hashlib.sha256()
+    for path in sorted(resources.rglob("*")):
+        relative = path.relative_to(resources)
+        if relative.parts[0] == HARNESS_FOLDER or not path.is_file():
+            continue
+        status = path.stat()
+        digest.update(f"{relative}:{status.st_size}:{status.st_mtime_ns}\0".encode())
+    return digest.hexdigest()
+
+
+def _toolchain_version(bundle: Bundle) -> str:
+    parts = []
+    for name in bundle.language.toolchain():
+        executable = shutil.which(name)
+        if executable is None:
+            parts.append(f"{name}:missing")
+        else:
+            # Installing another version changes the file or its target.
+            path = os.path.realpath(executable)
+            status = os.stat(path)
+            parts.append(f"{path}:{status.st_size}:{status.st_mtime_ns}")
+    return "\0".join(parts)
+
+
+def judgement_key(bundle: Bundle) -> str | None:
+    """
+    Get the key of the judgement in the replay cache.
+
+    :param bundle: The configuration bundle.
+    :return: The key, or None if the judgement should not use the cache.
+    """
+    config = bundle.config
+    if (
+        config.replay_cache is None
+        or not config.options.deterministic
+        or config.timing_statistics
+        or Construct.TIMING in bundle.suite.get_used_features().constructs
+    ):
+        return None
+
+    digest = hashlib.sha256()
+    parts = [
+        judge_version(),
+        _toolchain_version(bundle),
+        suite_hash(bundle),
+        _resources_hash(Path(config.resources)),
+        config.programming_language,
+        config.natural_language,
+        get_converter().dumps(config.options),
+        str(config.time_limit),
+        str(config.memory_limit),
+        str(config.output_limit),
+    ]
+    for part in parts:
+        digest.update(part.encode())
+        digest.update(b"\0")
+    try:
+        digest.update(Path(config.source).read_bytes())
+    except OSError:
+        # Without a submission, there is nothing to replay.
+        return None
+    return digest.hexdigest()
+
+
+def _cache_file(bundle: Bundle, key: str) -> Path:
+    assert bundle.config.replay_cache is not None
+    return Path(bundle.config.replay_cache) / key[:2] / f"{key}.json"
+
+
+def replay_judgement(bundle: Bundle, key: str) -> bool:
+    """
+    Write a cached judgement to the output, if there is one.
+
+    :param bundle: The configuration bundle.
+    :param key: The key of the judgement.
+    :return: True if the judgement was replayed.
+    """
+    try:
+        with open(_cache_file(bundle, key), "r") as cached:
+            output = cached.read()
+    except FileNotFoundError:
+        return False
+    _logger.info(f"Replaying cached judgement {key}")
+    bundle.out.write(output)
+    return True
+
+
+def _is_replayable(output: str) -> bool:
+    decoder = json.JSONDecoder()
+    index = 0
+    while True:
+        while index < len(output) and output[index].isspace():
+            index += 1
+        if index == len(output):
+            return True
+        update, index = decoder.raw_decode(output, index)
+        status = update.get("status")
+        if status is not None and status["enum"] in _TIMING_DEPENDENT:
+            return False
+
+
+def store_judgement(bundle: Bundle, key: str, output: str):
+    """
+    Store the output of a judgement in the cache, unless it should not be replayed.
+
+    :param bundle: The configuration bundle.
+    :param key: The key of the judgement.
+    :param output: The output of the judgement.
+    """
+    if not _is_replayable(output):
+        _logger.info("Not caching judgement that depends on timing.")
+        return
+    destination = _cache_file(bundle, key)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary file first, so concurrent judgements never read a
+    # partially written judgement.
+    with tempfile.NamedTemporaryFile(
+        "w", dir=destination.parent, delete=False
+    ) as temporary:
+        temporary.write(output)
+    os.replace(temporary.name, destination)
@@ -0,0 +1,228 @@
+"""
+Execute the units of a judgement in one long-running process.
+
+Starting a new process for each execution unit is expensive for languages with a
+heavy runtime, such as the JVM. If enabled (see Options.single_process), languages
+that support it (see Language.unit_runner) start one process for the judgement,
+which executes the units one after the other on request.
+
+The runner reads the requests from stdin, one field per line: the directory of the
+unit, the main class, the argument (or an empty line), the file with stdin (or an
+empty line), the files for stdout and stderr, the timeout in milliseconds, the
+number of variables and the variables themselves (as NAME=VALUE). The generated
+code reads these variables instead of the environment variables with the same
+name. After the unit is executed, the runner replies with one line: the exit code
+of the unit or "timeout".
+
+The runner is started in the working directory of the judgement. Runners that
+cannot change their working directory (such as the JVM) execute the units there,
+instead of in the directory of the unit.
+
+If the runner stops while executing a unit (e.g. because the submission exits the
+process), the unit is executed again in its own process, as are all later units.
+"""
+import logging
+import os
+import queue
+import signal
+import subprocess
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from tested.configs import Bundle
+from tested.judge.utils import BaseExecutionResult, FileFollower
+from tested.languages.config import Command
+from tested.languages.preparation import (
+    EXCEPTION_FILE_VARIABLE,
+    TIMING_FILE_VARIABLE,
+    VALUE_FILE_VARIABLE,
+    secret_environment,
+)
+
+_logger = logging.getLogger(__name__)
+
+# How much longer than the timeout of a unit the runner gets to reply, in seconds.
+_GRACE = 2.0
+
+
+def runner_files(bundle: Bundle, directory: Path) -> tuple[Path, Path, Path]:
+    """
+    Get the files of a unit for stdin, stdout and stderr.
+    """
+    secret = bundle.testcase_separator_secret
+    return (
+        directory / f"{secret}_stdin.txt",
+        directory / f"{secret}_stdout.txt",
+        directory / f"{secret}_stderr.txt",
+    )
+
+
+class UnitRunner:
+    """
+    A process executing the units of a judgement. The process is started when the
+    first unit is executed. Units are executed one at a time, also if the units
+    are executed in parallel.
+    """
+
+    def __init__(self, bundle: Bundle, command: Command):
+        self.bundle = bundle
+        self.command = command
+        self.stopped = False
+        self._process: subprocess.Popen | None = None
+        self._replies: queue.Queue[str | None] = queue.Queue()
+        self._lock = threading.Lock()
+
+    def _start(self) -> subprocess.Popen:
+        if self._process is None:
+            _logger.debug(f"Starting unit runner {self.command}")
+            self._process = subprocess.Popen(
+                self.command,
+                cwd=self.bundle.config.workdir,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding="utf-8",
+                # The runner might start other processes, which are also stopped.
+                start_new_session=True,
+            )
+            threading.Thread(
+                target=self._read_replies, args=(self._process,), daemon=True
+            ).start()
+        return self._process
+
+    def _read_replies(self, process: subprocess.Popen):
+        assert process.stdout is not None
+        for line in process.stdout:
+            self._replies.put(line.strip())
+        self._replies.put(None)
+
+    def _stop(self):
+        self.stopped = True
+        if self._process is not None:
+            try:
+                os.killpg(self._process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            self._process.wait()
+
+    def execute(
+        self,
+        directory: Path,
+        main_class: str,
+        argument: str | None,
+        stdin: str | None,
+        remaining: float,
+        on_output: Callable[[str, str], None] | None = None,
+        interval: float = 0.05,
+    ) -> BaseExecutionResult | None:
+        """
+        Execute a unit in the runner.
+
+        :param directory: The directory of the unit, containing its classes.
+        :param main_class: The class that is executed.
+        :param argument: Optional argument for the main class.
+        :param stdin: Optional stdin for the unit.
+        :param remaining: The max amount of time.
+        :param on_output: Optional callback receiving the output while the unit is
+                          executing, like in stream_command.
+        :param interval: How often the output is reported, in seconds.
+
+        :return: The result of the execution, or None if the runner stopped before
+                 the unit was completed. The unit should then be executed in its own
+                 process.
+        """
+        with self._lock:
+            if self.stopped:
+                return None
+            stdin_file, stdout_file, stderr_file = runner_files(self.bundle, directory)
+            if stdin is not None:
+                stdin_file.write_text(stdin)
+            stdout_file.touch()
+            stderr_file.touch()
+            variables = secret_environment(self.bundle, directory)
+            for name in (VALUE_FILE_VARIABLE, EXCEPTION_FILE_VARIABLE):
+                variables[name] = str(directory.resolve() / variables[name])
+            variables.pop(TIMING_FILE_VARIABLE)
+            variables = self.bundle.language.secret_variables(directory, variables)
+            request = [
+                str(directory.resolve()),
+                main_class,
+                argument or "",
+                str(stdin_file.resolve()) if stdin is not None else "",
+                str(stdout_file.resolve()),
+                str(stderr_file.resolve()),
+                str(max(int(remaining * 1000), 1)),
+                str(len(variables)),
+                *(f"{name}={value}" for name, value in variables.items()),
+            ]
+
+            process = self._start()
+            assert process.stdin is not None
+            try:
+                process.stdin.write("\n".join(request) + "\n")
+                process.stdin.flush()
+            except BrokenPipeError:
+                _logger.warning("Unit runner stopped, using a process per unit.")
+                self._stop()
+                return None
+
+            stdout = FileFollower(stdout_file, "backslashreplace")
+            stderr = FileFollower(stderr_file, "backslashreplace")
+            deadline = time.perf_counter() + remaining + _GRACE
+            while True:
+                try:
+                    reply = self._replies.get(timeout=interval)
+                    break
+                except queue.Empty:
+                    pass
+                if on_output is not None:
+                    on_output(stdout.read_new(), stderr.read_new())
+                if time.perf_counter() > deadline:
+                    reply = "timeout"
+                    break
+
+            if reply is None:
+                _logger.warning("Unit runner stopped, using a process per unit.")
+                self._stop()
+                return None
+            if reply == "timeout":
+                self._stop()
+            if on_output is not None:
+                on_output(stdout.read_new(), stderr.read_new())
+            return BaseExecutionResult(
+                stdout=stdout_file.read_text(errors="backslashreplace"),
+                stderr=stderr_file.read_text(errors="backslashreplace"),
+                exit=0 if reply == "timeout" else int(reply),
+                timeout=reply == "timeout",
+                memory=False,
+            )
+
+    def close(self):
+        """
+        Stop the runner once all units are executed.
+        """
+        if self._process is None:
+            return
+        assert self._process.stdin is not None
+        try:
+            self._process.stdin.close()
+            self._process.wait(_GRACE)
+        except (BrokenPipeError, subprocess.TimeoutExpired):
+            self._stop()
+
+
+def create_unit_runner(bundle: Bundle) -> UnitRunner | None:
+    """
+    Get the runner for the units of the judgement, if it is enabled and supported
+    by the programming language.
+    """
+    if not bundle.config.options.single_process:
+        return None
+    command = bundle.language.unit_runner()
+    if command is None:
+        _logger.info("Units are executed in their own process.")
+        return None
+    return UnitRunner(bundle, command)
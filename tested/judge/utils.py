@@ -1,10 +1,19 @@
 """
 Common utilities for the judge.
 """
+import codecs
+import io
+import locale
 import logging
+import os
 import shutil
+import signal
 import subprocess
+import threading
+import time
+from collections.abc import Callable
 from pathlib import Path
+from typing import IO
 
 from attrs import define
 
@@ -14,6 +23,9 @@ from tested.languages.conventionalize import EXECUTION_PREFIX
 
 _logger = logging.getLogger(__name__)
 
+# How long the output of a command may stay open after it finished, in seconds.
+_PIPE_GRACE = 0.5
+
 
 @define
 class BaseExecutionResult:
@@ -33,6 +45,7 @@ def run_command(
     timeout: float | None,
     command: list[str] | None = None,
     stdin: str | None = None,
+    environment: dict[str, str] | None = None,
 ) -> BaseExecutionResult | None:
     """
     Run a command and get the result of said command.
@@ -41,12 +54,16 @@ def run_command(
     :param command: Optional, the command to execute.
     :param stdin: Optional stdin for the process.
     :param timeout: The max time for this command.
+    :param environment: Optional extra environment variables for the process.
 
     :return: The result of the execution if the command was not None.
     """
     if not command:
         return None
 
+    if environment:
+        environment = {**os.environ, **environment}
+
     try:
         timeout = int(timeout) if timeout is not None else None
         process = subprocess.run(
@@ -57,6 +74,7 @@ def run_command(
             capture_output=True,
             input=stdin,
             timeout=timeout,
+            env=environment,
         )
     except subprocess.TimeoutExpired as e:
         return BaseExecutionResult(
@@ -76,6 +94,188 @@ def run_command(
     )
 
 
+def text_decoder(errors: str = "strict") -> io.IncrementalNewlineDecoder:
+    """
+    Get an incremental decoder that decodes like files opened in text mode: with
+    the preferred encoding and universal newlines.
+    """
+    encoding = locale.getpreferredencoding(False)
+    decoder = codecs.getincrementaldecoder(encoding)(errors=errors)
+    return io.IncrementalNewlineDecoder(decoder, translate=True)
+
+
+class FileFollower:
+    """
+    Reads the new contents of a file that is being written.
+    """
+
+    def __init__(self, path: Path, errors: str = "strict"):
+        self.path = path
+        self._offset = 0
+        self._decoder = text_decoder(errors)
+
+    def read_new(self) -> str:
+        try:
+            with open(self.path, "rb") as file:
+                file.seek(self._offset)
+                data = file.read()
+        except FileNotFoundError:
+            return ""
+        self._offset += len(data)
+        return self._decoder.decode(data)
+
+
+class _PipeReader:
+    """
+    Reads a pipe in a separate thread, keeping the text read so far.
+    """
+
+    def __init__(self, pipe: IO[bytes]):
+        self._pipe = pipe
+        self._decoder = text_decoder("backslashreplace")
+        self._chunks: list[str] = []
+        self._new: list[str] = []
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._read, daemon=True)
+        self._thread.start()
+
+    def _read(self):
+        while data := os.read(self._pipe.fileno(), 65536):
+            self._add(self._decoder.decode(data))
+        self._add(self._decoder.decode(b"", final=True))
+        self._pipe.close()
+
+    def _add(self, text: str):
+        if text:
+            with self._lock:
+                self._chunks.append(text)
+                self._new.append(text)
+
+    def new_text(self) -> str:
+        """Get the text that was read since the last call."""
+        with self._lock:
+            new, self._new = self._new, []
+        return "".join(new)
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Wait until the pipe is closed, and get if it was closed in time."""
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def text(self) -> str:
+        """Get all text that was read."""
+        with self._lock:
+            return "".join(self._chunks)
+
+
+def _write_stdin(pipe: IO[bytes], stdin: str):
+    encoding = locale.getpreferredencoding(False)
+    try:
+        pipe.write(stdin.encode(encoding, "backslashreplace"))
+        pipe.close()
+    except BrokenPipeError:
+        pass
+
+
+def _kill_group(process: subprocess.Popen):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def stream_command(
+    directory: Path,
+    timeout: float | None,
+    command: list[str],
+    on_output: Callable[[str, str], None],
+    stdin: str | None = None,
+    environment: dict[str, str] | None = None,
+    interval: float = 0.05,
+) -> BaseExecutionResult:
+    """
+    Run a command like run_command, while reporting the output as it is produced.
+
+    While the command is running, ``on_output`` is regularly called (in the calling
+    thread) with the stdout and stderr that were produced since the previous call.
+    It is also called once after the command has finished.
+
+    The command is started in a new process group, which is killed when the
+    command finishes or times out. Processes started by the command that keep
+    stdout or stderr open past the timeout (e.g. by starting a new session)
+    result in a timeout.
+
+    :param directory: The directory to execute in.
+    :param timeout: The max time for this command.
+    :param command: The command to execute.
+    :param on_output: Receives the new stdout and stderr.
+    :param stdin: Optional stdin for the process.
+    :param environment: Optional extra environment variables for the process.
+    :param interval: How often the output is reported, in seconds.
+
+    :return: The result of the execution.
+    """
+    if environment:
+        environment = {**os.environ, **environment}
+
+    timeout = int(timeout) if timeout is not None else None
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command,
+        cwd=directory,
+        stdin=subprocess.PIPE if stdin is not None else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=environment,
+        start_new_session=True,
+    )
+    assert process.stdout is not None and process.stderr is not None
+    stdout = _PipeReader(process.stdout)
+    stderr = _PipeReader(process.stderr)
+    if stdin is not None:
+        assert process.stdin is not None
+        threading.Thread(
+            target=_write_stdin, args=(process.stdin, stdin), daemon=True
+        ).start()
+
+    timed_out = False
+    while True:
+        try:
+            process.wait(interval)
+            break
+        except subprocess.TimeoutExpired:
+            pass
+        on_output(stdout.new_text(), stderr.new_text())
+        if timeout is not None and time.perf_counter() - start > timeout:
+            _kill_group(process)
+            process.wait()
+            timed_out = True
+            break
+
+    # Processes started by the command might still have the pipes open.
+    _kill_group(process)
+    for reader in (stdout, stderr):
+        remaining = None
+        if timeout is not None:
+            remaining = max(timeout - (time.perf_counter() - start), _PIPE_GRACE)
+        if not reader.join(remaining):
+            _logger.warning("The output of the command was not closed in time.")
+            timed_out = True
+    all_stdout, all_stderr = stdout.text(), stderr.text()
+    on_output(stdout.new_text(), stderr.new_text())
+    if timed_out:
+        return BaseExecutionResult(
+            stdout=all_stdout, stderr=all_stderr, exit=0, timeout=True, memory=False
+        )
+    return BaseExecutionResult(
+        stdout=all_stdout,
+        stderr=all_stderr,
+        exit=process.returncode,
+        timeout=False,
+        memory=True if process.returncode == -9 else False,
+    )
+
+
 def copy_from_paths_to_path(origins: list[Path], files: list[str], destination: Path):
     """
     Copy a list of files from a list of source folders to a destination folder. The
@@ -69,6 +69,12 @@ class Bash(Language):
     def execution(self, cwd: Path, file: str, arguments: list[str]) -> Command:
         return ["bash", file, *arguments]
 
+    def toolchain(self) -> list[str]:
+        return ["bash"]
+
+    def unit_runner(self) -> Command | None:
+        return ["bash", str(Path(__file__).parent / "unit_runner.sh")]
+
     def cleanup_stacktrace(self, stacktrace: str) -> str:
         regex = re.compile(
             f"{EXECUTION_PREFIX}_[0-9]+_[0-9]+\\."
@@ -4,6 +4,11 @@ from collections.abc import Callable
 from tested.datatypes import AdvancedStringTypes, BasicStringTypes
 from tested.languages.conventionalize import submission_file
 from tested.languages.preparation import (
+    CONTEXT_SEPARATOR_VARIABLE,
+    EXCEPTION_FILE_VARIABLE,
+    SECRET_VARIABLES,
+    TESTCASE_SEPARATOR_VARIABLE,
+    VALUE_FILE_VARIABLE,
     PreparedContext,
     PreparedExecutionUnit,
     PreparedTestcase,
@@ -167,18 +172,26 @@ indent = " " * 4
 
 def convert_execution_unit(pu: PreparedExecutionUnit) -> str:
     result = f"""
+# Keep the secrets in variables that are not exported and remove them from the
+# environment, so the processes started by the submission cannot read them.
+_tested_context_separator="${CONTEXT_SEPARATOR_VARIABLE}"
+_tested_testcase_separator="${TESTCASE_SEPARATOR_VARIABLE}"
+_tested_value_file="${VALUE_FILE_VARIABLE}"
+_tested_exception_file="${EXCEPTION_FILE_VARIABLE}"
+unset {" ".join(SECRET_VARIABLES)}
+
 function write_context_separator {{
-    echo -n "--{pu.context_separator_secret}-- SEP" >>{pu.value_file}
-    echo -n "--{pu.context_separator_secret}-- SEP" >>{pu.exception_file}
-    echo -n "--{pu.context_separator_secret}-- SEP"
-    echo -n "--{pu.context_separator_secret}-- SEP" >&2
+    echo -n "$_tested_context_separator" >>"$_tested_value_file"
+    echo -n "$_tested_context_separator" >>"$_tested_exception_file"
+    echo -n "$_tested_context_separator"
+    echo -n "$_tested_context_separator" >&2
 }}
 
 function write_separator {{
-    echo -n "--{pu.testcase_separator_secret}-- SEP" >>{pu.value_file}
-    echo -n "--{pu.testcase_separator_secret}-- SEP" >>{pu.exception_file}
-    echo -n "--{pu.testcase_separator_secret}-- SEP"
-    echo -n "--{pu.testcase_separator_secret}-- SEP" >&2
+    echo -n "$_tested_testcase_separator" >>"$_tested_value_file"
+    echo -n "$_tested_testcase_separator" >>"$_tested_exception_file"
+    echo -n "$_tested_testcase_separator"
+    echo -n "$_tested_testcase_separator" >&2
 }}
 
 function json_escape {{
@@ -186,10 +199,10 @@ function json_escape {{
 }}
 
 function send_value {{
-    echo -n "{{\\"type\\": \\"text\\", \\"data\\": $(json_escape "$1")}}" >>{pu.value_file}
+    echo -n "{{\\"type\\": \\"text\\", \\"data\\": $(json_escape "$1")}}" >>"$_tested_value_file"
 }}
 
-touch {pu.value_file} {pu.exception_file}
+touch "$_tested_value_file" "$_tested_exception_file"
 
 """
 
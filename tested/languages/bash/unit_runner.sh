@@ -0,0 +1,68 @@
+# Executes the units of a judgement in one bash process (see tested/judge/runner.py).
+#
+# Each request is read from stdin, one field per line: the directory of the unit,
+# the name of the unit, the argument (or an empty line), the file with stdin (or an
+# empty line), the files for stdout and stderr, the timeout in milliseconds, the
+# number of environment variables and the variables themselves (as NAME=VALUE). The
+# reply is one line with the exit code of the unit, or "timeout".
+#
+# Each unit is sourced in a subshell, which is a fork of this process instead of a
+# new bash, so the units do not share state. After a timeout, the judge stops this
+# process, together with the unit.
+
+while IFS= read -r _tested_directory; do
+    IFS= read -r _tested_unit
+    IFS= read -r _tested_argument
+    IFS= read -r _tested_stdin
+    IFS= read -r _tested_stdout
+    IFS= read -r _tested_stderr
+    IFS= read -r _tested_timeout
+    IFS= read -r _tested_size
+    _tested_variables=()
+    for ((_tested_i = 0; _tested_i < _tested_size; _tested_i++)); do
+        IFS= read -r _tested_variable
+        _tested_variables+=("$_tested_variable")
+    done
+
+    (
+        exec <"${_tested_stdin:-/dev/null}" >"$_tested_stdout" 2>"$_tested_stderr"
+        cd "$_tested_directory" || exit 1
+        if ((${#_tested_variables[@]} > 0)); then
+            export -- "${_tested_variables[@]}"
+        fi
+        if [[ -n "$_tested_argument" ]]; then
+            set -- "$_tested_unit.sh" "$_tested_argument"
+        else
+            set -- "$_tested_unit.sh"
+        fi
+        # Like "bash file argument", except that no new bash is started.
+        unset -v "${!_tested_@}"
+        BASH_ARGV0="$1"
+        shift
+        source "$0" "$@"
+    ) &
+    _tested_unit_pid=$!
+    printf -v _tested_seconds '%d.%03d' $((_tested_timeout / 1000)) $((_tested_timeout % 1000))
+    (
+        trap 'kill "$_tested_sleep"; exit 0' TERM
+        sleep "$_tested_seconds" &
+        _tested_sleep=$!
+        wait "$_tested_sleep" || exit 0
+        # The runner stops the watchdog once the unit stopped, which must not hide
+        # that the unit timed out.
+        trap '' TERM
+        kill -KILL "$_tested_unit_pid"
+        exit 2
+    ) >/dev/null 2>&1 &
+    _tested_watchdog=$!
+    wait "$_tested_unit_pid"
+    _tested_code=$?
+    kill "$_tested_watchdog" 2>/dev/null
+    wait "$_tested_watchdog"
+    if (($? == 2)); then
+        # The unit might have started processes that are still running.
+        echo "timeout"
+        exit 1
+    fi
+    echo "$_tested_code"
+done
@@ -1,5 +1,7 @@
+import functools
 import logging
 import re
+import subprocess
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -18,7 +20,11 @@ from tested.languages.conventionalize import (
     NamingConventions,
     submission_file,
 )
-from tested.languages.utils import executable_name
+from tested.languages.utils import (
+    compiled_harness,
+    executable_name,
+    prepared_harness_cache,
+)
 from tested.serialisation import Statement, Value
 
 logger = logging.getLogger(__name__)
@@ -27,6 +33,26 @@ logger = logging.getLogger(__name__)
 if TYPE_CHECKING:
     from tested.languages.generation import PreparedExecutionUnit
 
+# The translation units of the harness, which do not depend on the exercise.
+HARNESS_SOURCES = ["evaluation_result.c", "values.c"]
+
+
+@functools.cache
+def gcc_version() -> str | None:
+    """
+    Get the version of the GCC that is used, or None if GCC is not available.
+    """
+    try:
+        process = subprocess.run(
+            ["gcc", "-dumpfullversion", "-dumpversion"],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return process.stdout.strip() or None
+
 
 class C(Language):
     def initial_dependencies(self) -> list[str]:
@@ -46,6 +72,7 @@ class C(Language):
             Construct.FUNCTION_CALLS,
             Construct.ASSIGNMENTS,
             Construct.GLOBAL_VARIABLES,
+            Construct.TIMING,
         }
 
     def datatype_support(self) -> dict[AllTypes, TypeSupport]:
@@ -76,26 +103,58 @@ class C(Language):
         main_file = files[-1]
         exec_file = Path(main_file).stem
         result = executable_name(exec_file)
+        options = self._options()
+        harness = self._compiled_harness(options)
+        if harness is not None:
+            # Only the main file is compiled, and linked with the harness.
+            objects = [str(harness / f"{Path(s).stem}.o") for s in HARNESS_SOURCES]
+        else:
+            objects = HARNESS_SOURCES
+        return ["gcc", *options, *objects, main_file, "-o", result], [result]
+
+    def _options(self) -> list[str]:
         assert self.config
-        return (
-            [
-                "gcc",
-                "-std=c11",
-                "-Wall",
-                "-O3" if self.config.options.compiler_optimizations else "-O0",
-                "evaluation_result.c",
-                "values.c",
-                main_file,
-                "-o",
-                result,
-            ],
-            [result],
-        )
+        return [
+            "-std=c11",
+            "-Wall",
+            "-O3" if self.config.options.compiler_optimizations else "-O0",
+        ]
+
+    def _compiled_harness(
+        self, options: list[str], directory: Path | None = None
+    ) -> Path | None:
+        """
+        Get the object files of the harness, which are compiled once for all
+        judgements, each translation unit in parallel. Without a cache, the
+        harness of the prepared exercise is used, if there is one.
+        """
+        assert self.config
+        version = gcc_version()
+        if version is None:
+            return None
+        create = True
+        if directory is None and self.config.dodona.gcc_cache is not None:
+            directory = Path(self.config.dodona.gcc_cache)
+        elif directory is None:
+            directory = prepared_harness_cache(self.config.dodona)
+            if not directory.is_dir():
+                return None
+            create = False
+        templates = self.path_to_dependencies()[0]
+        sources = [templates / name for name in self.initial_dependencies()]
+        commands = [["gcc", *options, "-c", source] for source in HARNESS_SOURCES]
+        return compiled_harness(directory, f"c-{version}", sources, commands, create)
+
+    def compile_harness(self, directory: Path) -> Path | None:
+        return self._compiled_harness(self._options(), directory)
 
     def execution(self, cwd: Path, file: str, arguments: list[str]) -> Command:
         local_file = cwd / executable_name(Path(file).stem)
         return [str(local_file.absolute()), *arguments]
 
+    def toolchain(self) -> list[str]:
+        return ["gcc"]
+
     def modify_solution(self, solution: Path):
         with open(solution, "r") as file:
             contents = file.read()
@@ -191,3 +250,6 @@ class C(Language):
         regex = rf"void\s+{name}"
         the_source = self.config.dodona.source.read_text()
         return re.search(regex, the_source) is not None
+
+    def generation_uses_submission(self) -> bool:
+        return True
@@ -12,6 +12,12 @@ from tested.datatypes import (
     resolve_to_basic,
 )
 from tested.languages.preparation import (
+    CONTEXT_SEPARATOR_VARIABLE,
+    EXCEPTION_FILE_VARIABLE,
+    SECRET_VARIABLES,
+    TESTCASE_SEPARATOR_VARIABLE,
+    TIMING_FILE_VARIABLE,
+    VALUE_FILE_VARIABLE,
     PreparedContext,
     PreparedExecutionUnit,
     PreparedTestcase,
@@ -161,7 +167,9 @@ def convert_statement(statement: Statement, full=False) -> str:
     raise AssertionError(f"Unknown statement: {statement!r}")
 
 
-def _generate_internal_context(ctx: PreparedContext, pu: PreparedExecutionUnit) -> str:
+def _generate_internal_context(
+    ctx: PreparedContext, pu: PreparedExecutionUnit, index: int
+) -> str:
     result = f"""
     {ctx.before}
     
@@ -170,8 +178,11 @@ def _generate_internal_context(ctx: PreparedContext, pu: PreparedExecutionUnit)
 
     # Generate code for each testcase
     tc: PreparedTestcase
-    for tc in ctx.testcases:
+    for i, tc in enumerate(ctx.testcases):
         result += f"{pu.unit.name}_write_separator();\n"
+        if tc.is_timed():
+            result += f"{pu.unit.name}_start_timing();\n"
+        stop = f"{pu.unit.name}_stop_timing({index}, {i});\n" if tc.is_timed() else ""
 
         if tc.testcase.is_main_testcase():
             assert isinstance(tc.input, MainInput)
@@ -182,6 +193,7 @@ def _generate_internal_context(ctx: PreparedContext, pu: PreparedExecutionUnit)
             result += (
                 f"exit_code = solution_main({len(tc.input.arguments) + 1}, args);\n"
             )
+            result += stop
         else:
             assert isinstance(tc.input, PreparedTestcaseStatement)
             result += "exit_code = 0;\n"
@@ -192,9 +204,13 @@ def _generate_internal_context(ctx: PreparedContext, pu: PreparedExecutionUnit)
                     + convert_statement(tc.input.unwrapped_input_statement())
                     + ";\n"
                 )
+                result += stop
                 result += " " * 4 + convert_statement(tc.input.no_value_call()) + ";\n"
             else:
+                # The value is sent in the same statement, so this is included in
+                # the measured time.
                 result += convert_statement(tc.input.input_statement()) + ";\n"
+                result += stop
 
     result += ctx.after + "\n"
     result += "return exit_code;\n"
@@ -204,6 +220,8 @@ def _generate_internal_context(ctx: PreparedContext, pu: PreparedExecutionUnit)
 def convert_execution_unit(pu: PreparedExecutionUnit) -> str:
     result = f"""
     #include <stdio.h>
+    #include <stdlib.h>
+    #include <string.h>
     #include <math.h>
     
     #include "values.h"
@@ -214,22 +232,46 @@ def convert_execution_unit(pu: PreparedExecutionUnit) -> str:
     for name in pu.evaluator_names:
         result += f'#include "{name}.c"\n'
 
+    # The files are buffered and flushed at the start of each context, like stdout
+    # (exit flushes them when the process ends). Stderr stays unbuffered, so the
+    # output of the submission is still written if it crashes.
+    if pu.has_timed_testcases():
+        result += f"static FILE* {pu.unit.name}_timing_file = NULL;\n"
+        flush_timing = f"fflush({pu.unit.name}_timing_file);"
+    else:
+        flush_timing = ""
     result += f"""
     static FILE* {pu.unit.name}_value_file = NULL;
     static FILE* {pu.unit.name}_exception_file = NULL;
+    static const char* {pu.unit.name}_testcase_separator = NULL;
+    static const char* {pu.unit.name}_context_separator = NULL;
+
+    // Declared here, as it is part of POSIX instead of the C standard.
+    int unsetenv(const char* name);
+
+    static const char* {pu.unit.name}_secret(const char* name) {{
+        const char* value = getenv(name);
+        char* copy = malloc(strlen(value) + 1);
+        strcpy(copy, value);
+        return copy;
+    }}
     
     static void {pu.unit.name}_write_separator() {{
-        fprintf({pu.unit.name}_value_file, "--{pu.testcase_separator_secret}-- SEP");
-        fprintf({pu.unit.name}_exception_file, "--{pu.testcase_separator_secret}-- SEP");
-        fprintf(stdout, "--{pu.testcase_separator_secret}-- SEP");
-        fprintf(stderr, "--{pu.testcase_separator_secret}-- SEP");
+        fputs({pu.unit.name}_testcase_separator, {pu.unit.name}_value_file);
+        fputs({pu.unit.name}_testcase_separator, {pu.unit.name}_exception_file);
+        fputs({pu.unit.name}_testcase_separator, stdout);
+        fputs({pu.unit.name}_testcase_separator, stderr);
     }}
     
     static void {pu.unit.name}_write_context_separator() {{
-        fprintf({pu.unit.name}_value_file, "--{pu.context_separator_secret}-- SEP");
-        fprintf({pu.unit.name}_exception_file, "--{pu.context_separator_secret}-- SEP");
-        fprintf(stdout, "--{pu.context_separator_secret}-- SEP");
-        fprintf(stderr, "--{pu.context_separator_secret}-- SEP");
+        fputs({pu.unit.name}_context_separator, {pu.unit.name}_value_file);
+        fputs({pu.unit.name}_context_separator, {pu.unit.name}_exception_file);
+        fputs({pu.unit.name}_context_separator, stdout);
+        fputs({pu.unit.name}_context_separator, stderr);
+        fflush({pu.unit.name}_value_file);
+        fflush({pu.unit.name}_exception_file);
+        {flush_timing}
+        fflush(stdout);
     }}
     
     #undef send_value
@@ -239,26 +281,61 @@ def convert_execution_unit(pu: PreparedExecutionUnit) -> str:
     #define send_specific_value(value) write_evaluated({pu.unit.name}_value_file, value)
     """
 
+    if pu.has_timed_testcases():
+        result += f"""
+        #include <time.h>
+
+        static struct timespec {pu.unit.name}_timing_wall;
+        static clock_t {pu.unit.name}_timing_cpu;
+
+        static void {pu.unit.name}_start_timing() {{
+            timespec_get(&{pu.unit.name}_timing_wall, TIME_UTC);
+            {pu.unit.name}_timing_cpu = clock();
+        }}
+
+        static void {pu.unit.name}_stop_timing(int context, int testcase) {{
+            clock_t cpu_end = clock();
+            struct timespec wall_end;
+            timespec_get(&wall_end, TIME_UTC);
+            double wall = (double) (wall_end.tv_sec - {pu.unit.name}_timing_wall.tv_sec)
+                + (wall_end.tv_nsec - {pu.unit.name}_timing_wall.tv_nsec) / 1e9;
+            double cpu = (double) (cpu_end - {pu.unit.name}_timing_cpu) / CLOCKS_PER_SEC;
+            fprintf({pu.unit.name}_timing_file, "%d %d %.9f %.9f\\n", context, testcase, wall, cpu);
+        }}
+        """
+
     # Generate code for each context.
     ctx: PreparedContext
     for i, ctx in enumerate(pu.contexts):
         result += f"""
         int {pu.unit.name}_context_{i}(void) {{
-            {_generate_internal_context(ctx, pu)}
+            {_generate_internal_context(ctx, pu, i)}
         }}
         """
 
     result += f"""
     int {pu.unit.name}() {{
-        {pu.unit.name}_value_file = fopen("{pu.value_file}", "w");
-        {pu.unit.name}_exception_file = fopen("{pu.exception_file}", "w");
+        {pu.unit.name}_value_file = fopen(getenv("{VALUE_FILE_VARIABLE}"), "w");
+        {pu.unit.name}_exception_file = fopen(getenv("{EXCEPTION_FILE_VARIABLE}"), "w");
+        setvbuf({pu.unit.name}_value_file, NULL, _IOFBF, 1 << 16);
+        setvbuf({pu.unit.name}_exception_file, NULL, _IOFBF, 1 << 16);
+        {pu.unit.name}_testcase_separator = {pu.unit.name}_secret("{TESTCASE_SEPARATOR_VARIABLE}");
+        {pu.unit.name}_context_separator = {pu.unit.name}_secret("{CONTEXT_SEPARATOR_VARIABLE}");
         int exit_code;
     """
+    if pu.has_timed_testcases():
+        timing = f'getenv("{TIMING_FILE_VARIABLE}")'
+        result += f'{pu.unit.name}_timing_file = fopen({timing}, "w");\n'
+    # Remove the secrets before the submission is executed.
+    for name in SECRET_VARIABLES:
+        result += " " * 4 + f'unsetenv("{name}");\n'
 
     for i, ctx in enumerate(pu.contexts):
         result += " " * 4 + f"{pu.unit.name}_write_context_separator();\n"
         result += " " * 4 + f"exit_code = {pu.unit.name}_context_{i}();\n"
 
+    if pu.has_timed_testcases():
+        result += f"fclose({pu.unit.name}_timing_file);\n"
     result += f"""
         fclose({pu.unit.name}_value_file);
         fclose({pu.unit.name}_exception_file);
@@ -158,6 +158,54 @@ class Language(ABC):
         """
         raise NotImplementedError
 
+    def compile_harness(self, directory: Path) -> Path | None:
+        """
+        Callback compiling the files of the harness that depend neither on the
+        exercise nor on the submission (e.g. object files), see
+        tested.languages.utils.compiled_harness. This is used to prepare an
+        exercise (see tested.prepare).
+
+        :param directory: The directory where the compiled harnesses are kept.
+
+        :return: The directory with the compiled harness, or None if there is none.
+        """
+        return None
+
+    def toolchain(self) -> list[str]:
+        """
+        Callback for the names of the executables of the compiler and the runtime
+        of the language. These identify the version of the language (e.g. for the
+        replay cache), so results of another version are not reused.
+
+        :return: The names of the executables, which are looked up on the PATH.
+        """
+        return []
+
+    def unit_runner(self) -> Command | None:
+        """
+        Callback for generating the command of a process that executes all units
+        of a judgement, see tested.judge.runner. The generated code of the units
+        must then read the variables it needs with the runner, instead of from the
+        environment.
+
+        :return: The command, or None if the language does not support this.
+        """
+        return None
+
+    def secret_variables(self, cwd: Path, secrets: dict[str, str]) -> dict[str, str]:
+        """
+        Callback for passing the secrets (the separators and the names of the files
+        for the channels) to the generated code. By default, they are passed as is,
+        and the generated code removes them from the environment before the
+        submission is executed.
+
+        :param cwd: The directory in which the execution takes place.
+        :param secrets: The secret variables.
+
+        :return: The variables to pass to the generated code instead.
+        """
+        return secrets
+
     def get_string_quote(self):
         """
         :return: The symbol used to quote strings.
@@ -470,3 +518,15 @@ class Language(ABC):
         Check if a function with a name returns nothing.
         """
         return False
+
+    def generation_uses_submission(self) -> bool:
+        """
+        Indicate if the generated code depends on the submission, for example
+        because is_void_method inspects the submission.
+
+        If this is the case, a harness that was generated ahead of time cannot be
+        used, since it might be wrong for the submission being judged.
+
+        :return: True if the generated code depends on the submission.
+        """
+        return False
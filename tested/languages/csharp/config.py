@@ -122,6 +122,9 @@ class CSharp(Language):
         file = OUTPUT_DIRECTORY + "/" + file
         return ["dotnet", file, *arguments]
 
+    def toolchain(self) -> list[str]:
+        return ["dotnet"]
+
     def find_main_file(
         self, files: list[Path], name: str
     ) -> tuple[Path | None, Status]:
@@ -275,3 +278,6 @@ class {class_name}
         regex = rf"void\s+{name}"
         the_source = self.config.dodona.source.read_text()
         return re.search(regex, the_source) is not None
+
+    def generation_uses_submission(self) -> bool:
+        return True
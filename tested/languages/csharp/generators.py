@@ -14,6 +14,11 @@ from tested.datatypes import (
     resolve_to_basic,
 )
 from tested.languages.preparation import (
+    CONTEXT_SEPARATOR_VARIABLE,
+    EXCEPTION_FILE_VARIABLE,
+    SECRET_VARIABLES,
+    TESTCASE_SEPARATOR_VARIABLE,
+    VALUE_FILE_VARIABLE,
     PreparedContext,
     PreparedExecutionUnit,
     PreparedFunctionCall,
@@ -332,11 +337,20 @@ class {pu.unit.name}
     private readonly StreamWriter exceptionFile;
     private readonly StreamWriter stdout;
     private readonly StreamWriter stderr;
+    private readonly string testcaseSeparator;
+    private readonly string contextSeparator;
 
     public {pu.unit.name}()
     {{
-        valueFile = new StreamWriter(File.OpenWrite("{pu.value_file}"));
-        exceptionFile = new StreamWriter(File.OpenWrite("{pu.exception_file}"));
+        valueFile = new StreamWriter(File.OpenWrite(Environment.GetEnvironmentVariable("{VALUE_FILE_VARIABLE}")!));
+        exceptionFile = new StreamWriter(File.OpenWrite(Environment.GetEnvironmentVariable("{EXCEPTION_FILE_VARIABLE}")!));
+        testcaseSeparator = Environment.GetEnvironmentVariable("{TESTCASE_SEPARATOR_VARIABLE}")!;
+        contextSeparator = Environment.GetEnvironmentVariable("{CONTEXT_SEPARATOR_VARIABLE}")!;
+        // Remove the secrets before the submission is executed.
+        foreach (var name in new[] {{ {", ".join(json.dumps(n) for n in SECRET_VARIABLES)} }})
+        {{
+            Environment.SetEnvironmentVariable(name, null);
+        }}
         stdout = new StreamWriter(Console.OpenStandardOutput());
         stderr = new StreamWriter(Console.OpenStandardError());
 
@@ -348,18 +362,18 @@ class {pu.unit.name}
     
     private void WriteSeparator()
     {{
-        valueFile.Write("--{pu.testcase_separator_secret}-- SEP");
-        exceptionFile.Write("--{pu.testcase_separator_secret}-- SEP");
-        stdout.Write("--{pu.testcase_separator_secret}-- SEP");
-        stderr.Write("--{pu.testcase_separator_secret}-- SEP");
+        valueFile.Write(testcaseSeparator);
+        exceptionFile.Write(testcaseSeparator);
+        stdout.Write(testcaseSeparator);
+        stderr.Write(testcaseSeparator);
     }}
     
     private void WriteContextSeparator()
     {{
-        valueFile.Write("--{pu.context_separator_secret}-- SEP");
-        exceptionFile.Write("--{pu.context_separator_secret}-- SEP");
-        stdout.Write("--{pu.context_separator_secret}-- SEP");
-        stderr.Write("--{pu.context_separator_secret}-- SEP");
+        valueFile.Write(contextSeparator);
+        exceptionFile.Write(contextSeparator);
+        stdout.Write(contextSeparator);
+        stderr.Write(contextSeparator);
     }}
     
     private void SendValue(object? value)
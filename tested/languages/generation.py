@@ -12,6 +12,7 @@ from pathlib import Path
 from re import Match
 from typing import TYPE_CHECKING, TypeAlias
 
+from attrs import evolve
 from pygments import highlight
 from pygments.formatters.html import HtmlFormatter
 from pygments.lexers import get_lexer_by_name
@@ -29,7 +30,18 @@ from tested.languages.preparation import (
     prepare_expression,
 )
 from tested.parsing import get_converter
-from tested.serialisation import Assignment, Expression, Statement, VariableType
+from tested.serialisation import (
+    Assignment,
+    Expression,
+    Identifier,
+    ObjectKeyValuePair,
+    ObjectType,
+    SequenceType,
+    Statement,
+    StringType,
+    Value,
+    VariableType,
+)
 from tested.testsuite import (
     Context,
     FileUrl,
@@ -108,7 +120,19 @@ def get_readable_input(
         a. A function expression or generate_statement.
     3. If it is a context testcase:
         a. The stdin and the arguments.
+
+    The result is memoised in the bundle, since the input is needed multiple times.
     """
+    return bundle.render_cache.get(
+        case,
+        ("input", bundle.config.programming_language),
+        lambda: _get_readable_input(bundle, case),
+    )
+
+
+def _get_readable_input(
+    bundle: Bundle, case: Testcase
+) -> tuple[ExtendedMessage, set[FileUrl]]:
     format_ = "text"  # By default, we use text as input.
     if case.description:
         if isinstance(case.description, ExtendedMessage):
@@ -126,7 +150,9 @@ def get_readable_input(
         args = f"$ {command}"
         # Determine the stdin
         if isinstance(case.input.stdin, TextData):
-            stdin = case.input.stdin.get_data_as_string(bundle.config.resources)
+            stdin = case.input.stdin.get_data_as_string(
+                bundle.config.resources, bundle.resource_cache
+            )
         else:
             stdin = ""
 
@@ -142,7 +168,7 @@ def get_readable_input(
             text = args
     elif isinstance(case.input, Statement):
         format_ = bundle.config.programming_language
-        text = generate_statement(bundle, case.input)
+        text = generate_suite_statement(bundle, case.input)
         text = bundle.language.cleanup_description(text)
     else:
         assert isinstance(case.input, LanguageLiterals)
@@ -210,7 +236,94 @@ def attempt_readable_input(bundle: Bundle, context: Context) -> ExtendedMessage:
     )
 
 
-def generate_statement(bundle: Bundle, statement: Statement) -> str:
+# Marks the part of a value that was left out when generating it.
+TRUNCATION_MARKER = "..."
+
+
+def _generated_length(bundle: Bundle, expression: Expression) -> int:
+    prepared = prepare_expression(bundle, expression)
+    return len(bundle.language.generate_statement(prepared))
+
+
+def _truncate_string(
+    bundle: Bundle, expression: StringType, budget: int
+) -> tuple[Expression, int]:
+    size = _generated_length(bundle, expression)
+    if size <= budget:
+        return expression, size
+    # Cut the string until its literal fits, since escapes make it longer.
+    kept = len(expression.data)
+    while kept > 0:
+        kept = min(kept - 1, kept * (budget - len(TRUNCATION_MARKER)) // size)
+        truncated = evolve(expression, data=expression.data[: max(kept, 0)])
+        size = _generated_length(bundle, truncated)
+        if size + len(TRUNCATION_MARKER) <= budget:
+            # The marker is placed after the literal, not in the string itself.
+            prepared = prepare_expression(bundle, truncated)
+            literal = bundle.language.generate_statement(prepared)
+            return _truncation_identifier(literal), size + len(TRUNCATION_MARKER)
+    return _truncation_identifier(), len(TRUNCATION_MARKER)
+
+
+def _truncate_expression(
+    bundle: Bundle, expression: Expression, budget: int
+) -> tuple[Expression, int]:
+    """
+    Make a copy of a value that fits in the budget. The elements of sequences, sets
+    and maps are left out at element boundaries, and long strings are cut off. The
+    size of the elements is measured by generating them, so it is accurate for each
+    language, except for the separators.
+
+    :param bundle: The configuration bundle.
+    :param expression: The value to truncate.
+    :param budget: The number of characters available for the value.
+
+    :return: The truncated value and the number of characters it uses.
+    """
+    if isinstance(expression, StringType):
+        return _truncate_string(bundle, expression, budget)
+    if not isinstance(expression, (SequenceType, ObjectType)):
+        # Other expressions (e.g. numbers) are never cut.
+        return expression, _generated_length(bundle, expression)
+
+    empty = _generated_length(bundle, evolve(expression, data=[]))
+    # Keep room for the separator and the marker.
+    reserved = len(TRUNCATION_MARKER) + 2
+    size = empty
+    elements: list = []
+    for element in expression.data:
+        separator = 2 if elements else 0
+        remaining = budget - size - separator - reserved
+        if isinstance(element, ObjectKeyValuePair):
+            key, key_size = _truncate_expression(bundle, element.key, remaining)
+            value, _ = _truncate_expression(bundle, element.value, remaining - key_size)
+            element = ObjectKeyValuePair(key=key, value=value)
+        else:
+            element, _ = _truncate_expression(bundle, element, remaining)
+        single = evolve(expression, data=[element])
+        element_size = _generated_length(bundle, single) - empty
+        if element_size > remaining:
+            marker = _truncation_identifier()
+            if isinstance(expression, ObjectType):
+                elements.append(ObjectKeyValuePair(key=marker, value=marker))
+            else:
+                elements.append(marker)
+            size += separator + len(TRUNCATION_MARKER)
+            break
+        elements.append(element)
+        size += separator + element_size
+    return evolve(expression, data=elements), size
+
+
+def _truncation_identifier(before: str = "") -> Identifier:
+    marker = Identifier(before + TRUNCATION_MARKER)
+    marker.is_raw = True
+    return marker
+
+
+def generate_statement(
+    bundle: Bundle, statement: Statement, limit: int | None = None
+) -> str:
     """
     Convert a statement to actual code for the given programming language.
     This will use the "full" mode, meaning variable_type annotation will be
@@ -223,11 +336,20 @@ def generate_statement(bundle: Bundle, statement: Statement) -> str:
 
         String test = namespace.functionCall("Hi");
 
+    If a limit is given, large values are truncated (which is marked in the code),
+    so the code is (approximately) at most that many characters. Values are only
+    cut between elements, or after a part of a string literal. This is intended
+    for code that is only shown to the user, not for code that is executed.
+
     :param bundle: The configuration bundle.
     :param statement: The statement to convert.
+    :param limit: The maximal number of characters of the code, if any.
 
-    :return: The code the statement.
+    :return: The code of the statement.
     """
+    if limit is not None and isinstance(statement, Value):
+        statement, _ = _truncate_expression(bundle, statement, limit)
+
     if isinstance(statement, Expression):
         statement = prepare_expression(bundle, statement)
     else:
@@ -237,6 +359,26 @@ def generate_statement(bundle: Bundle, statement: Statement) -> str:
     return bundle.language.generate_statement(statement)
 
 
+def generate_suite_statement(bundle: Bundle, statement: Statement) -> str:
+    """
+    Convert a statement from the test suite to code, see generate_statement.
+
+    Statements from the test suite are converted multiple times during a judgement
+    (e.g. for the readable input and for the metadata of the context), so the result
+    is memoised in the bundle.
+
+    :param bundle: The configuration bundle.
+    :param statement: The statement to convert, which must be part of the suite.
+
+    :return: The code of the statement.
+    """
+    return bundle.render_cache.get(
+        statement,
+        ("statement", bundle.config.programming_language),
+        lambda: generate_statement(bundle, statement),
+    )
+
+
 def generate_execution(
     bundle: Bundle,
     destination: Path,
@@ -252,7 +394,7 @@ def generate_execution(
     :return: The name of the generated file in the given destination and a set
              of oracle names that will also be needed.
     """
-    prepared_execution = prepare_execution_unit(bundle, destination, execution_unit)
+    prepared_execution = prepare_execution_unit(bundle, execution_unit)
     execution_code = generate_execution_unit(bundle, prepared_execution)
 
     evaluator_files = [
@@ -1,4 +1,8 @@
+import ast
+import functools
+import logging
 import re
+import subprocess
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -18,14 +22,61 @@ from tested.languages.conventionalize import (
 )
 from tested.languages.utils import (
     cleanup_description,
+    compiled_harness,
     executable_name,
     haskell_solution,
+    prepared_harness_cache,
 )
 from tested.serialisation import Statement, Value
 
 if TYPE_CHECKING:
     from tested.languages.generation import PreparedExecutionUnit
 
+_logger = logging.getLogger(__name__)
+
+
+@functools.cache
+def ghc_info() -> dict[str, str]:
+    """
+    Get the information about the GHC that is used (see ``ghc --info``), which is
+    empty if GHC is not available.
+    """
+    try:
+        process = subprocess.run(
+            ["ghc", "--info"], capture_output=True, text=True, timeout=30
+        )
+        return dict(ast.literal_eval(process.stdout))
+    except (OSError, subprocess.TimeoutExpired, ValueError, SyntaxError):
+        return {}
+
+
+def ghc_harness(
+    directory: Path, sources: list[Path], options: list[str], create: bool = True
+) -> Path | None:
+    """
+    Get a directory with the harness modules compiled by the GHC that is used (see
+    compiled_harness).
+
+    If the directory is on the search path of GHC before the working directory,
+    GHC uses the compiled modules instead of compiling the modules again, as they
+    are up-to-date.
+
+    :param directory: The directory where the harnesses are kept.
+    :param sources: The source files of the harness modules.
+    :param options: The options of GHC, which must be the same as the options of
+                    the compilation using the harness.
+    :param create: If the harness is compiled if it does not exist yet.
+
+    :return: The directory, or None if there is no compiled harness.
+    """
+    version = ghc_info().get("Project version")
+    if version is None:
+        _logger.debug("Not using a compiled harness, as the GHC version is unknown.")
+        return None
+    command = ["ghc", "--make", "-j", "-no-link", *options]
+    command.extend(source.name for source in sources)
+    return compiled_harness(directory, f"haskell-{version}", sources, [command], create)
+
 
 class Haskell(Language):
     def initial_dependencies(self) -> list[str]:
@@ -81,15 +132,60 @@ class Haskell(Language):
             Construct.GLOBAL_VARIABLES,
         }
 
+    def _options(self) -> list[str]:
+        assert self.config
+        return [
+            "-fno-cse",
+            "-fno-full-laziness",
+            "-O3" if self.config.options.compiler_optimizations else "-O0",
+        ]
+
+    def _compiled_harness(
+        self, directory: Path, options: list[str], create: bool
+    ) -> tuple[Path | None, bool]:
+        """
+        Get the compiled harness modules, preferably compiled for dynamic linking.
+
+        :return: The directory with the harness, and if it links dynamically.
+        """
+        templates = self.path_to_dependencies()[0]
+        sources = [templates / name for name in self.initial_dependencies()]
+        if ghc_info().get("GHC Dynamic") == "YES":
+            harness = ghc_harness(directory, sources, [*options, "-dynamic"], create)
+            # Without a harness, the libraries might not support it.
+            if harness is not None:
+                return harness, True
+        return ghc_harness(directory, sources, options, create), False
+
+    def compile_harness(self, directory: Path) -> Path | None:
+        harness, _ = self._compiled_harness(directory, self._options(), True)
+        return harness
+
     def compilation(self, files: list[str]) -> CallbackResult:
         main_ = files[-1]
         exec_ = main_.rstrip(".hs")
         assert self.config
+        options = self._options()
+        # Linking dynamically is only done if the compiled harness shows that the
+        # libraries support it. Without a cache, the harness of the prepared
+        # exercise is used, if there is one.
+        harness, dynamic = None, False
+        if self.config.dodona.ghc_cache is not None:
+            cache = Path(self.config.dodona.ghc_cache)
+            harness, dynamic = self._compiled_harness(cache, options, True)
+        elif (prepared := prepared_harness_cache(self.config.dodona)).is_dir():
+            harness, dynamic = self._compiled_harness(prepared, options, False)
+        if dynamic:
+            # Linking dynamically is a lot faster than linking statically.
+            options.append("-dynamic")
+        if harness is not None:
+            # Search the compiled harness before the working directory.
+            options.extend(["-i", f"-i{harness}", "-i."])
         return [
             "ghc",
-            "-fno-cse",
-            "-fno-full-laziness",
-            "-O3" if self.config.options.compiler_optimizations else "-O0",
+            "--make",
+            "-j",
+            *options,
             main_,
             "-main-is",
             exec_,
@@ -99,6 +195,9 @@ class Haskell(Language):
         local_file = cwd / file
         return [str(local_file.absolute()), *arguments]
 
+    def toolchain(self) -> list[str]:
+        return ["ghc"]
+
     def modify_solution(self, solution: Path):
         haskell_solution(self, solution)
 
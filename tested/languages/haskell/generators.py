@@ -13,6 +13,11 @@ from tested.datatypes import (
     resolve_to_basic,
 )
 from tested.languages.preparation import (
+    CONTEXT_SEPARATOR_VARIABLE,
+    EXCEPTION_FILE_VARIABLE,
+    SECRET_VARIABLES,
+    TESTCASE_SEPARATOR_VARIABLE,
+    VALUE_FILE_VARIABLE,
     PreparedContext,
     PreparedExecutionUnit,
     PreparedTestcase,
@@ -173,6 +178,7 @@ def convert_execution_unit(pu: PreparedExecutionUnit) -> str:
 module {pu.unit.name} where
 
 import System.IO (hPutStr, stderr, stdout, hFlush)
+import System.IO.Unsafe (unsafePerformIO)
 import System.Environment
 import qualified Values
 import Control.Monad.Trans.Class
@@ -188,24 +194,30 @@ import Data.Word
     result += f"""
 import qualified {pu.submission_name}
 
-value_file = "{pu.value_file}"
-exception_file = "{pu.exception_file}"
+{{-# NOINLINE value_file #-}}
+value_file = unsafePerformIO (getEnv "{VALUE_FILE_VARIABLE}")
+{{-# NOINLINE exception_file #-}}
+exception_file = unsafePerformIO (getEnv "{EXCEPTION_FILE_VARIABLE}")
+{{-# NOINLINE testcase_separator #-}}
+testcase_separator = unsafePerformIO (getEnv "{TESTCASE_SEPARATOR_VARIABLE}")
+{{-# NOINLINE context_separator #-}}
+context_separator = unsafePerformIO (getEnv "{CONTEXT_SEPARATOR_VARIABLE}")
 
 writeSeparator :: IO ()
 writeSeparator = do
-    hPutStr stderr "--{pu.testcase_separator_secret}-- SEP"
-    hPutStr stdout "--{pu.testcase_separator_secret}-- SEP"
-    appendFile value_file "--{pu.testcase_separator_secret}-- SEP"
-    appendFile exception_file "--{pu.testcase_separator_secret}-- SEP"
+    hPutStr stderr testcase_separator
+    hPutStr stdout testcase_separator
+    appendFile value_file testcase_separator
+    appendFile exception_file testcase_separator
     hFlush stdout
     hFlush stderr
 
 writeContextSeparator :: IO ()
 writeContextSeparator = do
-    hPutStr stderr "--{pu.context_separator_secret}-- SEP"
-    hPutStr stdout "--{pu.context_separator_secret}-- SEP"
-    appendFile value_file "--{pu.context_separator_secret}-- SEP"
-    appendFile exception_file "--{pu.context_separator_secret}-- SEP"
+    hPutStr stderr context_separator
+    hPutStr stdout context_separator
+    appendFile value_file context_separator
+    appendFile exception_file context_separator
     hFlush stdout
     hFlush stderr
 
@@ -289,9 +301,12 @@ handleException (Right _) = Nothing
         result += indent + ctx.after + "\n"
         result += indent + 'putStr ""\n'
 
-    result += """
+    result += f"""
 main :: IO ()
 main = do
+    -- Read the secrets and remove them before the submission is executed.
+    mapM_ (\\s -> length s `seq` return ()) [value_file, exception_file, testcase_separator, context_separator]
+    mapM_ unsetEnv {json.dumps(SECRET_VARIABLES)}
 """
     for i, ctx in enumerate(pu.contexts):
         result += indent + "writeContextSeparator\n"
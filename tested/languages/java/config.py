@@ -17,7 +17,13 @@ from tested.languages.conventionalize import (
     NamingConventions,
     submission_file,
 )
-from tested.languages.utils import jvm_cleanup_stacktrace, jvm_memory_limit
+from tested.languages.utils import (
+    jvm_class_data_sharing,
+    jvm_cleanup_stacktrace,
+    jvm_memory_limit,
+    jvm_secret_variables,
+    jvm_unit_runner,
+)
 from tested.serialisation import Statement, Value
 
 if TYPE_CHECKING:
@@ -127,7 +133,26 @@ class Java(Language):
     def execution(self, cwd: Path, file: str, arguments: list[str]) -> Command:
         assert self.config
         limit = jvm_memory_limit(self.config)
-        return ["java", f"-Xmx{limit}", "-cp", ".", Path(file).stem, *arguments]
+        sharing = jvm_class_data_sharing(self.config, "java")
+        return [
+            "java",
+            f"-Xmx{limit}",
+            *sharing,
+            "-cp",
+            ".",
+            Path(file).stem,
+            *arguments,
+        ]
+
+    def toolchain(self) -> list[str]:
+        return ["javac", "java"]
+
+    def unit_runner(self) -> Command | None:
+        assert self.config
+        return jvm_unit_runner(self.config, "java")
+
+    def secret_variables(self, cwd: Path, secrets: dict[str, str]) -> dict[str, str]:
+        return jvm_secret_variables(cwd, secrets)
 
     def linter(self, remaining: float) -> tuple[list[Message], list[AnnotateCode]]:
         # Import locally to prevent errors.
@@ -215,3 +240,6 @@ class Java(Language):
         assert self.config
         the_source = self.config.dodona.source.read_text()
         return re.search(regex, the_source) is not None
+
+    def generation_uses_submission(self) -> bool:
+        return True
@@ -15,6 +15,11 @@ from tested.datatypes import (
     resolve_to_basic,
 )
 from tested.languages.preparation import (
+    CONTEXT_SEPARATOR_VARIABLE,
+    EXCEPTION_FILE_VARIABLE,
+    SECRETS_FILE_VARIABLE,
+    TESTCASE_SEPARATOR_VARIABLE,
+    VALUE_FILE_VARIABLE,
     PreparedContext,
     PreparedExecutionUnit,
     PreparedFunctionCall,
@@ -323,17 +328,29 @@ def convert_execution_unit(pu: PreparedExecutionUnit) -> str:
     
         private final PrintWriter valueWriter;
         private final PrintWriter exceptionWriter;
+        private final String testcaseSeparator;
+        private final String contextSeparator;
     
         public {pu.unit.name}() throws Exception {{
-            this.valueWriter = new PrintWriter("{pu.value_file}");
-            this.exceptionWriter = new PrintWriter("{pu.exception_file}");
+            // Read the secrets and remove them before the submission is executed.
+            var secretsFile = new File(System.getProperty("{SECRETS_FILE_VARIABLE}", System.getenv("{SECRETS_FILE_VARIABLE}")));
+            var secrets = new Properties();
+            try (var reader = new InputStreamReader(new FileInputStream(secretsFile), "UTF-8")) {{
+                secrets.load(reader);
+            }}
+            secretsFile.delete();
+            System.clearProperty("{SECRETS_FILE_VARIABLE}");
+            this.valueWriter = new PrintWriter(secrets.getProperty("{VALUE_FILE_VARIABLE}"));
+            this.exceptionWriter = new PrintWriter(secrets.getProperty("{EXCEPTION_FILE_VARIABLE}"));
+            this.testcaseSeparator = secrets.getProperty("{TESTCASE_SEPARATOR_VARIABLE}");
+            this.contextSeparator = secrets.getProperty("{CONTEXT_SEPARATOR_VARIABLE}");
         }}
         
         private void writeSeparator() throws Exception {{
-            valueWriter.write("--{pu.testcase_separator_secret}-- SEP");
-            exceptionWriter.write("--{pu.testcase_separator_secret}-- SEP");
-            System.err.print("--{pu.testcase_separator_secret}-- SEP");
-            System.out.print("--{pu.testcase_separator_secret}-- SEP");
+            valueWriter.write(testcaseSeparator);
+            exceptionWriter.write(testcaseSeparator);
+            System.err.print(testcaseSeparator);
+            System.out.print(testcaseSeparator);
             valueWriter.flush();
             exceptionWriter.flush();
             System.err.flush();
@@ -341,10 +358,10 @@ def convert_execution_unit(pu: PreparedExecutionUnit) -> str:
         }}
         
         private void writeContextSeparator() throws Exception {{
-            valueWriter.write("--{pu.context_separator_secret}-- SEP");
-            exceptionWriter.write("--{pu.context_separator_secret}-- SEP");
-            System.err.print("--{pu.context_separator_secret}-- SEP");
-            System.out.print("--{pu.context_separator_secret}-- SEP");
+            valueWriter.write(contextSeparator);
+            exceptionWriter.write(contextSeparator);
+            System.err.print(contextSeparator);
+            System.out.print(contextSeparator);
             valueWriter.flush();
             exceptionWriter.flush();
             System.err.flush();
@@ -0,0 +1,123 @@
+import java.io.*;
+import java.lang.reflect.InvocationTargetException;
+import java.net.URL;
+import java.net.URLClassLoader;
+import java.nio.charset.StandardCharsets;
+import java.util.Arrays;
+
+/**
+ * Executes the execution units of a judgement in one JVM (see tested/judge/runner.py).
+ *
+ * Each request is read from stdin, one field per line: the directory of the unit,
+ * the main class, the argument (or an empty line), the file with stdin (or an empty
+ * line), the files for stdout and stderr, the timeout in milliseconds, the number
+ * of system properties and the properties themselves (as NAME=VALUE). The reply is
+ * one line with the exit code of the unit, or "timeout".
+ *
+ * Each unit is loaded by its own class loader, so the static state of a unit is not
+ * shared with other units.
+ */
+public class UnitRunner {
+
+    private static final PrintStream DISCARD = new PrintStream(OutputStream.nullOutputStream());
+
+    // How long a unit gets to stop after it is interrupted, in milliseconds.
+    private static final long GRACE = 1000;
+
+    public static void main(String[] args) throws Exception {
+        var requests = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        var replies = System.out;
+        // Output of threads that outlive their unit must not end up in the replies.
+        System.setOut(DISCARD);
+        System.setErr(DISCARD);
+        System.setIn(InputStream.nullInputStream());
+
+        String directory;
+        while ((directory = requests.readLine()) != null) {
+            String mainClass = requests.readLine();
+            String argument = requests.readLine();
+            String stdin = requests.readLine();
+            String stdout = requests.readLine();
+            String stderr = requests.readLine();
+            long timeout = Long.parseLong(requests.readLine());
+            int properties = Integer.parseInt(requests.readLine());
+            for (int i = 0; i < properties; i++) {
+                String property = requests.readLine();
+                int split = property.indexOf('=');
+                System.setProperty(property.substring(0, split), property.substring(split + 1));
+            }
+            String[] arguments = argument.isEmpty() ? new String[0] : new String[]{argument};
+
+            String reply = run(directory, mainClass, arguments, stdin, stdout, stderr, timeout);
+            replies.println(reply);
+            replies.flush();
+            if (reply.equals("timeout")) {
+                // The unit might still be running, so this JVM cannot be reused.
+                Runtime.getRuntime().halt(1);
+            }
+        }
+    }
+
+    /**
+     * Execute one unit.
+     *
+     * @return The exit code of the unit, or "timeout".
+     */
+    private static String run(String directory, String mainClass, String[] arguments, String stdin,
+                              String stdout, String stderr, long timeout) throws Exception {
+        var url = new File(directory).toURI().toURL();
+        try (var loader = new URLClassLoader(new URL[]{url}, ClassLoader.getSystemClassLoader());
+             var in = stdin.isEmpty() ? InputStream.nullInputStream() : new FileInputStream(stdin);
+             var out = new PrintStream(new BufferedOutputStream(new FileOutputStream(stdout)), true);
+             var err = new PrintStream(new BufferedOutputStream(new FileOutputStream(stderr)), true)) {
+            var failure = new Throwable[1];
+            var unit = new Thread(() -> {
+                try {
+                    Class<?> main = Class.forName(mainClass, true, loader);
+                    main.getMethod("main", String[].class).invoke(null, (Object) arguments);
+                } catch (InvocationTargetException e) {
+                    failure[0] = e.getCause();
+                } catch (Throwable e) {
+                    failure[0] = e;
+                }
+            }, "main");
+            unit.setContextClassLoader(loader);
+
+            System.setIn(in);
+            System.setOut(out);
+            System.setErr(err);
+            try {
+                unit.start();
+                unit.join(timeout);
+                if (unit.isAlive()) {
+                    unit.interrupt();
+                    unit.join(GRACE);
+                    return "timeout";
+                }
+            } finally {
+                System.setIn(InputStream.nullInputStream());
+                System.setOut(DISCARD);
+                System.setErr(DISCARD);
+            }
+
+            if (failure[0] == null) {
+                return "0";
+            }
+            // Like the JVM does for an uncaught exception, without the frames of the runner.
+            trim(failure[0], mainClass);
+            err.print("Exception in thread \"main\" ");
+            failure[0].printStackTrace(err);
+            return "1";
+        }
+    }
+
+    private static void trim(Throwable failure, String mainClass) {
+        StackTraceElement[] trace = failure.getStackTrace();
+        for (int i = trace.length - 1; i >= 0; i--) {
+            if (trace[i].getClassName().equals(mainClass)) {
+                failure.setStackTrace(Arrays.copyOf(trace, i + 1));
+                return;
+            }
+        }
+    }
+}
@@ -0,0 +1,90 @@
+// Analyse a submission in one Node process, instead of one process for each step:
+// - the identifiers declared by the submission (which the judge exports),
+// - if the submission is valid, once these identifiers are exported,
+// - optionally, the results of ESLint (null if ESLint cannot be loaded).
+//
+// Usage: node analyse.js <submission> [<ESLint config file>]
+// The results are printed as JSON.
+require('module').enableCompileCache?.();
+const fs = require('fs');
+const vm = require('vm');
+
+const [submission, eslintConfig] = process.argv.slice(2);
+const source = fs.readFileSync(submission, 'utf-8');
+
+function mapSubTreeToIds(subtree) {
+    const type = subtree.type;
+    if (type === 'VariableDeclaration') {
+        return subtree.declarations.map(row => row.id);
+    } else if (type === 'FunctionDeclaration' || type === 'ClassDeclaration') {
+        return [subtree.id];
+    } else if (type === 'ExpressionStatement' &&
+               subtree.expression.type === 'AssignmentExpression') {
+        return [subtree.expression.left];
+    } else {
+        return [];
+    }
+}
+
+function mapIdToName(id) {
+    const type = id.type;
+    if (type === 'Identifier') {
+        return id.name;
+    } else if (type === 'ArrayPattern') {
+        return id.elements.flatMap(mapIdToName);
+    } else if (type === 'ObjectPattern') {
+        return id.properties.map(d => d.key).flatMap(mapIdToName);
+    } else {
+        return [];
+    }
+}
+
+function findIdentifiers() {
+    const { parse } = require('abstract-syntax-tree');
+    // Add next option to support more javascript features
+    const ast = parse(source, {next: true}).body;
+    // Use Set to remove duplicates
+    return Array.from(new Set(ast.flatMap(mapSubTreeToIds).flatMap(mapIdToName)));
+}
+
+// Check the syntax like "node --check" does, with the CommonJS module wrapper.
+function isValid(code) {
+    try {
+        vm.compileFunction(code, ['exports', 'require', 'module', '__filename', '__dirname'], {
+            filename: submission
+        });
+        return true;
+    } catch (e) {
+        return false;
+    }
+}
+
+async function lint() {
+    let ESLint;
+    try {
+        ({ ESLint } = require('eslint'));
+    } catch (e) {
+        return null;
+    }
+    const eslint = new ESLint({overrideConfigFile: eslintConfig, allowInlineConfig: false});
+    return await eslint.lintFiles([submission]);
+}
+
+async function main() {
+    let identifiers = null;
+    try {
+        identifiers = findIdentifiers();
+    } catch (e) {
+        // The syntax check reports the error.
+    }
+    // This is the submission as modified by the judge.
+    const exports = `module.exports = {${(identifiers ?? []).join(', ')}};`;
+    const modified = `"use strict";\n\n${source}\n${exports}\n`;
+    const results = {identifiers, valid: isValid(modified)};
+    if (eslintConfig) {
+        results.eslint = await lint();
+    }
+    console.log(JSON.stringify(results));
+}
+
+main();
@@ -1,7 +1,8 @@
+import json
 import logging
 import re
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Optional
 
 from tested.datatypes import AllTypes, BasicStringTypes, ExpressionTypes
 from tested.dodona import AnnotateCode, Message
@@ -23,12 +24,52 @@ from tested.languages.utils import cleanup_description
 from tested.serialisation import Statement, Value
 
 if TYPE_CHECKING:
+    from tested.configs import GlobalConfig
     from tested.languages.generation import PreparedExecutionUnit
 
 logger = logging.getLogger(__name__)
 
 
 class JavaScript(Language):
+    def __init__(self, config: Optional["GlobalConfig"]):
+        super().__init__(config)
+        self._analysis: dict[str, Any] | None = None
+
+    def analyse(self, remaining: float | None = None, lint: bool = False) -> dict:
+        """
+        Analyse the submission with analyse.js, which finds the declared
+        identifiers, checks the syntax and optionally runs ESLint in one process.
+        The analysis is done once for each judgement.
+
+        :param remaining: The max amount of time.
+        :param lint: If the analysis should include the results of ESLint.
+        :return: The analysis, or an empty dictionary if it failed.
+        """
+        # import local to prevent errors
+        from tested.judge.utils import run_command
+        from tested.languages.javascript.linter import eslint_config_path
+
+        assert self.config
+        if self._analysis is not None and (not lint or "eslint" in self._analysis):
+            return self._analysis
+
+        submission = self.config.dodona.source
+        command = [
+            "node",
+            str(Path(__file__).parent / "analyse.js"),
+            str(submission.absolute()),
+        ]
+        if lint:
+            command.append(eslint_config_path(self.config.dodona))
+        output = run_command(submission.parent, timeout=remaining, command=command)
+        try:
+            assert output is not None
+            self._analysis = json.loads(output.stdout)
+        except (AssertionError, ValueError):
+            logger.warning(f"Could not analyse the submission: {output}")
+            self._analysis = dict()
+        return self._analysis
+
     def initial_dependencies(self) -> list[str]:
         return ["values.js"]
 
@@ -59,6 +100,7 @@ class JavaScript(Language):
             Construct.EVALUATION,
             Construct.DEFAULT_PARAMETERS,
             Construct.GLOBAL_VARIABLES,
+            Construct.TIMING,
         }
 
     def datatype_support(self) -> dict[AllTypes, TypeSupport]:
@@ -112,6 +154,9 @@ class JavaScript(Language):
         submission = submission_file(self)
         main_file = list(filter(lambda x: x == submission, files))
         if main_file:
+            if self._analysis and self._analysis.get("valid"):
+                # The syntax was already checked by the analysis.
+                return [], files
             return ["node", "--check", main_file[0]], files
         else:
             return [], files
@@ -119,25 +164,15 @@ class JavaScript(Language):
     def execution(self, cwd: Path, file: str, arguments: list[str]) -> Command:
         return ["node", file, *arguments]
 
-    def modify_solution(self, solution: Path):
-        # import local to prevent errors
-        from tested.judge.utils import run_command
+    def toolchain(self) -> list[str]:
+        return ["node"]
 
+    def modify_solution(self, solution: Path):
         assert self.config
 
-        parse_file = str(Path(__file__).parent / "parseAst.js")
-        try:
-            output = run_command(
-                solution.parent,
-                timeout=None,
-                command=["node", parse_file, str(solution.absolute())],
-            )
-            if output:
-                namings = output.stdout.strip()
-                with open(solution, "a") as file:
-                    print(f"\nmodule.exports = {{{namings}}};", file=file)
-        except TimeoutError:
-            pass
+        namings = ", ".join(self.analyse().get("identifiers") or [])
+        with open(solution, "a") as file:
+            print(f"\nmodule.exports = {{{namings}}};", file=file)
 
         # Add strict mode to the script.
         with open(solution, "r") as file:
@@ -151,7 +186,8 @@ class JavaScript(Language):
         from tested.languages.javascript import linter
 
         assert self.config
-        return linter.run_eslint(self.config.dodona, remaining)
+        analysis = self.analyse(remaining, lint=True)
+        return linter.run_eslint(self.config.dodona, remaining, analysis.get("eslint"))
 
     def cleanup_stacktrace(self, traceback: str) -> str:
         assert self.config
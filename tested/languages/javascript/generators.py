@@ -13,6 +13,13 @@ from tested.datatypes import (
 )
 from tested.languages.conventionalize import submission_file
 from tested.languages.preparation import (
+    CONTEXT_SEPARATOR_VARIABLE,
+    EXCEPTION_FILE_VARIABLE,
+    SECRET_VARIABLES,
+    TESTCASE_SEPARATOR_VARIABLE,
+    TIMED_VALUE,
+    TIMING_FILE_VARIABLE,
+    VALUE_FILE_VARIABLE,
     PreparedContext,
     PreparedExecutionUnit,
     PreparedTestcase,
@@ -127,7 +134,9 @@ def convert_statement(statement: Statement, internal=False, full=False) -> str:
     raise AssertionError(f"Unknown statement: {statement!r}")
 
 
-def _generate_internal_context(ctx: PreparedContext, pu: PreparedExecutionUnit) -> str:
+def _generate_internal_context(
+    ctx: PreparedContext, pu: PreparedExecutionUnit, index: int
+) -> str:
     result = ctx.before + "\n"
 
     # Import the submission if there is no main call.
@@ -163,19 +172,37 @@ def _generate_internal_context(ctx: PreparedContext, pu: PreparedExecutionUnit)
             result += f"let {tc.input.statement.variable}\n"
 
         result += "try {\n"
+        if tc.is_timed():
+            result += " " * 4 + "startTiming();\n"
         if tc.testcase.is_main_testcase():
             assert isinstance(tc.input, MainInput)
             result += f"""
                 delete require.cache[require.resolve("./{pu.submission_name}.js")];
                 const {pu.submission_name} = require("./{pu.submission_name}.js");
             """
+        elif (
+            isinstance(tc.input, PreparedTestcaseStatement)
+            and tc.is_timed()
+            and tc.input.value_function
+        ):
+            # Do not include sending the value in the measured time.
+            unwrapped = convert_statement(tc.input.unwrapped_input_statement())
+            sent = convert_statement(tc.input.input_statement(TIMED_VALUE))
+            result += f"""
+                const {TIMED_VALUE} = {unwrapped};
+                stopTiming({index}, {i});
+                {sent};
+            """
         else:
             assert isinstance(tc.input, PreparedTestcaseStatement)
             result += " " * 4 + convert_statement(tc.input.input_statement()) + ";\n"
 
+        stop = f"stopTiming({index}, {i});" if tc.is_timed() else ""
         result += f"""
+            {stop}
             {convert_statement(tc.exception_statement())};
         }} catch(e) {{
+            {stop}
             {convert_statement(tc.exception_statement("e"))};
         }}
         """
@@ -187,6 +214,7 @@ def _generate_internal_context(ctx: PreparedContext, pu: PreparedExecutionUnit)
 
 def convert_execution_unit(pu: PreparedExecutionUnit) -> str:
     result = """
+    require("module").enableCompileCache?.();
     const fs = require('fs');
     const values = require("./values.js");
     """
@@ -196,22 +224,30 @@ def convert_execution_unit(pu: PreparedExecutionUnit) -> str:
         result += f'const {name} = require("./{name}.js");\n'
 
     # We now open files for results and define some functions.
+    # The files are only written by the harness, so they are buffered and flushed
+    # at the start of each context (and when the process exits).
+    flush_timing = "timingFile.flush();" if pu.has_timed_testcases() else ""
     result += f"""
-    const valueFile = fs.openSync("{pu.value_file}", "w");
-    const exceptionFile = fs.openSync("{pu.exception_file}", "w");
+    const valueFile = new values.BufferedWriter(fs.openSync(process.env.{VALUE_FILE_VARIABLE}, "w"));
+    const exceptionFile = new values.BufferedWriter(fs.openSync(process.env.{EXCEPTION_FILE_VARIABLE}, "w"));
+    const testcaseSeparator = process.env.{TESTCASE_SEPARATOR_VARIABLE};
+    const contextSeparator = process.env.{CONTEXT_SEPARATOR_VARIABLE};
     
     function writeSeparator() {{
-        fs.writeSync(valueFile, "--{pu.testcase_separator_secret}-- SEP");
-        fs.writeSync(exceptionFile, "--{pu.testcase_separator_secret}-- SEP");
-        fs.writeSync(process.stdout.fd, "--{pu.testcase_separator_secret}-- SEP");
-        fs.writeSync(process.stderr.fd, "--{pu.testcase_separator_secret}-- SEP");
+        valueFile.write(testcaseSeparator);
+        exceptionFile.write(testcaseSeparator);
+        fs.writeSync(process.stdout.fd, testcaseSeparator);
+        fs.writeSync(process.stderr.fd, testcaseSeparator);
     }}
     
     function writeContextSeparator() {{
-        fs.writeSync(valueFile, "--{pu.context_separator_secret}-- SEP");
-        fs.writeSync(exceptionFile, "--{pu.context_separator_secret}-- SEP");
-        fs.writeSync(process.stdout.fd, "--{pu.context_separator_secret}-- SEP");
-        fs.writeSync(process.stderr.fd, "--{pu.context_separator_secret}-- SEP");
+        valueFile.write(contextSeparator);
+        exceptionFile.write(contextSeparator);
+        valueFile.flush();
+        exceptionFile.flush();
+        {flush_timing}
+        fs.writeSync(process.stdout.fd, contextSeparator);
+        fs.writeSync(process.stderr.fd, contextSeparator);
     }}
     
     async function sendValue(value) {{
@@ -231,12 +267,39 @@ def convert_execution_unit(pu: PreparedExecutionUnit) -> str:
     }}
     """
 
+    if pu.has_timed_testcases():
+        result += f"""
+        const timingFile = new values.BufferedWriter(fs.openSync(process.env.{TIMING_FILE_VARIABLE}, "w"));
+        let timingStart = null;
+
+        function startTiming() {{
+            timingStart = [process.hrtime.bigint(), process.cpuUsage()];
+        }}
+
+        function stopTiming(context, testcase) {{
+            if (timingStart !== null) {{
+                const wall = Number(process.hrtime.bigint() - timingStart[0]) / 1e9;
+                const usage = process.cpuUsage(timingStart[1]);
+                const cpu = (usage.user + usage.system) / 1e6;
+                timingFile.write(`${{context}} ${{testcase}} ${{wall}} ${{cpu}}\\n`);
+                timingStart = null;
+            }}
+        }}
+        """
+
+    result += f"""
+    // Remove the secrets before the submission is executed.
+    for (const name of {json.dumps(SECRET_VARIABLES)}) {{
+        delete process.env[name];
+    }}
+    """
+
     # Generate code for each context.
     ctx: PreparedContext
     for i, ctx in enumerate(pu.contexts):
         result += f"""
         async function context{i}() {{
-            {_generate_internal_context(ctx, pu)}
+            {_generate_internal_context(ctx, pu, i)}
         }}
         """
 
@@ -250,10 +313,12 @@ def convert_execution_unit(pu: PreparedExecutionUnit) -> str:
         """
 
     result += """
-        fs.closeSync(valueFile);
-        fs.closeSync(exceptionFile);
-    })();
+        valueFile.close();
+        exceptionFile.close();
     """
+    if pu.has_timed_testcases():
+        result += "timingFile.close();\n"
+    result += "})();\n"
 
     return result
 
@@ -11,14 +11,10 @@ logger = logging.getLogger(__name__)
 severity = [Severity.INFO, Severity.WARNING, Severity.ERROR]
 
 
-def run_eslint(
-    config: DodonaConfig, remaining: float
-) -> tuple[list[Message], list[AnnotateCode]]:
+def eslint_config_path(config: DodonaConfig) -> str:
     """
-    Calls eslint to annotate submitted source code and adds resulting score and
-    annotations to tab.
+    Get the path of the ESLint configuration file used for the exercise.
     """
-    submission = config.source
     language_options = config.config_for()
     if path := language_options.get("eslint_config", None):
         assert isinstance(path, str)
@@ -26,42 +22,56 @@ def run_eslint(
     else:
         # Use the default file.
         config_path = config.judge / "tested/languages/javascript/eslintrc.yml"
-    config_path = str(config_path.absolute())
+    return str(config_path.absolute())
+
+
+def run_eslint(
+    config: DodonaConfig, remaining: float, eslint_objects: list | None = None
+) -> tuple[list[Message], list[AnnotateCode]]:
+    """
+    Calls eslint to annotate submitted source code and adds resulting score and
+    annotations to tab.
 
-    execution_results = run_command(
-        directory=submission.parent,
-        timeout=remaining,
-        command=[
-            "eslint",
-            "-f",
-            "json",
-            "--no-inline-config",
-            "-c",
-            config_path,
-            str(submission.absolute()),
-        ],
-    )
+    :param eslint_objects: The results of ESLint, if they are already known (see
+                           JavaScript.analyse). Otherwise, ESLint is executed.
+    """
+    submission = config.source
+    if eslint_objects is None:
+        execution_results = run_command(
+            directory=submission.parent,
+            timeout=remaining,
+            command=[
+                "eslint",
+                "-f",
+                "json",
+                "--no-inline-config",
+                "-c",
+                eslint_config_path(config),
+                str(submission.absolute()),
+            ],
+        )
 
-    if execution_results is None:
-        return [], []
+        if execution_results is None:
+            return [], []
 
-    if execution_results.timeout or execution_results.memory:
-        return [
-            get_i18n_string("languages.javascript.linter.timeout")
-            if execution_results.timeout
-            else get_i18n_string("languages.javascript.linter.memory")
-        ], []
+        if execution_results.timeout or execution_results.memory:
+            return [
+                get_i18n_string("languages.javascript.linter.timeout")
+                if execution_results.timeout
+                else get_i18n_string("languages.javascript.linter.memory")
+            ], []
 
-    try:
-        eslint_objects = json.loads(execution_results.stdout)
-    except Exception as e:
-        logger.warning("ESLint produced bad output", exc_info=e)
-        return [
-            get_i18n_string("languages.javascript.linter.output"),
-            ExtendedMessage(
-                description=str(e), format="code", permission=Permission.STAFF
-            ),
-        ], []
+        try:
+            eslint_objects = json.loads(execution_results.stdout)
+        except Exception as e:
+            logger.warning("ESLint produced bad output", exc_info=e)
+            return [
+                get_i18n_string("languages.javascript.linter.output"),
+                ExtendedMessage(
+                    description=str(e), format="code", permission=Permission.STAFF
+                ),
+            ], []
+    assert eslint_objects is not None
     annotations = []
 
     for eslint_object in eslint_objects:
@@ -92,9 +92,53 @@ function encode(value) {
 
 }
 
+// Buffers the text written to a file descriptor, so it is written with fewer
+// system calls. The text is written when flushing, when the buffer is full and
+// when the process exits.
+class BufferedWriter {
+    constructor(fd, size = 65536) {
+        this.fd = fd;
+        this.size = size;
+        this.chunks = [];
+        this.length = 0;
+        process.on("exit", () => this.flush());
+    }
+
+    write(text) {
+        this.chunks.push(text);
+        this.length += text.length;
+        if (this.length >= this.size) {
+            this.flush();
+        }
+    }
+
+    flush() {
+        if (this.chunks.length > 0 && this.fd !== null) {
+            fs.writeSync(this.fd, this.chunks.join(""));
+            this.chunks = [];
+            this.length = 0;
+        }
+    }
+
+    close() {
+        this.flush();
+        fs.closeSync(this.fd);
+        this.fd = null;
+    }
+}
+
+// Write to a file descriptor or a BufferedWriter.
+function write(stream, text) {
+    if (stream instanceof BufferedWriter) {
+        stream.write(text);
+    } else {
+        fs.writeSync(stream, text);
+    }
+}
+
 // Send a value to the given stream.
 function sendValue(stream, value) {
-    fs.writeSync(stream, JSON.stringify(encode(value)));
+    write(stream, JSON.stringify(encode(value)));
 }
 
 // Send an exception to the given stream.
@@ -104,7 +148,7 @@ function sendException(stream, exception) {
     }
     if (exception instanceof Error) {
         // We have a proper error...
-        fs.writeSync(stream, JSON.stringify({
+        write(stream, JSON.stringify({
             "message": exception.message,
             "stacktrace": exception.stack ?? "",
             "type": exception.constructor.name
@@ -114,14 +158,14 @@ function sendException(stream, exception) {
         // TODO: remove this once the semester is over
         // noinspection PointlessBooleanExpressionJS
         if (typeof exception === 'object') {
-            fs.writeSync(stream, JSON.stringify({
+            write(stream, JSON.stringify({
                 "message": exception.message ?? "",
                 "stacktrace": "",
                 "type": exception.name ?? ""
             }));
         } else {
             // We have something else, so we cannot rely on stuff being present.
-            fs.writeSync(stream, JSON.stringify({
+            write(stream, JSON.stringify({
                 "message": JSON.stringify(exception),
                 "stacktrace": "",
                 "type": exception.constructor.name ?? (Object.prototype.toString.call(exception)),
@@ -133,9 +177,10 @@ function sendException(stream, exception) {
 
 // Send an evaluation result to the given stream.
 function sendEvaluated(stream, result) {
-    fs.writeSync(stream, JSON.stringify(result));
+    write(stream, JSON.stringify(result));
 }
 
+exports.BufferedWriter = BufferedWriter;
 exports.sendValue = sendValue;
 exports.sendException = sendException;
 exports.sendEvaluated = sendEvaluated;
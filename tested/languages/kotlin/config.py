@@ -1,6 +1,8 @@
+import functools
 import logging
 import os
 import re
+import shutil
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -20,7 +22,13 @@ from tested.languages.conventionalize import (
     conventionalize_namespace,
     submission_file,
 )
-from tested.languages.utils import jvm_cleanup_stacktrace, jvm_memory_limit
+from tested.languages.utils import (
+    jvm_class_data_sharing,
+    jvm_cleanup_stacktrace,
+    jvm_memory_limit,
+    jvm_secret_variables,
+    jvm_unit_runner,
+)
 from tested.serialisation import Statement, Value
 
 if TYPE_CHECKING:
@@ -35,6 +43,25 @@ def get_executable(name):
     return name
 
 
+@functools.cache
+def kotlin_runtime_classpath() -> list[str] | None:
+    """
+    Get the JAR files the kotlin launcher puts on the classpath: the standard
+    library and the reflection library of the installed Kotlin compiler.
+
+    :return: The JAR files, or None if they cannot be found.
+    """
+    launcher = shutil.which(get_executable("kotlin"))
+    if launcher is None:
+        return None
+    library = Path(os.path.realpath(launcher)).parent.parent / "lib"
+    if not (library / "kotlin-stdlib.jar").is_file():
+        logger.warning(f"Kotlin standard library not found in {library}")
+        return None
+    jars = [library / "kotlin-stdlib.jar", library / "kotlin-reflect.jar"]
+    return [str(jar) for jar in jars if jar.is_file()]
+
+
 class Kotlin(Language):
     def initial_dependencies(self) -> list[str]:
         return ["Values.kt", "EvaluationResult.kt"]
@@ -147,15 +174,48 @@ class Kotlin(Language):
     def execution(self, cwd: Path, file: str, arguments: list[str]) -> Command:
         assert self.config
         limit = jvm_memory_limit(self.config)
+        runtime = kotlin_runtime_classpath()
+        if runtime is None:
+            # Fall back to the launcher, which finds the libraries itself.
+            sharing = jvm_class_data_sharing(self.config, "kotlin")
+            return [
+                get_executable("kotlin"),
+                f"-J-Xmx{limit}",
+                *(f"-J{option}" for option in sharing),
+                "-cp",
+                ".",
+                Path(file).stem,
+                *arguments,
+            ]
+        # Starting the JVM directly avoids the launcher script.
+        sharing = jvm_class_data_sharing(self.config, "kotlin", runtime)
         return [
-            get_executable("kotlin"),
-            f"-J-Xmx{limit}",
+            "java",
+            f"-Xmx{limit}",
+            *sharing,
             "-cp",
-            ".",
+            os.pathsep.join([*runtime, "."]),
             Path(file).stem,
             *arguments,
         ]
 
+    def toolchain(self) -> list[str]:
+        tools = [get_executable("kotlinc"), get_executable("kotlin")]
+        if kotlin_runtime_classpath() is not None:
+            # The submission is executed by the JVM directly (see execution).
+            tools.append("java")
+        return tools
+
+    def unit_runner(self) -> Command | None:
+        assert self.config
+        runtime = kotlin_runtime_classpath()
+        if runtime is None:
+            return None
+        return jvm_unit_runner(self.config, "kotlin", runtime)
+
+    def secret_variables(self, cwd: Path, secrets: dict[str, str]) -> dict[str, str]:
+        return jvm_secret_variables(cwd, secrets)
+
     def modify_solution(self, solution: Path):
         with open(solution, "r") as file:
             contents = file.read()
@@ -15,6 +15,11 @@ from tested.datatypes import (
     resolve_to_basic,
 )
 from tested.languages.preparation import (
+    CONTEXT_SEPARATOR_VARIABLE,
+    EXCEPTION_FILE_VARIABLE,
+    SECRETS_FILE_VARIABLE,
+    TESTCASE_SEPARATOR_VARIABLE,
+    VALUE_FILE_VARIABLE,
     PreparedContext,
     PreparedExecutionUnit,
     PreparedFunctionCall,
@@ -270,14 +275,24 @@ import java.math.BigDecimal
 
 class {pu.unit.name}: AutoCloseable {{
 
-    private val valueWriter = PrintWriter("{pu.value_file}")
-    private val exceptionWriter = PrintWriter("{pu.exception_file}")
+    // Read the secrets and remove them before the submission is executed.
+    private val secrets = java.util.Properties().also {{ properties ->
+        val file = java.io.File(System.getProperty("{SECRETS_FILE_VARIABLE}", System.getenv("{SECRETS_FILE_VARIABLE}")))
+        file.reader(Charsets.UTF_8).use {{ properties.load(it) }}
+        file.delete()
+        System.clearProperty("{SECRETS_FILE_VARIABLE}")
+    }}
+
+    private val valueWriter = PrintWriter(secrets.getProperty("{VALUE_FILE_VARIABLE}"))
+    private val exceptionWriter = PrintWriter(secrets.getProperty("{EXCEPTION_FILE_VARIABLE}"))
+    private val testcaseSeparator = secrets.getProperty("{TESTCASE_SEPARATOR_VARIABLE}")
+    private val contextSeparator = secrets.getProperty("{CONTEXT_SEPARATOR_VARIABLE}")
     
     private fun writeSeparator() {{
-        valueWriter.write("--{pu.testcase_separator_secret}-- SEP")
-        exceptionWriter.write("--{pu.testcase_separator_secret}-- SEP")
-        System.err.print("--{pu.testcase_separator_secret}-- SEP")
-        System.out.print("--{pu.testcase_separator_secret}-- SEP")
+        valueWriter.write(testcaseSeparator)
+        exceptionWriter.write(testcaseSeparator)
+        System.err.print(testcaseSeparator)
+        System.out.print(testcaseSeparator)
         valueWriter.flush()
         exceptionWriter.flush()
         System.err.flush()
@@ -285,10 +300,10 @@ class {pu.unit.name}: AutoCloseable {{
     }}
     
     private fun writeContextSeparator() {{
-        valueWriter.write("--{pu.context_separator_secret}-- SEP")
-        exceptionWriter.write("--{pu.context_separator_secret}-- SEP")
-        System.err.print("--{pu.context_separator_secret}-- SEP")
-        System.out.print("--{pu.context_separator_secret}-- SEP")
+        valueWriter.write(contextSeparator)
+        exceptionWriter.write(contextSeparator)
+        System.err.print(contextSeparator)
+        System.out.print(contextSeparator)
         valueWriter.flush()
         exceptionWriter.flush()
         System.err.flush()
@@ -56,6 +56,31 @@ SEND_EXCEPTION = "send_exception"
 SEND_SPECIFIC_VALUE = "send_specific_value"
 SEND_SPECIFIC_EXCEPTION = "send_specific_exception"
 
+# Names of the environment variables through which the generated code receives the
+# secrets at runtime. Keeping them out of the generated code means the code only
+# depends on the test suite and the language, so it can be reused.
+TESTCASE_SEPARATOR_VARIABLE = "TESTED_TESTCASE_SEPARATOR"
+CONTEXT_SEPARATOR_VARIABLE = "TESTED_CONTEXT_SEPARATOR"
+VALUE_FILE_VARIABLE = "TESTED_VALUE_FILE"
+EXCEPTION_FILE_VARIABLE = "TESTED_EXCEPTION_FILE"
+TIMING_FILE_VARIABLE = "TESTED_TIMING_FILE"
+# Languages that cannot remove environment variables receive the secrets in a file
+# instead, which the generated code removes after reading it.
+SECRETS_FILE_VARIABLE = "TESTED_SECRETS_FILE"
+# The generated code removes these variables after reading them, before the
+# submission is executed, so neither the submission nor the processes it starts
+# can read the secrets.
+SECRET_VARIABLES = [
+    TESTCASE_SEPARATOR_VARIABLE,
+    CONTEXT_SEPARATOR_VARIABLE,
+    VALUE_FILE_VARIABLE,
+    EXCEPTION_FILE_VARIABLE,
+    TIMING_FILE_VARIABLE,
+]
+
+# The name of the variable holding the return value of a timed testcase.
+TIMED_VALUE = "timed"
+
 
 @define
 class PreparedFunctionCall(FunctionCall):
@@ -144,6 +169,16 @@ class PreparedTestcase:
         else:
             return self.exception_function(NothingType())
 
+    def is_timed(self) -> bool:
+        """
+        Check if the time needed for the testcase must be measured. The time
+        is measured for the statement or expression of the testcase, and is written
+        to the timing file as one line: the index of the context in the execution
+        unit, the index of the testcase in the context, the wall time and the
+        processor time (both in seconds).
+        """
+        return self.testcase.output.time != IgnoredChannel.IGNORED
+
 
 @define
 class PreparedContext:
@@ -171,22 +206,17 @@ class PreparedExecutionUnit:
     unit: "PlannedExecutionUnit"
     # A list of prepared contexts.
     contexts: list[PreparedContext]
-    # The name of the file for the return channel.
-    value_file: str
-    # The name of the file for the exception channel.
-    exception_file: str
     # The name of the submission file.
     submission_name: str
-    # The secret context separator.
-    context_separator_secret: str
-    # The secret testcase separator.
-    testcase_separator_secret: str
     # The names of the language-specific functions we will need.
     evaluator_names: set[str]
     # The language module.
     # TODO: this should not go here, but it does.
     language: "Language"
 
+    def has_timed_testcases(self) -> bool:
+        return any(tc.is_timed() for ctx in self.contexts for tc in ctx.testcases)
+
 
 def prepare_argument(
     bundle: Bundle, argument: Expression | NamedArgument
@@ -461,11 +491,12 @@ def prepare_context(
     """
     language = bundle.config.programming_language
     resources = bundle.config.resources
+    cache = bundle.resource_cache
     before_code = context.before.get(language, TextData(data="")).get_data_as_string(
-        resources
+        resources, cache
     )
     after_code = context.after.get(language, TextData(data="")).get_data_as_string(
-        resources
+        resources, cache
     )
     testcases, evaluator_names = prepare_testcases(bundle, context)
     return (
@@ -502,16 +533,68 @@ def exception_file(bundle: Bundle, directory: Path):
     return directory / f"{bundle.testcase_separator_secret}_exceptions.txt"
 
 
+def timing_file(bundle: Bundle, directory: Path):
+    """
+    Return the path to the timing file. The file will be placed inside the given
+    working directory.
+
+    :param bundle: The configuration bundle.
+    :param directory: The directory in which to place the file.
+
+    :return: The path to the file, depending on the working directory.
+    """
+    return directory / f"{bundle.testcase_separator_secret}_timings.txt"
+
+
+def testcase_separator(bundle: Bundle) -> str:
+    """
+    Return the separator the generated code writes between testcases.
+
+    :param bundle: The configuration bundle.
+    """
+    return f"--{bundle.testcase_separator_secret}-- SEP"
+
+
+def context_separator(bundle: Bundle) -> str:
+    """
+    Return the separator the generated code writes between contexts.
+
+    :param bundle: The configuration bundle.
+    """
+    return f"--{bundle.context_separator_secret}-- SEP"
+
+
+def secret_environment(bundle: Bundle, directory: Path) -> dict[str, str]:
+    """
+    Get the environment variables the generated code needs at runtime. These
+    contain the secret separators and the names of the files for the return,
+    exception and time channels.
+
+    :param bundle: The configuration bundle.
+    :param directory: The directory in which the execution takes place.
+
+    :return: A mapping of environment variable names to their values.
+    """
+    return {
+        TESTCASE_SEPARATOR_VARIABLE: testcase_separator(bundle),
+        CONTEXT_SEPARATOR_VARIABLE: context_separator(bundle),
+        VALUE_FILE_VARIABLE: value_file(bundle, directory).name,
+        EXCEPTION_FILE_VARIABLE: exception_file(bundle, directory).name,
+        TIMING_FILE_VARIABLE: timing_file(bundle, directory).name,
+    }
+
+
 def prepare_execution_unit(
     bundle: Bundle,
-    destination: Path,
     execution_unit: "PlannedExecutionUnit",
 ) -> PreparedExecutionUnit:
     """
     Prepare an execution unit for code generation.
 
+    The prepared unit does not contain the secrets: these are passed to the
+    generated code at runtime (see secret_environment).
+
     :param bundle: The configuration bundle.
-    :param destination: Where the generated files should go.
     :param execution_unit: The execution for which generation is happening.
 
     :return: The name of the generated file in the given destination and a set
@@ -524,16 +607,10 @@ def prepare_execution_unit(
         contexts.append(context_args)
         evaluator_names.update(context_evaluator_names)
 
-    value_file_name = value_file(bundle, destination).name
-    exception_file_name = exception_file(bundle, destination).name
     submission = submission_name(bundle.language)
 
     return PreparedExecutionUnit(
-        value_file=value_file_name,
-        exception_file=exception_file_name,
         submission_name=submission,
-        testcase_separator_secret=bundle.testcase_separator_secret,
-        context_separator_secret=bundle.context_separator_secret,
         contexts=contexts,
         unit=execution_unit,
         evaluator_names=evaluator_names,
@@ -64,6 +64,7 @@ class Python(Language):
             Construct.EVALUATION,
             Construct.DEFAULT_PARAMETERS,
             Construct.GLOBAL_VARIABLES,
+            Construct.TIMING,
         }
 
     def datatype_support(self) -> dict[AllTypes, TypeSupport]:
@@ -128,7 +129,12 @@ class Python(Language):
         ], result
 
     def execution(self, cwd: Path, file: str, arguments: list[str]) -> Command:
-        return [_executable(), "-u", file, *arguments]
+        # The harness flushes the output at the separators, so the output of the
+        # submission is buffered in between.
+        return [_executable(), file, *arguments]
+
+    def toolchain(self) -> list[str]:
+        return [_executable()]
 
     def compiler_output(
         self, stdout: str, stderr: str
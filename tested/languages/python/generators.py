@@ -11,6 +11,13 @@ from tested.datatypes import (
     BasicStringTypes,
 )
 from tested.languages.preparation import (
+    CONTEXT_SEPARATOR_VARIABLE,
+    EXCEPTION_FILE_VARIABLE,
+    SECRET_VARIABLES,
+    TESTCASE_SEPARATOR_VARIABLE,
+    TIMED_VALUE,
+    TIMING_FILE_VARIABLE,
+    VALUE_FILE_VARIABLE,
     PreparedContext,
     PreparedExecutionUnit,
     PreparedFunctionCall,
@@ -139,6 +146,8 @@ def convert_execution_unit(pu: PreparedExecutionUnit) -> str:
     result = """
 import values
 import sys
+import os
+import atexit
 import importlib
 from decimal import Decimal
 import builtins
@@ -150,8 +159,10 @@ import builtins
 
     # We now open files for results and define some functions.
     result += f"""
-value_file = open("{pu.value_file}", "w")
-exception_file = open("{pu.exception_file}", "w")
+value_file = open(os.environ["{VALUE_FILE_VARIABLE}"], "w")
+exception_file = open(os.environ["{EXCEPTION_FILE_VARIABLE}"], "w")
+testcase_separator = os.environ["{TESTCASE_SEPARATOR_VARIABLE}"]
+context_separator = os.environ["{CONTEXT_SEPARATOR_VARIABLE}"]
 
 
 # Overwrite the input function
@@ -162,25 +173,36 @@ builtins.input = _our_input
 
 
 def write_separator():
-    value_file.write("--{pu.testcase_separator_secret}-- SEP")
-    exception_file.write("--{pu.testcase_separator_secret}-- SEP")
-    sys.stderr.write("--{pu.testcase_separator_secret}-- SEP")
-    sys.stdout.write("--{pu.testcase_separator_secret}-- SEP")
+    value_file.write(testcase_separator)
+    exception_file.write(testcase_separator)
+    sys.stderr.write(testcase_separator)
+    sys.stdout.write(testcase_separator)
     sys.stdout.flush()
     sys.stderr.flush()
     value_file.flush()
     exception_file.flush()
 
 def write_context_separator():
-    value_file.write("--{pu.context_separator_secret}-- SEP")
-    exception_file.write("--{pu.context_separator_secret}-- SEP")
-    sys.stderr.write("--{pu.context_separator_secret}-- SEP")
-    sys.stdout.write("--{pu.context_separator_secret}-- SEP")
+    value_file.write(context_separator)
+    exception_file.write(context_separator)
+    sys.stderr.write(context_separator)
+    sys.stdout.write(context_separator)
     sys.stdout.flush()
     sys.stderr.flush()
     value_file.flush()
     exception_file.flush()
 
+def flush_output():
+    for file in (sys.stdout, sys.stderr, value_file, exception_file):
+        try:
+            file.flush()
+        except (OSError, ValueError):
+            pass
+
+# The output is not flushed on each write, so also flush it if the submission
+# exits the unit before the next separator.
+atexit.register(flush_output)
+
 def send_value(value):
     values.send_value(value_file, value)
 
@@ -192,6 +214,33 @@ def send_specific_value(value):
 
 def send_specific_exception(exception):
     values.send_evaluated(exception_file, exception)
+"""
+
+    if pu.has_timed_testcases():
+        result += f"""
+import time
+timing_file = open(os.environ["{TIMING_FILE_VARIABLE}"], "w")
+timing_start = None
+
+def start_timing():
+    global timing_start
+    timing_start = (time.perf_counter(), time.process_time())
+
+def stop_timing(context, testcase):
+    global timing_start
+    if timing_start is not None:
+        wall = time.perf_counter() - timing_start[0]
+        cpu = time.process_time() - timing_start[1]
+        timing_file.write(f"{{context}} {{testcase}} {{wall!r}} {{cpu!r}}\\n")
+        timing_file.flush()
+        timing_start = None
+"""
+
+    result += f"""
+# Remove the secrets before the submission is executed.
+for name in {SECRET_VARIABLES!r}:
+    os.environ.pop(name, None)
+
 """
 
     # Generate code for each context.
@@ -223,11 +272,25 @@ def send_specific_exception(exception):
                 result += indent + "write_separator()\n"
 
             result += indent + "try:\n"
+            if tc.is_timed():
+                result += indent * 2 + "start_timing()\n"
             if tc.testcase.is_main_testcase():
                 assert isinstance(tc.input, MainInput)
                 result += f"{indent*2}import {pu.submission_name}\n"
                 if i != 0:
                     result += f'{indent*2}importlib.reload(sys.modules["{pu.submission_name}"])\n'
+            elif (
+                isinstance(tc.input, PreparedTestcaseStatement)
+                and tc.is_timed()
+                and tc.input.value_function
+            ):
+                # Do not include sending the value in the measured time.
+                unwrapped = tc.input.unwrapped_input_statement()
+                timed = convert_statement(unwrapped, True)
+                result += f"{indent*2}{TIMED_VALUE} = {timed}\n"
+                result += f"{indent*2}stop_timing({i}, {j})\n"
+                sent = tc.input.input_statement(TIMED_VALUE)
+                result += indent * 2 + convert_statement(sent, True) + "\n"
             else:
                 assert isinstance(tc.input, PreparedTestcaseStatement)
                 result += (
@@ -237,8 +300,12 @@ def send_specific_exception(exception):
                 )
 
             result += indent + "except Exception as e:\n"
+            if tc.is_timed():
+                result += f"{indent*2}stop_timing({i}, {j})\n"
             result += indent * 2 + convert_statement(tc.exception_statement("e")) + "\n"
             result += indent + "else:\n"
+            if tc.is_timed():
+                result += f"{indent*2}stop_timing({i}, {j})\n"
             result += indent * 2 + convert_statement(tc.exception_statement()) + "\n"
 
         result += indent + ctx.after + "\n"
@@ -251,6 +318,8 @@ def send_specific_exception(exception):
 value_file.close()
 exception_file.close()
 """
+    if pu.has_timed_testcases():
+        result += "timing_file.close()\n"
 
     return result
 
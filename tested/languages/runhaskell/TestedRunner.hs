@@ -0,0 +1,55 @@
+-- | Runs the units of a judgement in one GHCi session (see ghci_runner.py).
+module TestedRunner (ready, runUnit) where
+
+import Control.Exception (SomeException, displayException, fromException, try)
+import GHC.IO.Handle (hDuplicate, hDuplicateTo)
+import System.Directory (getCurrentDirectory, setCurrentDirectory)
+import System.Environment (setEnv, withArgs)
+import System.Exit (ExitCode (..))
+import System.IO
+import System.Timeout (timeout)
+
+reply :: String -> String -> IO ()
+reply marker message = putStrLn (marker ++ " " ++ message) >> hFlush stdout
+
+-- | Reply if the main function of the unit and this module are loaded.
+ready :: IO () -> String -> IO ()
+ready main marker = main `seq` reply marker "ready"
+
+-- | Run the main function of a unit in its directory, with the arguments, the
+-- environment variables and the files for stdin, stdout and stderr of the unit.
+-- The reply is the exit code of the unit, or "timeout" if it took longer than the
+-- limit (in microseconds).
+runUnit :: IO () -> String -> [String] -> [(String, String)] -> Maybe FilePath
+        -> FilePath -> FilePath -> FilePath -> Int -> String -> IO ()
+runUnit main name args variables input output errors directory limit marker = do
+    mapM_ (uncurry setEnv) variables
+    saved <- mapM hDuplicate [stdin, stdout, stderr]
+    previous <- getCurrentDirectory
+    inHandle <- maybe (openFile "/dev/null" ReadMode) (`openFile` ReadMode) input
+    outHandle <- openFile output WriteMode
+    errHandle <- openFile errors WriteMode
+    hDuplicateTo inHandle stdin
+    hDuplicateTo outHandle stdout
+    hDuplicateTo errHandle stderr
+    setCurrentDirectory directory
+
+    result <- timeout limit (try (withArgs args main) :: IO (Either SomeException ()))
+    code <- case result of
+        Nothing -> return "timeout"
+        Just (Right ()) -> return "0"
+        Just (Left e) -> case fromException e of
+            Just ExitSuccess -> return "0"
+            Just (ExitFailure n) -> return (show n)
+            Nothing -> do
+                -- Like the runtime does for an uncaught exception.
+                hPutStrLn stderr (name ++ ": " ++ displayException e)
+                return "1"
+
+    hFlush stdout
+    hFlush stderr
+    setCurrentDirectory previous
+    let restore original handle = hDuplicateTo original handle >> hClose original
+    sequence_ (zipWith restore saved [stdin, stdout, stderr])
+    mapM_ hClose [inHandle, outHandle, errHandle]
+    reply marker code
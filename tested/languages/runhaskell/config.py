@@ -1,3 +1,5 @@
+import shutil
+import sys
 from pathlib import Path
 
 from tested.languages.config import CallbackResult, Command
@@ -17,6 +19,14 @@ class RunHaskell(Haskell):
     def execution(self, cwd: Path, file: str, arguments: list[str]) -> Command:
         return ["runhaskell", file, *arguments]
 
+    def toolchain(self) -> list[str]:
+        return ["runhaskell", "ghc"]
+
+    def unit_runner(self) -> Command | None:
+        if shutil.which("ghci") is None:
+            return None
+        return [sys.executable, str(Path(__file__).parent / "ghci_runner.py")]
+
     def filter_dependencies(self, files: list[str], context_name: str) -> list[str]:
         return files
 
@@ -0,0 +1,181 @@
+"""
+Execute the units of a judgement in one GHCi session (see tested.judge.runner for
+the protocol). This script is not part of the judge itself: it is executed as a
+separate process.
+
+The modules of the harness and the submission (all modules of a unit, except its
+main module) are copied to one directory, which is the only search path of GHCi,
+and loaded once. For each unit, only its main module is added (with ``:add``),
+after which TestedRunner.runUnit runs its main function. The other modules are
+only copied and loaded again if they are different (e.g. when each unit is
+compiled separately). Top-level values are not retained between units (see
+``:set +r``), so the units do not share state.
+
+If the modules cannot be loaded, the script stops, so the judge executes the units
+with runhaskell instead.
+
+Usage: python ghci_runner.py [ghci executable]
+"""
+import hashlib
+import secrets
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+RUNNER_MODULE = Path(__file__).parent / "TestedRunner.hs"
+
+
+def haskell_string(text: str) -> str:
+    """
+    Convert a string to a Haskell string literal.
+    """
+    escaped = "".join(
+        c if c.isascii() and c.isprintable() and c not in '"\\' else f"\\{ord(c)}\\&"
+        for c in text
+    )
+    return f'"{escaped}"'
+
+
+def haskell_list(items: list[str]) -> str:
+    return "[" + ", ".join(items) + "]"
+
+
+def _source_hash(files: list[Path]) -> str:
+    digest = hashlib.sha256()
+    for file in files:
+        digest.update(file.name.encode())
+        digest.update(file.read_bytes())
+    return digest.hexdigest()
+
+
+class Session:
+    def __init__(self, ghci: str):
+        self.marker = f"tested-{secrets.token_hex(8)}"
+        self.process = subprocess.Popen(
+            [ghci, "-ignore-dot-ghci", "-v0", "-w"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        # The directory with the modules that are shared by the units.
+        self.shared = Path(tempfile.mkdtemp(prefix="tested-ghci-"))
+        self.shared_hash: str | None = None
+        # The main modules of the units that were added, with their files.
+        self.units: dict[str, Path] = dict()
+        self.send(':set prompt ""')
+        self.send(':set prompt-cont ""')
+        self.send(":set +r")
+
+    def close(self):
+        shutil.rmtree(self.shared, ignore_errors=True)
+
+    def send(self, command: str):
+        assert self.process.stdin is not None
+        self.process.stdin.write(command + "\n")
+        self.process.stdin.flush()
+
+    def read_reply(self) -> str | None:
+        assert self.process.stdout is not None
+        for line in self.process.stdout:
+            if line.startswith(self.marker + " "):
+                return line[len(self.marker) + 1 :].strip()
+        return None
+
+    def load(self, directory: Path, module: str) -> bool:
+        """
+        Load the main module of a unit, and the modules it uses if they changed.
+
+        :return: If the modules are loaded.
+        """
+        main_file = directory / f"{module}.hs"
+        others = sorted(f for f in directory.glob("*.hs") if f != main_file)
+        digest = _source_hash(others)
+        added = self.units.get(module)
+        if digest != self.shared_hash or (added is not None and added != main_file):
+            for file in self.shared.glob("*.hs"):
+                file.unlink()
+            for file in others:
+                shutil.copy2(file, self.shared / file.name)
+            self.send(":set -i")
+            self.send(f":set -i{self.shared}")
+            self.send(f":load {haskell_string(str(RUNNER_MODULE))}")
+            self.shared_hash = digest
+            self.units.clear()
+        if module not in self.units:
+            self.send(f":add {haskell_string(str(main_file))}")
+            self.units[module] = main_file
+        self.send(f"import qualified {module}")
+        self.send("import qualified TestedRunner")
+        self.send(f"TestedRunner.ready {module}.main {haskell_string(self.marker)}")
+        # If the previous line fails, this is the first reply.
+        self.send(f"putStrLn {haskell_string(self.marker + ' loaded')}")
+        if self.read_reply() != "ready":
+            self.shared_hash = None
+            return False
+        self.read_reply()
+        return True
+
+    def run(
+        self,
+        directory: Path,
+        module: str,
+        arguments: list[str],
+        variables: list[tuple[str, str]],
+        stdin: str,
+        stdout: str,
+        stderr: str,
+        timeout: int,
+    ) -> str | None:
+        name = haskell_string(f"{module}.hs")
+        args = haskell_list([haskell_string(a) for a in arguments])
+        env = haskell_list(
+            [f"({haskell_string(k)}, {haskell_string(v)})" for k, v in variables]
+        )
+        input_ = f"(Just {haskell_string(stdin)})" if stdin else "Nothing"
+        self.send(
+            f"TestedRunner.runUnit {module}.main {name} {args} {env} {input_} "
+            f"{haskell_string(stdout)} {haskell_string(stderr)} "
+            f"{haskell_string(str(directory))} {timeout * 1000} "
+            f"{haskell_string(self.marker)}"
+        )
+        return self.read_reply()
+
+
+def main():
+    session = Session(sys.argv[1] if len(sys.argv) > 1 else "ghci")
+    try:
+        serve(session)
+    finally:
+        session.close()
+
+
+def serve(session: Session):
+    while directory := sys.stdin.readline().rstrip("\n"):
+        module, argument, stdin, stdout, stderr, timeout, size = (
+            sys.stdin.readline().rstrip("\n") for _ in range(7)
+        )
+        variables = [
+            tuple(sys.stdin.readline().rstrip("\n").split("=", 1))
+            for _ in range(int(size))
+        ]
+        if not session.load(Path(directory), module):
+            sys.exit(1)
+        reply = session.run(
+            Path(directory),
+            module,
+            [argument] if argument else [],
+            variables,
+            stdin,
+            stdout,
+            stderr,
+            int(timeout),
+        )
+        if reply is None:
+            sys.exit(1)
+        print(reply, flush=True)
+
+
+if __name__ == "__main__":
+    main()
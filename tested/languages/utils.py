@@ -1,15 +1,23 @@
+import hashlib
 import html
 import logging
 import os
 import re
+import shutil
+import subprocess
+import tempfile
+import zipfile
 from pathlib import Path
 from typing import TYPE_CHECKING, overload
 
-from tested.configs import GlobalConfig
+from tested.configs import DodonaConfig, GlobalConfig
 from tested.datatypes import BasicStringTypes
 from tested.dodona import ExtendedMessage, Permission
 from tested.languages.conventionalize import submission_name
-from tested.languages.preparation import PreparedTestcaseStatement
+from tested.languages.preparation import (
+    SECRETS_FILE_VARIABLE,
+    PreparedTestcaseStatement,
+)
 from tested.serialisation import FunctionCall, StringType
 
 if TYPE_CHECKING:
@@ -34,6 +42,300 @@ def jvm_memory_limit(config: GlobalConfig) -> int:
     return limit
 
 
+# The JDK classes used by the harness for Java and Kotlin. These are added to the
+# default class list of the JDK when creating a class-data sharing archive.
+JVM_HARNESS_CLASSES = [
+    "java/io/PrintWriter",
+    "java/io/StringWriter",
+    "java/lang/reflect/Array",
+    "java/math/BigDecimal",
+    "java/math/BigInteger",
+    "java/math/MathContext",
+    "java/math/RoundingMode",
+    "java/util/ArrayList",
+    "java/util/HashMap",
+    "java/util/HashSet",
+    "java/util/LinkedHashMap",
+    "java/util/LinkedHashSet",
+    "java/util/stream/Collectors",
+    "java/util/stream/ReferencePipeline",
+]
+
+# The archives that could not be created in this process, to not try again.
+_failed_archives: set[Path] = set()
+
+
+def _jdk_home() -> Path | None:
+    java = shutil.which("java")
+    if java is None:
+        return None
+    return Path(os.path.realpath(java)).parent.parent
+
+
+def _jdk_version(home: Path) -> str | None:
+    try:
+        release = (home / "release").read_text()
+    except OSError:
+        return None
+    match = re.search(r'^JAVA_VERSION="([^"]+)"', release, re.MULTILINE)
+    return match.group(1) if match else None
+
+
+def jvm_shared_archive(
+    directory: Path, name: str, classpath: list[str] | None = None
+) -> Path | None:
+    """
+    Get a class-data sharing (CDS) archive for the JDK that is used, and create
+    it if needed.
+
+    The archive contains the default classes of the JDK, the JDK classes used by
+    the harness, and all classes of the given classpath (which must only contain
+    JAR files). Since the archive does not contain the classes in the working
+    directory, it is independent of the exercise, and is created once for each
+    version of the JDK.
+
+    :param directory: The directory where the archives are kept.
+    :param name: The name of the archive (e.g. the programming language).
+    :param classpath: The JAR files to add to the archive. The JVM can only use
+                      the archive if its classpath starts with the same files.
+
+    :return: The archive, or None if there is no archive.
+    """
+    classpath = classpath or []
+    home = _jdk_home()
+    version = _jdk_version(home) if home else None
+    if home is None or version is None:
+        _logger.debug("Not using a CDS archive, as the JDK version is unknown.")
+        return None
+
+    digest = hashlib.sha256(str(home).encode())
+    for entry in classpath:
+        digest.update(b"\0")
+        digest.update(entry.encode())
+    archive = directory / f"{name}-{version}-{digest.hexdigest()[:16]}.jsa"
+    if archive.exists():
+        return archive
+    if archive in _failed_archives:
+        return None
+
+    _logger.info(f"Creating CDS archive {archive}")
+    classes = set(JVM_HARNESS_CLASSES)
+    try:
+        classes.update((home / "lib" / "classlist").read_text().split())
+    except OSError:
+        pass
+    for jar in classpath:
+        with zipfile.ZipFile(jar) as contents:
+            for entry_name in contents.namelist():
+                if entry_name.endswith(".class") and "META-INF" not in entry_name:
+                    classes.add(entry_name.removesuffix(".class"))
+
+    directory.mkdir(parents=True, exist_ok=True)
+    # Create the archive under another name first, so concurrent judgements
+    # never use a partially written archive.
+    with tempfile.TemporaryDirectory(dir=directory) as temporary:
+        class_list = Path(temporary, "classlist")
+        class_list.write_text("\n".join(sorted(classes)) + "\n")
+        created = Path(temporary, archive.name)
+        command = [
+            "java",
+            "-Xshare:dump",
+            f"-XX:SharedClassListFile={class_list}",
+            f"-XX:SharedArchiveFile={created}",
+        ]
+        if classpath:
+            command.extend(["-cp", os.pathsep.join(classpath)])
+        try:
+            process = subprocess.run(command, capture_output=True, timeout=120)
+            created_ok = process.returncode == 0 and created.exists()
+        except (OSError, subprocess.TimeoutExpired):
+            created_ok = False
+        if not created_ok:
+            _logger.warning(f"Could not create CDS archive {archive}")
+            _failed_archives.add(archive)
+            return None
+        os.replace(created, archive)
+    return archive
+
+
+def jvm_class_data_sharing(
+    config: GlobalConfig, name: str, classpath: list[str] | None = None
+) -> list[str]:
+    """
+    Get the options for the JVM to use a class-data sharing archive (see
+    jvm_shared_archive), which reduces the startup time of the JVM.
+
+    :param config: The configuration.
+    :param name: The name of the archive (e.g. the programming language).
+    :param classpath: The JAR files at the start of the classpath of the JVM.
+
+    :return: The options, which are empty if no archive is used.
+    """
+    directory = config.dodona.jvm_cache
+    if directory is None:
+        return []
+    archive = jvm_shared_archive(Path(directory), name, classpath)
+    if archive is None:
+        return []
+    return ["-Xshare:auto", f"-XX:SharedArchiveFile={archive}"]
+
+
+# The folder in the resources of an exercise where prepared harnesses are stored.
+HARNESS_FOLDER = ".tested"
+# The folder with the compiled harness files of a prepared exercise.
+COMPILED_HARNESS_FOLDER = "compiled"
+
+# The harnesses that could not be compiled in this process, to not try again.
+_failed_harnesses: set[Path] = set()
+
+
+def prepared_harness_cache(config: DodonaConfig) -> Path:
+    """
+    Get the directory with the compiled harness files of a prepared exercise (see
+    tested.prepare), which are used if no cache for them is configured.
+    """
+    if config.harness_cache is not None:
+        folder = Path(config.harness_cache)
+    else:
+        folder = Path(config.resources) / HARNESS_FOLDER
+    return folder / COMPILED_HARNESS_FOLDER
+
+
+def compiled_harness(
+    directory: Path,
+    name: str,
+    sources: list[Path],
+    commands: list[list[str]],
+    create: bool = True,
+) -> Path | None:
+    """
+    Get a directory with the harness files compiled by the given commands, and
+    create it if needed.
+
+    The directory contains the sources, together with the files created by the
+    commands (e.g. object files). The harness files do not depend on the exercise,
+    so they are compiled once for each compiler and each set of commands, and are
+    shared by all judgements.
+
+    :param directory: The directory where the harnesses are kept.
+    :param name: The start of the name of the harness directory (e.g. the
+                 programming language and the version of the compiler).
+    :param sources: The source files of the harness.
+    :param commands: The commands compiling the harness, which are executed in
+                     parallel in a directory with the sources.
+    :param create: If the harness is compiled if it does not exist yet.
+
+    :return: The directory, or None if there is no compiled harness.
+    """
+    digest = hashlib.sha256()
+    for command in commands:
+        executable = shutil.which(command[0])
+        if executable is None:
+            return None
+        digest.update(os.path.realpath(executable).encode())
+        for argument in command[1:]:
+            digest.update(b"\0")
+            digest.update(argument.encode())
+        digest.update(b"\1")
+    for source in sources:
+        digest.update(b"\0")
+        digest.update(source.name.encode())
+        digest.update(source.read_bytes())
+    harness = directory / f"{name}-{digest.hexdigest()[:16]}"
+    if harness.exists():
+        return harness
+    if not create or harness in _failed_harnesses:
+        return None
+
+    _logger.info(f"Compiling harness {harness}")
+    directory.mkdir(parents=True, exist_ok=True)
+    # Compile the harness in another directory first, so concurrent judgements
+    # never use a partially compiled harness.
+    with tempfile.TemporaryDirectory(dir=directory) as temporary:
+        created = Path(temporary, harness.name)
+        created.mkdir()
+        for source in sources:
+            shutil.copy2(source, created)
+        try:
+            processes = [
+                subprocess.Popen(
+                    command,
+                    cwd=created,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
+                for command in commands
+            ]
+        except OSError:
+            processes = None
+        created_ok = processes is not None
+        for process in processes or []:
+            try:
+                created_ok = process.wait(timeout=120) == 0 and created_ok
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+                created_ok = False
+        if not created_ok:
+            _logger.warning(f"Could not compile harness {harness}")
+            _failed_harnesses.add(harness)
+            return None
+        try:
+            os.replace(created, harness)
+        except OSError:
+            # Another judgement created the harness in the meantime.
+            if not harness.exists():
+                return None
+    return harness
+
+
+# The file with the secrets of a unit for the JVM.
+JVM_SECRETS_FILE = ".tested_secrets.properties"
+
+
+def jvm_secret_variables(cwd: Path, secrets: dict[str, str]) -> dict[str, str]:
+    """
+    Write the secrets to a properties file, since the JVM cannot remove variables
+    from its environment. The generated code removes the file after reading it.
+
+    :param cwd: The directory in which the execution takes place.
+    :param secrets: The secret variables.
+
+    :return: The variable with the name of the file.
+    """
+    file = cwd.resolve() / JVM_SECRETS_FILE
+    lines = []
+    for name, value in secrets.items():
+        escaped = value.replace("\\", "\\\\").replace("\n", "\\n").replace("\r", "\\r")
+        lines.append(f"{name}={escaped}\n")
+    file.write_text("".join(lines), encoding="utf-8")
+    return {SECRETS_FILE_VARIABLE: str(file)}
+
+
+# The program executing the units of a judgement in one JVM.
+JVM_UNIT_RUNNER = Path(__file__).parent / "java" / "templates" / "UnitRunner.java"
+
+
+def jvm_unit_runner(
+    config: GlobalConfig, name: str, classpath: list[str] | None = None
+) -> list[str]:
+    """
+    Get the command to execute the units of a judgement in one JVM (see
+    tested.judge.runner). The runner is launched from its source file, so it
+    does not need to be compiled with the submission.
+
+    :param config: The configuration.
+    :param name: The name of the class-data sharing archive.
+    :param classpath: The JAR files the units need, which are shared by all units.
+    """
+    limit = jvm_memory_limit(config)
+    sharing = jvm_class_data_sharing(config, name, classpath)
+    command = ["java", f"-Xmx{limit}", *sharing]
+    if classpath:
+        command += ["-cp", os.pathsep.join(classpath)]
+    return [*command, str(JVM_UNIT_RUNNER)]
+
+
 # Idea and original code: dodona/judge-pythia
 def jvm_cleanup_stacktrace(stacktrace_str: str, submission_filename: str) -> str:
     context_file_regex = re.compile(r"(Context[0-9]+|Selector)")
@@ -19,6 +19,7 @@ from tested.testsuite import (
     SpecialOutputChannel,
     Testcase,
     TextBuiltin,
+    TimeOutputChannel,
     ValueBuiltin,
 )
 
@@ -41,6 +42,7 @@ def get_oracle(
         programmed,
         specific,
         text,
+        timing,
         value,
     )
 
@@ -58,6 +60,8 @@ def get_oracle(
         return currier(ignored.evaluate)
     if isinstance(output, ExitCodeOutputChannel):
         return currier(exitcode.evaluate)
+    if isinstance(output, TimeOutputChannel):
+        return currier(timing.evaluate)
 
     assert hasattr(output, "oracle")
 
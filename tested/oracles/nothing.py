@@ -57,7 +57,7 @@ def evaluate_no_return(
             messages=[message],
         )
 
-    type_check, _, content_check = compare_values(config, value, expected)
+    type_check, _, content_check, _ = compare_values(config, value, expected)
     if type_check and content_check:
         return OracleResult(
             result=StatusMessage(enum=Status.CORRECT),
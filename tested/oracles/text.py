@@ -1,13 +1,25 @@
 """
 Evaluators for text.
 """
+import itertools
 import math
-from typing import Any
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator
+from typing import IO, Any
 
 from tested.dodona import Status, StatusMessage
 from tested.internationalization import get_i18n_string
+from tested.languages.generation import TRUNCATION_MARKER
 from tested.oracles.common import OracleConfig, OracleResult
 from tested.testsuite import FileOutputChannel, OutputChannel, TextOutputChannel
+from tested.utils import MMAP_THRESHOLD
+
+# In full mode, large files are compared in chunks of this many characters.
+_CHUNK_SIZE = 2048
+# The number of lines (in line mode) or chunks (in full mode) that are shown before
+# and after the first difference in large files.
+_CONTEXT = {"line": 3, "full": 1}
 
 
 def _is_number(string: str) -> float | None:
@@ -41,7 +53,12 @@ def _file_defaults(config: OracleConfig) -> dict:
     return defaults
 
 
-def compare_text(options: dict[str, Any], expected: str, actual: str) -> OracleResult:
+def match_text(options: dict[str, Any], expected: str, actual: str) -> tuple[bool, str]:
+    """
+    Check if two strings match, according to the options of the text oracle.
+
+    :return: If the strings match, and the expected string for the feedback.
+    """
     # Temporary variables that may modified by the evaluation options,
     # Don't modify the actual values, otherwise there maybe confusion with the
     # solution submitted by the student
@@ -69,9 +86,14 @@ def compare_text(options: dict[str, Any], expected: str, actual: str) -> OracleR
     else:
         result = actual_eval == expected_eval
 
+    return result, str(expected)
+
+
+def compare_text(options: dict[str, Any], expected: str, actual: str) -> OracleResult:
+    result, readable_expected = match_text(options, expected, actual)
     return OracleResult(
         result=StatusMessage(enum=Status.CORRECT if result else Status.WRONG),
-        readable_expected=str(expected),
+        readable_expected=readable_expected,
         readable_actual=str(actual),
     )
 
@@ -95,11 +117,147 @@ def evaluate_text(
     assert isinstance(channel, TextOutputChannel)
     options = _text_options(config)
 
-    expected = channel.get_data_as_string(config.bundle.config.resources)
+    bundle = config.bundle
+    expected = channel.get_data_as_string(
+        bundle.config.resources, bundle.resource_cache
+    )
     result = compare_text(options, expected, actual)
     return result
 
 
+def _pieces(file: IO[str], mode: str) -> Iterator[str]:
+    if mode == "line":
+        # Files only split at newlines, while str.splitlines also splits at other
+        # line boundaries (e.g. form feeds).
+        for line in file:
+            yield from line.splitlines(keepends=True)
+    else:
+        while piece := file.read(_CHUNK_SIZE):
+            yield piece
+
+
+def _pieces_match(
+    options: dict[str, Any], mode: str, expected: str | None, actual: str | None
+) -> bool:
+    if expected is None or actual is None:
+        return False
+    if expected == actual and not options["tryFloatingPoint"]:
+        return True
+    if mode == "line":
+        if options.get("stripNewlines", False):
+            expected, actual = expected.splitlines()[0], actual.splitlines()[0]
+        return match_text(options, expected, actual)[0]
+    if options["caseInsensitive"]:
+        expected, actual = expected.lower(), actual.lower()
+    return expected == actual
+
+
+def _only_whitespace_follows(
+    options: dict[str, Any],
+    expected: str | None,
+    actual: str | None,
+    rest: Iterable[str],
+) -> bool:
+    """
+    Check if the files only differ in trailing whitespace, given the first pieces
+    that are different and the remaining pieces of both files.
+    """
+    expected, actual = expected or "", actual or ""
+    if options["caseInsensitive"]:
+        expected, actual = expected.lower(), actual.lower()
+    common = len(os.path.commonprefix([expected, actual]))
+    if expected[common:].strip() or actual[common:].strip():
+        return False
+    return all(not piece.strip() for piece in rest)
+
+
+def _excerpt(
+    skipped: bool,
+    before: Iterable[str],
+    piece: str | None,
+    rest: Iterator[str],
+    context: int,
+) -> str:
+    parts = [f"{TRUNCATION_MARKER}\n"] if skipped else []
+    parts.extend(before)
+    if piece is not None:
+        parts.append(piece)
+    parts.extend(itertools.islice(rest, context))
+    if next(rest, None) is not None:
+        if parts and not parts[-1].endswith("\n"):
+            parts.append("\n")
+        parts.append(TRUNCATION_MARKER)
+    return "".join(parts)
+
+
+def compare_files(
+    options: dict[str, Any], mode: str, expected_file: IO[str], actual_file: IO[str]
+) -> tuple[bool, str, str]:
+    """
+    Compare two files, line by line or in chunks, until the first difference.
+
+    The ``tryFloatingPoint`` option is applied to each line in ``line`` mode. It is
+    not supported in ``full`` mode, where such files are compared in memory (see
+    evaluate_file).
+
+    :param options: The options of the oracle.
+    :param mode: The mode of the oracle (``full`` or ``line``).
+    :param expected_file: The file with the expected contents.
+    :param actual_file: The file with the actual contents.
+
+    :return: If the files match, and excerpts of the expected and actual file
+             around the first difference (or the end of the files).
+    """
+    expected_pieces = _pieces(expected_file, mode)
+    actual_pieces = _pieces(actual_file, mode)
+    context = _CONTEXT[mode]
+    expected_before: deque[str] = deque(maxlen=context)
+    actual_before: deque[str] = deque(maxlen=context)
+    skipped = False
+    correct = True
+    expected = actual = None
+    for expected, actual in itertools.zip_longest(expected_pieces, actual_pieces):
+        if _pieces_match(options, mode, expected, actual):
+            skipped = skipped or len(expected_before) == context
+            expected_before.append(expected)
+            actual_before.append(actual)
+            expected = actual = None
+            continue
+        if mode == "full" and options["ignoreWhitespace"]:
+            expected_rest, expected_pieces = itertools.tee(expected_pieces)
+            actual_rest, actual_pieces = itertools.tee(actual_pieces)
+            correct = _only_whitespace_follows(
+                options,
+                expected,
+                actual,
+                itertools.chain(expected_rest, actual_rest),
+            )
+        else:
+            correct = False
+        break
+
+    return (
+        correct,
+        _excerpt(skipped, expected_before, expected, expected_pieces, context),
+        _excerpt(skipped, actual_before, actual, actual_pieces, context),
+    )
+
+
+def _compare_lines(options: dict[str, Any], expected: str, actual: str) -> bool:
+    strip_newlines = options.get("stripNewlines", False)
+    expected_lines = expected.splitlines(keepends=not strip_newlines)
+    actual_lines = actual.splitlines(keepends=not strip_newlines)
+    if len(actual_lines) != len(expected_lines):
+        return False
+    for expected_line, actual_line in zip(expected_lines, actual_lines):
+        # Identical lines match, unless they are compared as numbers (e.g. "nan").
+        if expected_line == actual_line and not options["tryFloatingPoint"]:
+            continue
+        if not match_text(options, expected_line, actual_line)[0]:
+            return False
+    return True
+
+
 def evaluate_file(
     config: OracleConfig, channel: OutputChannel, actual: str
 ) -> OracleResult:
@@ -116,9 +274,17 @@ def evaluate_file(
     all parameters of that oracle.
 
     When no mode is passed, the oracle will default to ``full``.
+
+    Large files (see MMAP_THRESHOLD), or files larger than the limit for readable
+    values (see Options.readable_limit), are compared without reading them
+    completely, stopping at the first difference. The feedback then only contains
+    the contents around the first difference. In ``full`` mode, this is not done if
+    ``tryFloatingPoint`` is used.
     """
     assert isinstance(channel, FileOutputChannel)
     options = _text_options(config)
+    mode = options.get("mode", "full")
+    assert mode in ("full", "line")
 
     # There must be nothing as output.
     if actual:
@@ -133,42 +299,59 @@ def evaluate_file(
             messages=[message],
         )
 
-    expected_path = f"{config.bundle.config.resources}/{channel.expected_path}"
-
+    bundle = config.bundle
+    cache = bundle.resource_cache
+    expected_path = channel.get_expected_file(bundle.config.resources)
     try:
-        with open(expected_path, "r") as file:
-            expected = file.read()
+        expected_size = os.path.getsize(expected_path)
     except FileNotFoundError:
-        raise ValueError(f"File {expected_path} not found in resources.")
+        raise ValueError(f"File {channel.expected_path} not found in resources.")
 
     actual_path = config.context_dir / channel.actual_path
+    limit = bundle.config.options.readable_limit
+
+    def in_memory(size: int) -> bool:
+        return size < MMAP_THRESHOLD and (limit is None or size <= limit)
 
     try:
-        with open(str(actual_path), "r") as file:
-            actual = file.read()
+        actual_size = os.path.getsize(actual_path)
     except FileNotFoundError:
+        if in_memory(expected_size):
+            readable_expected = cache.read_text(expected_path)
+        else:
+            with cache.open_text(expected_path) as expected_file:
+                readable_expected = _excerpt(
+                    False, [], None, _pieces(expected_file, mode), _CONTEXT[mode]
+                )
         return OracleResult(
             result=StatusMessage(
                 enum=Status.RUNTIME_ERROR,
                 human=get_i18n_string("oracles.text.file.not-found"),
             ),
-            readable_expected=expected,
+            readable_expected=readable_expected,
             readable_actual="",
         )
 
-    if options["mode"] == "full":
-        return compare_text(options, expected, actual)
+    if in_memory(max(expected_size, actual_size)) or (
+        mode == "full" and options["tryFloatingPoint"]
+    ):
+        expected = cache.read_text(expected_path)
+        with open(actual_path, "r") as file:
+            actual = file.read()
+        if mode == "full":
+            return compare_text(options, expected, actual)
+        correct = _compare_lines(options, expected, actual)
+        readable_expected, readable_actual = expected, actual
     else:
-        assert options["mode"] == "line"
-        strip_newlines = options.get("stripNewlines", False)
-        expected_lines = expected.splitlines(keepends=not strip_newlines)
-        actual_lines = actual.splitlines(keepends=not strip_newlines)
-        correct = len(actual_lines) == len(expected_lines)
-        for expected_line, actual_line in zip(expected_lines, actual_lines):
-            r = compare_text(options, expected_line, actual_line)
-            correct = correct and r.result.enum == Status.CORRECT
-        return OracleResult(
-            result=StatusMessage(enum=Status.CORRECT if correct else Status.WRONG),
-            readable_expected=expected,
-            readable_actual=actual,
-        )
+        with cache.open_text(expected_path) as expected_file, open(
+            actual_path, "r"
+        ) as actual_file:
+            correct, readable_expected, readable_actual = compare_files(
+                options, mode, expected_file, actual_file
+            )
+
+    return OracleResult(
+        result=StatusMessage(enum=Status.CORRECT if correct else Status.WRONG),
+        readable_expected=readable_expected,
+        readable_actual=readable_actual,
+    )
@@ -0,0 +1,78 @@
+import logging
+import math
+
+from tested.dodona import Status, StatusMessage
+from tested.internationalization import get_i18n_string
+from tested.oracles.common import OracleConfig, OracleResult
+from tested.testsuite import OutputChannel, TimeMeasure, TimeOutputChannel
+
+logger = logging.getLogger(__name__)
+
+
+def _as_seconds(value: str, measure: TimeMeasure) -> float | None:
+    """
+    Get the measured time from the output of the harness, which is the wall time
+    and the processor time, separated by a space.
+    """
+    parts = value.split()
+    index = 0 if measure == TimeMeasure.WALL else 1
+    try:
+        seconds = float(parts[index])
+    except (ValueError, IndexError):
+        return None
+    return seconds if math.isfinite(seconds) and seconds >= 0 else None
+
+
+def format_seconds(seconds: float) -> str:
+    if seconds < 1:
+        return f"{seconds * 1000:.3g} ms"
+    return f"{seconds:.3g} s"
+
+
+def readable_limit(channel: TimeOutputChannel) -> str:
+    return get_i18n_string(
+        f"oracles.timing.expected.{channel.measure}",
+        limit=format_seconds(channel.limit),
+    )
+
+
+def evaluate(_config: OracleConfig, channel: OutputChannel, value: str) -> OracleResult:
+    """
+    Check that the measured time of a testcase does not exceed the budget (with
+    the tolerance) of the channel.
+    """
+    assert isinstance(channel, TimeOutputChannel)
+    expected = readable_limit(channel)
+    seconds = _as_seconds(value, channel.measure)
+
+    if seconds is None:
+        logger.warning(f"Invalid timing {value!r}")
+        return OracleResult(
+            result=StatusMessage(
+                enum=Status.WRONG,
+                human=get_i18n_string("oracles.timing.status.missing"),
+            ),
+            readable_expected=expected,
+            readable_actual="",
+        )
+
+    if seconds > channel.limit:
+        status = StatusMessage(
+            enum=Status.WRONG, human=get_i18n_string("oracles.timing.status.wrong")
+        )
+        messages = [
+            get_i18n_string(
+                "oracles.timing.message",
+                ratio=f"{seconds / channel.budget:.1f}",
+            )
+        ]
+    else:
+        status = StatusMessage(enum=Status.CORRECT)
+        messages = []
+
+    return OracleResult(
+        result=status,
+        readable_expected=expected,
+        readable_actual=format_seconds(seconds),
+        messages=messages,
+    )
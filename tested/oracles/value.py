@@ -2,15 +2,20 @@
 Value oracle.
 """
 import logging
+import math
+from array import array
 from typing import cast
 
-from tested.configs import Bundle
+from tested.configs import Bundle, ValueHashes
 from tested.datatypes import (
+    AdvancedNumericTypes,
     AdvancedTypes,
+    BasicNumericTypes,
     BasicSequenceTypes,
     BasicStringTypes,
     BasicTypes,
     SimpleTypes,
+    resolve_to_basic,
 )
 from tested.dodona import ExtendedMessage, Message, Permission, Status, StatusMessage
 from tested.features import TypeSupport, fallback_type_support_map
@@ -19,6 +24,7 @@ from tested.languages.generation import generate_statement
 from tested.oracles.common import OracleConfig, OracleResult
 from tested.parsing import get_converter
 from tested.serialisation import (
+    NumberType,
     ObjectKeyValuePair,
     ObjectType,
     SequenceType,
@@ -26,11 +32,13 @@ from tested.serialisation import (
     Value,
     as_basic_type,
     parse_value,
+    structural_hash,
     to_python_comparable,
 )
 from tested.testsuite import (
     OracleOutputChannel,
     OutputChannel,
+    Suite,
     TextOutputChannel,
     ValueOutputChannel,
 )
@@ -48,14 +56,17 @@ def try_as_readable_value(
     except Exception:
         return None, None
     else:
-        return generate_statement(bundle, actual), None
+        limit = bundle.config.options.readable_limit
+        return generate_statement(bundle, actual, limit), None
 
 
 def get_values(
     bundle: Bundle, output_channel: OracleOutputChannel, actual_str: str
 ) -> OracleResult | tuple[Value, str, Value | None, str]:
     if isinstance(output_channel, TextOutputChannel):
-        expected = output_channel.get_data_as_string(bundle.config.resources)
+        expected = output_channel.get_data_as_string(
+            bundle.config.resources, bundle.resource_cache
+        )
         expected_value = StringType(type=BasicStringTypes.TEXT, data=expected)
         actual_value = StringType(type=BasicStringTypes.TEXT, data=actual_str)
         return expected_value, expected, actual_value, actual_str
@@ -64,7 +75,8 @@ def get_values(
 
     expected = output_channel.value
     assert isinstance(expected, Value)
-    readable_expected = generate_statement(bundle, expected)
+    limit = bundle.config.options.readable_limit
+    readable_expected = generate_statement(bundle, expected, limit)
 
     # Special support for empty strings.
     if not actual_str.strip():
@@ -87,7 +99,7 @@ def get_values(
             messages=[message],
         )
 
-    readable_actual = generate_statement(bundle, actual)
+    readable_actual = generate_statement(bundle, actual, limit)
     return expected, readable_expected, actual, readable_actual
 
 
@@ -251,16 +263,232 @@ def _check_data_type(
     return valid, prepared_expected
 
 
+# The shape of a (nested) numeric sequence: the length for a flat sequence, or the
+# shapes of the elements for a nested sequence.
+_Shape = int | tuple["_Shape", ...]
+
+
+def _numeric_buffer(value: Value) -> tuple[str, _Shape, array] | None:
+    """
+    Pack a sequence of integers or real numbers, or a nested sequence thereof, into
+    a flat buffer.
+
+    :param value: The value to pack.
+    :return: The type code of the buffer, the shape of the sequence and the buffer,
+             or None if the value is not a non-empty, homogeneous numeric sequence.
+    """
+    if not isinstance(value, SequenceType) or not value.data:
+        return None
+    if resolve_to_basic(value.type) != BasicSequenceTypes.SEQUENCE:
+        return None
+
+    first = value.data[0]
+    if isinstance(first, SequenceType):
+        parts = [_numeric_buffer(cast(Value, x)) for x in value.data]
+        if any(x is None for x in parts):
+            return None
+        parts = cast(list[tuple[str, _Shape, array]], parts)
+        typecode = parts[0][0]
+        if any(x[0] != typecode for x in parts):
+            return None
+        buffer = array(typecode)
+        for _, _, part in parts:
+            buffer.extend(part)
+        return typecode, tuple(x[1] for x in parts), buffer
+
+    if (
+        not isinstance(first, NumberType)
+        or first.type == AdvancedNumericTypes.FIXED_PRECISION
+    ):
+        return None
+    basic_type = resolve_to_basic(first.type)
+    if basic_type == BasicNumericTypes.REAL:
+        typecode = "d"
+    elif basic_type == BasicNumericTypes.INTEGER:
+        typecode = "q"
+    else:
+        return None
+    # Most sequences have one element type, so only resolve other types.
+    first_type = first.type
+    for element in value.data:
+        if not isinstance(element, NumberType):
+            return None
+        if element.type is not first_type and (
+            element.type == AdvancedNumericTypes.FIXED_PRECISION
+            or resolve_to_basic(element.type) != basic_type
+        ):
+            return None
+    elements = [element.data for element in value.data]
+    if typecode == "q" and any(type(x) is not int for x in elements):
+        return None
+    try:
+        return typecode, len(elements), array(typecode, elements)
+    except (OverflowError, TypeError):
+        return None
+
+
+def _index_in_shape(shape: _Shape, index: int) -> list[int]:
+    """
+    Convert an index in the flat buffer to the indices in the nested sequence.
+    """
+    if isinstance(shape, int):
+        return [index]
+    for position, element_shape in enumerate(shape):
+        size = _shape_size(element_shape)
+        if index < size:
+            return [position] + _index_in_shape(element_shape, index)
+        index -= size
+    raise AssertionError("Index out of range of shape.")
+
+
+def _shape_size(shape: _Shape) -> int:
+    if isinstance(shape, int):
+        return shape
+    return sum(_shape_size(x) for x in shape)
+
+
+def _compare_numeric_sequences(
+    expected: Value, actual: Value | None
+) -> tuple[bool, list[int] | None] | None:
+    """
+    Compare two numeric sequences, without converting each number to a comparable
+    Python value. Real numbers are compared in the same way as ComparableFloat:
+    with math.isclose, where NaN is equal to NaN.
+
+    :param expected: The expected value.
+    :param actual: The actual value.
+
+    :return: None if the values are not homogeneous numeric sequences of the same
+             kind. Otherwise, if the values are equal and the indices of the first
+             difference (if the sequences have the same shape).
+    """
+    if actual is None:
+        return None
+    expected_buffer = _numeric_buffer(expected)
+    if expected_buffer is None:
+        return None
+    actual_buffer = _numeric_buffer(actual)
+    if actual_buffer is None:
+        return None
+    typecode, expected_shape, expected_values = expected_buffer
+    actual_typecode, actual_shape, actual_values = actual_buffer
+    if typecode != actual_typecode:
+        return None
+    if expected_shape != actual_shape:
+        return False, None
+    # The buffers are compared in C; the common case (equal values) stops here.
+    if expected_values == actual_values:
+        return True, None
+
+    for index, (x, y) in enumerate(zip(expected_values, actual_values)):
+        if x == y:
+            continue
+        if typecode == "d" and (
+            math.isclose(x, y) or (math.isnan(x) and math.isnan(y))
+        ):
+            continue
+        return False, _index_in_shape(expected_shape, index)
+    return True, None
+
+
+def _expected_hash(hashes: ValueHashes, expected: Value) -> int | None:
+    cached = hashes.get(id(expected))
+    if cached is None or cached[0] is not expected:
+        cached = (expected, structural_hash(expected))
+        hashes[id(expected)] = cached
+    return cached[1]
+
+
+def hash_expected_values(suite: Suite) -> ValueHashes:
+    """
+    Compute the structural hashes of all expected return values in the test suite.
+
+    The hashes are otherwise computed for each judgement when they are first needed.
+    Doing this up front is useful if the test suite is used for multiple submissions
+    (see create_bundle).
+
+    :param suite: The test suite.
+    :return: The hashes.
+    """
+    hashes: ValueHashes = dict()
+    for tab in suite.tabs:
+        for context in tab.contexts:
+            for testcase in context.testcases:
+                channel = testcase.output.result
+                if isinstance(channel, ValueOutputChannel) and isinstance(
+                    channel.value, Value
+                ):
+                    _expected_hash(hashes, channel.value)
+    return hashes
+
+
 def compare_values(
-    config: OracleConfig, actual: Value | None, expected: Value
-) -> tuple[bool, Value, bool]:
+    config: OracleConfig,
+    actual: Value | None,
+    expected: Value,
+    from_suite: bool = False,
+) -> tuple[bool, Value, bool, list[int] | None]:
+    """
+    Compare the actual value with the expected value.
+
+    :param from_suite: If the expected value is part of the test suite, in which
+                       case its hash is cached in the bundle.
+
+    :return: If the types match, the prepared expected value, if the values match
+             and the indices of the first difference, if known.
+    """
+    if from_suite:
+        expected_hash = _expected_hash(config.bundle.value_hashes, expected)
+    else:
+        expected_hash = None
     type_check, expected = _check_data_type(config.bundle, expected, actual)
+
+    numeric_check = _compare_numeric_sequences(expected, actual)
+    if numeric_check is not None:
+        content_check, difference = numeric_check
+        return type_check, expected, content_check, difference
+
+    # Identical values are equal, without hashing or converting them.
+    if actual == expected:
+        return type_check, expected, True, None
+
+    # Different hashes mean different values, so we can stop here.
+    if expected_hash is not None:
+        actual_hash = structural_hash(actual)
+        if actual_hash is not None and actual_hash != expected_hash:
+            return type_check, expected, False, None
+
     py_expected = to_python_comparable(expected)
     py_actual = to_python_comparable(actual)
 
     content_check = py_expected == py_actual
 
-    return type_check, expected, content_check
+    return type_check, expected, content_check, None
+
+
+def _first_difference(expected: Value, actual: Value) -> list[int]:
+    """
+    Find the indices of the first difference between two different values, in
+    sequences (not in sets) and strings.
+
+    :return: The indices, which are empty if the position is not known.
+    """
+    if isinstance(expected, StringType) and isinstance(actual, StringType):
+        for index, (x, y) in enumerate(zip(expected.data, actual.data)):
+            if x != y:
+                return [index]
+        return [min(len(expected.data), len(actual.data))]
+    if not isinstance(expected, SequenceType) or not isinstance(actual, SequenceType):
+        return []
+    if BasicSequenceTypes.SET in (
+        as_basic_type(expected).type,
+        as_basic_type(actual).type,
+    ):
+        return []
+    for index, (x, y) in enumerate(zip(expected.data, actual.data)):
+        if to_python_comparable(x) != to_python_comparable(y):
+            return [index] + _first_difference(x, y)
+    return [min(len(expected.data), len(actual.data))]
 
 
 def evaluate(
@@ -309,7 +537,9 @@ def evaluate(
             readable_actual=readable_actual,
         )
 
-    type_check, expected, content_check = compare_values(config, actual, expected)
+    type_check, expected, content_check, difference = compare_values(
+        config, actual, expected, from_suite=True
+    )
     messages = []
     type_status = None
 
@@ -318,6 +548,19 @@ def evaluate(
     if is_multiline_string:
         readable_actual = get_as_string(actual, readable_actual)
 
+    # If the displayed values are the same (e.g. because they are truncated),
+    # look for the difference.
+    if (
+        not content_check
+        and difference is None
+        and readable_expected == readable_actual
+    ):
+        difference = _first_difference(expected, actual) or None
+
+    if not content_check and difference is not None:
+        index = "".join(f"[{x}]" for x in difference)
+        messages.append(get_i18n_string("oracles.value.difference", index=index))
+
     # If the displayed values are the same, add a message about the type.
     if not type_check and readable_expected == readable_actual:
         type_status = get_i18n_string("oracles.value.datatype.wrong")
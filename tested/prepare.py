@@ -0,0 +1,140 @@
+"""
+Prepare an exercise by generating the test harness ahead of time.
+
+The generated code for the execution units only depends on the test suite and the
+programming language. This command generates it once (e.g. when the exercise is
+published) and stores it in the evaluation folder of the exercise. When judging a
+submission, TESTed will use the prepared harness instead of generating it again.
+
+For compiled languages, the harness files that do not depend on the submission
+(e.g. the values module of C and Haskell) are compiled as well. They are used
+when judging a submission if no cache for them is configured, even if the rest of
+the harness is generated with the submission.
+
+The prepared harness is ignored if the test suite or TESTed itself has changed
+since it was prepared, so it is always safe to (not) run this command again.
+"""
+import json
+import sys
+import tempfile
+from argparse import ArgumentParser
+from pathlib import Path
+
+from tested.cli import dir_path
+from tested.configs import DodonaConfig, create_bundle
+from tested.features import is_supported
+from tested.judge.harness import generate_harness, save_harness
+from tested.judge.planning import PlanStrategy, plan_test_suite
+from tested.languages.utils import prepared_harness_cache
+from tested.main import read_test_suite
+from tested.testsuite import SupportedLanguage
+
+
+def prepare_exercise(
+    evaluation: Path,
+    test_suite: str,
+    languages: list[str],
+    destination: Path | None = None,
+) -> dict[str, Path | None]:
+    """
+    Generate and store the harness of an exercise for the given languages, and
+    compile the harness files that do not depend on the submission.
+
+    :param evaluation: The evaluation folder of the exercise.
+    :param test_suite: The test suite, relative to the evaluation folder.
+    :param languages: The programming languages to prepare.
+    :param destination: Where the harnesses are stored (see
+                        DodonaConfig.harness_cache). By default, this is the
+                        evaluation folder.
+
+    :return: For each language, the folder with the prepared harness, the folder
+             with the compiled harness files if only those can be prepared, or
+             None if nothing can be prepared for that language.
+    """
+    judge_path = Path(__file__).parent.parent
+    results = dict()
+    for language in languages:
+        with tempfile.TemporaryDirectory() as workdir:
+            config = DodonaConfig(
+                resources=evaluation,
+                source=Path(workdir, "submission"),
+                time_limit=60,
+                memory_limit=536870912,
+                natural_language="en",
+                programming_language=SupportedLanguage(language),
+                workdir=Path(workdir),
+                judge=judge_path,
+                test_suite=test_suite,
+                harness_cache=destination,
+            )
+            suite = read_test_suite(config)
+            bundle = create_bundle(config, sys.stdout, suite, language)
+            if not is_supported(bundle.language):
+                results[language] = None
+                continue
+            compiled = bundle.language.compile_harness(prepared_harness_cache(config))
+            if bundle.language.generation_uses_submission():
+                results[language] = compiled
+                continue
+            planned_units = plan_test_suite(bundle, strategy=PlanStrategy.OPTIMAL)
+            harness = generate_harness(bundle, Path(workdir), planned_units)
+            results[language] = save_harness(bundle, harness, Path(workdir))
+    return results
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(
+        description="Generate the test harness of an exercise ahead of time."
+    )
+    parser.add_argument(
+        "-e",
+        "--exercise",
+        type=dir_path,
+        help="Path to a directory containing an exercise",
+        required=True,
+    )
+    parser.add_argument(
+        "-t",
+        "--testsuite",
+        help="Path to the test suite, relative to the evaluation folder",
+        default=None,
+    )
+    parser.add_argument(
+        "-p",
+        "--programming_languages",
+        nargs="+",
+        help="The programming languages to prepare",
+        default=None,
+    )
+    args = parser.parse_args()
+
+    exercise_path = args.exercise
+    config_path = exercise_path / "config.json"
+    try:
+        config_file = json.loads(config_path.read_text())
+    except FileNotFoundError:
+        config_file = dict()
+
+    if args.testsuite is not None:
+        suite_name = args.testsuite
+    else:
+        suite_name = config_file.get("evaluation", {}).get("test_suite", "suite.yaml")
+
+    if args.programming_languages is not None:
+        programming_languages = args.programming_languages
+    elif "programming_language" in config_file:
+        programming_languages = [config_file["programming_language"]]
+    else:
+        raise Exception(
+            f"Could not determine the programming language for {exercise_path}.\n"
+            "Please add a programming language to the config file or provide the programming languages via the --programming_languages parameter on the command line."
+        )
+
+    prepared = prepare_exercise(
+        exercise_path / "evaluation", suite_name, programming_languages
+    )
+    for programming_language, folder in prepared.items():
+        if folder is None:
+            print(f"Cannot prepare the harness for {programming_language}.")
+        else:
+            print(f"Prepared the harness for {programming_language} in {folder}.")
@@ -0,0 +1,382 @@
+"""
+Regrade many submissions of one exercise in one go.
+
+Running ``python -m tested`` for each submission means parsing the test suite and
+generating the harness again and again. This command does that work once, and then
+judges the submissions in a pool of processes. For each submission, the output of
+TESTed is written to a separate file; a summary of all submissions is written to
+a CSV file.
+
+The submissions are either all files with the extension of the programming
+language in a directory (recursively), or the files listed in a manifest (one path
+per line, relative to the manifest).
+"""
+import csv
+import json
+import logging
+import math
+import shutil
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from attrs import define, evolve
+
+from tested.cli import CommandDict, create_and_populate_workdir, dir_path, split_output
+from tested.configs import DodonaConfig, ValueHashes, create_bundle
+from tested.dodona import Status
+from tested.judge import judge
+from tested.judge.harness import HARNESS_FOLDER
+from tested.languages import get_language
+from tested.main import read_test_suite
+from tested.oracles.value import hash_expected_values
+from tested.parsing import get_converter
+from tested.prepare import prepare_exercise
+from tested.testsuite import Suite
+
+_logger = logging.getLogger(__name__)
+
+# The name of the summary file in the output directory.
+SUMMARY_FILE = "summary.csv"
+
+# The test suite, parsed once for each worker process.
+_suite: Suite | None = None
+# The hashes of the expected values in the test suite.
+_value_hashes: ValueHashes = dict()
+
+
+@define
+class RegradeResult:
+    """The outcome of judging one submission."""
+
+    submission: str
+    status: str
+    correct: int
+    tests: int
+    duration: float
+
+
+def find_submissions(location: Path, language: str) -> dict[str, Path]:
+    """
+    Find the submissions to regrade.
+
+    :param location: A directory containing the submissions or a manifest file.
+    :param language: The programming language of the submissions.
+
+    :return: The submissions, by name. The name is the path relative to the
+             directory or the path as listed in the manifest.
+    """
+    if location.is_dir():
+        extension = get_language(None, language).file_extension()
+        return {
+            str(path.relative_to(location)): path
+            for path in sorted(location.rglob(f"*.{extension}"))
+            if path.is_file()
+        }
+
+    submissions = dict()
+    for line in location.read_text().splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            submissions[line] = location.parent / line
+    return submissions
+
+
+def summarise_output(output: str) -> tuple[str, int, int]:
+    """
+    Summarise the output of TESTed for one submission.
+
+    :param output: The output of TESTed.
+    :return: The status of the submission, the number of correct tests and the
+             total number of tests.
+    """
+    updates = CommandDict()
+    for update in split_output(output):
+        if update.strip():
+            updates.append(json.loads(update))
+    statuses = updates.find_status_enum()
+    tests = [x["status"]["enum"] for x in updates.find_all("close-test")]
+    status = next((x for x in statuses if x != "correct"), "correct")
+    return status, tests.count("correct"), len(tests)
+
+
+def percentile(values: list[float], p: float) -> float:
+    """
+    Get a percentile of the values, using the nearest-rank method.
+    """
+    ordered = sorted(values)
+    rank = max(math.ceil(p / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def _initialise_worker(suite: Suite):
+    global _suite, _value_hashes
+    _suite = suite
+    _value_hashes = hash_expected_values(suite)
+
+
+def regrade_submission(
+    template: DodonaConfig, name: str, submission: Path, output: Path
+) -> RegradeResult:
+    """
+    Judge one submission. This runs in a worker process.
+
+    The submission is judged in a copy, since TESTed might modify it (e.g. to
+    remove the shebang).
+
+    :param template: The configuration, without the submission and working directory.
+    :param name: The name of the submission.
+    :param submission: The path to the submission.
+    :param output: Where the output of TESTed is written to.
+    """
+    assert _suite is not None, "Worker was not initialised."
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory() as directory:
+        source = Path(directory, "submission", submission.name)
+        source.parent.mkdir()
+        shutil.copy(submission, source)
+        workdir = Path(directory, "workdir")
+        config = evolve(template, source=source, workdir=workdir)
+        create_and_populate_workdir(config)
+        start = time.perf_counter()
+        try:
+            with open(output, "w") as judge_output:
+                bundle = create_bundle(
+                    config, judge_output, _suite, value_hashes=_value_hashes
+                )
+                judge(bundle)
+        except Exception as e:
+            _logger.exception(f"Could not judge {name}", exc_info=e)
+            duration = time.perf_counter() - start
+            return RegradeResult(name, Status.INTERNAL_ERROR, 0, 0, duration)
+        duration = time.perf_counter() - start
+    status, correct, tests = summarise_output(output.read_text())
+    return RegradeResult(name, status, correct, tests, duration)
+
+
+def _judge_in_pool(
+    template: DodonaConfig,
+    suite: Suite,
+    submissions: dict[str, Path],
+    destination: Path,
+    workers: int | None,
+    results: dict[str, RegradeResult],
+) -> list[str]:
+    """
+    Judge the submissions in a new pool of processes.
+
+    :return: The submissions that were not judged because the pool broke.
+    """
+    broken = []
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_initialise_worker, initargs=(suite,)
+    ) as executor:
+        futures = {
+            name: executor.submit(
+                regrade_submission,
+                template,
+                name,
+                path,
+                destination / f"{name}.out",
+            )
+            for name, path in submissions.items()
+        }
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except BrokenProcessPool:
+                broken.append(name)
+    return broken
+
+
+def regrade(
+    template: DodonaConfig,
+    submissions: dict[str, Path],
+    destination: Path,
+    workers: int | None = None,
+) -> list[RegradeResult]:
+    """
+    Judge all submissions of an exercise.
+
+    The harness is prepared once (see tested.prepare) in the destination and the
+    test suite is parsed once for each worker, after which the submissions are
+    divided between the workers.
+
+    If a worker stops (e.g. because a submission killed it), the remaining
+    submissions are judged in a new pool. The first submission that was not judged
+    is judged again on its own: if the worker stops again, the submission is
+    recorded as an internal error.
+
+    :param template: The configuration, without the submission and working directory.
+    :param submissions: The submissions, by name.
+    :param destination: The directory for the output of each submission and the
+                        summary.
+    :param workers: The number of submissions that are judged concurrently. By
+                    default, this is the number of processors.
+
+    :return: The results, in the same order as the submissions.
+    """
+    destination.mkdir(parents=True, exist_ok=True)
+    template = evolve(template, harness_cache=destination / HARNESS_FOLDER)
+    prepare_exercise(
+        template.resources,
+        template.test_suite,
+        [template.programming_language],
+        template.harness_cache,
+    )
+    suite = read_test_suite(template)
+
+    judged: dict[str, RegradeResult] = dict()
+    pending = submissions
+    while pending:
+        broken = _judge_in_pool(template, suite, pending, destination, workers, judged)
+        if not broken:
+            break
+        suspect = broken[0]
+        alone = {suspect: submissions[suspect]}
+        if _judge_in_pool(template, suite, alone, destination, 1, judged):
+            _logger.error(f"Judging {suspect} stopped the worker.")
+            judged[suspect] = RegradeResult(suspect, Status.INTERNAL_ERROR, 0, 0, 0.0)
+        pending = {name: submissions[name] for name in broken[1:]}
+    results = [judged[name] for name in submissions]
+
+    with open(destination / SUMMARY_FILE, "w", newline="") as summary:
+        writer = csv.writer(summary)
+        writer.writerow(["submission", "status", "correct", "tests", "seconds"])
+        for result in results:
+            writer.writerow(
+                [
+                    result.submission,
+                    result.status,
+                    result.correct,
+                    result.tests,
+                    f"{result.duration:.3f}",
+                ]
+            )
+    return results
+
+
+def exercise_config(
+    exercise: Path, config_file: dict, test_suite: str, programming_language: str
+) -> DodonaConfig:
+    """
+    Create the configuration to regrade an exercise with. The limits, the natural
+    language and the options are read from the evaluation settings in the config
+    file of the exercise, as Dodona does.
+
+    :param exercise: The directory of the exercise.
+    :param config_file: The contents of the config file of the exercise.
+    :param test_suite: The test suite, relative to the evaluation folder.
+    :param programming_language: The programming language of the submissions.
+
+    :return: The configuration, without the submission and working directory.
+    """
+    evaluation = config_file.get("evaluation", {})
+    return get_converter().structure(
+        {
+            "resources": str(exercise / "evaluation"),
+            "source": ".",
+            "time_limit": evaluation.get("time_limit", 60),
+            "memory_limit": evaluation.get("memory_limit", 536870912),
+            "natural_language": evaluation.get("natural_language", "nl"),
+            "programming_language": programming_language,
+            "workdir": ".",
+            "judge": str(Path(__file__).parent.parent),
+            "test_suite": test_suite,
+            "options": evaluation.get("options", {}),
+        },
+        DodonaConfig,
+    )
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(
+        description="Judge many submissions of one exercise in one process."
+    )
+    parser.add_argument(
+        "-e",
+        "--exercise",
+        type=dir_path,
+        help="Path to a directory containing an exercise",
+        required=True,
+    )
+    parser.add_argument(
+        "-s",
+        "--submissions",
+        type=Path,
+        help="Directory containing the submissions, or a manifest listing them",
+        required=True,
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="Directory where the output and the summary are written to",
+        required=True,
+    )
+    parser.add_argument(
+        "-t",
+        "--testsuite",
+        help="Path to the test suite, relative to the evaluation folder",
+        default=None,
+    )
+    parser.add_argument(
+        "-p",
+        "--programming_language",
+        help="The programming language to use",
+        default=None,
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        help="Number of submissions judged concurrently",
+        default=None,
+    )
+    args = parser.parse_args()
+
+    exercise_path = args.exercise
+    config_path = exercise_path / "config.json"
+    try:
+        config_file = json.loads(config_path.read_text())
+    except FileNotFoundError:
+        config_file = dict()
+
+    if args.testsuite is not None:
+        suite_name = args.testsuite
+    else:
+        suite_name = config_file.get("evaluation", {}).get("test_suite", "suite.yaml")
+
+    if args.programming_language is not None:
+        programming_language = args.programming_language
+    elif "programming_language" in config_file.get("evaluation", {}):
+        programming_language = config_file["evaluation"]["programming_language"]
+    elif "programming_language" in config_file:
+        programming_language = config_file["programming_language"]
+    else:
+        raise Exception(
+            f"Could not determine the programming language for {exercise_path}.\n"
+            "Please add a programming language to the config file or provide the programming language via the --programming_language parameter on the command line."
+        )
+
+    dodona_config = exercise_config(
+        exercise_path, config_file, suite_name, programming_language
+    )
+    all_submissions = find_submissions(args.submissions, programming_language)
+
+    print(f"Regrading {len(all_submissions)} submissions...", file=sys.stderr)
+    start = time.perf_counter()
+    all_results = regrade(dodona_config, all_submissions, args.output, args.workers)
+    elapsed = time.perf_counter() - start
+
+    durations = [r.duration for r in all_results]
+    print(f"Judged {len(all_results)} submissions in {elapsed:.1f} seconds.")
+    if all_results:
+        print(f"Throughput: {len(all_results) / elapsed:.2f} submissions/s")
+        print(f"Latency p50: {percentile(durations, 50):.3f} s")
+        print(f"Latency p95: {percentile(durations, 95):.3f} s")
+    print(f"Summary written to {args.output / SUMMARY_FILE}")
@@ -687,6 +687,61 @@ def to_python_comparable(value: Value | None) -> Any:
     raise AssertionError(f"Unknown value type: {value}")
 
 
+def structural_hash(value: Value | None) -> int | None:
+    """
+    Compute a hash of the value that is consistent with the comparable Python value:
+    if two values are equal after to_python_comparable, their hashes are equal.
+    Different hashes thus mean different values, without converting them.
+
+    Real numbers are compared with a tolerance, so only their type is included.
+    Sets and maps are hashed without regard to the order of their elements, and for
+    consistency with sets (a set and a sequence can be equal), so are sequences.
+
+    :param value: The value to hash.
+    :return: The hash, or None if the value cannot be hashed.
+    """
+    if value is None:
+        return hash(None)
+    basic_type = resolve_to_basic(value.type)
+    if value.type == AdvancedNumericTypes.FIXED_PRECISION:
+        return hash(value.data)
+    if basic_type in (BasicSequenceTypes.SEQUENCE, BasicSequenceTypes.SET):
+        assert isinstance(value, SequenceType)
+        elements = set()
+        for element in value.data:
+            element_hash = structural_hash(cast(Value, element))
+            if element_hash is None:
+                return None
+            elements.add(element_hash)
+        return hash(frozenset(elements))
+    if basic_type == BasicObjectTypes.MAP:
+        assert isinstance(value, ObjectType)
+        pairs = dict()
+        for pair in value.data:
+            key_hash = structural_hash(cast(Value, pair.key))
+            value_hash = structural_hash(cast(Value, pair.value))
+            if key_hash is None or value_hash is None or key_hash in pairs:
+                # Duplicate keys are removed when comparing, so don't bother.
+                return None
+            pairs[key_hash] = value_hash
+        return hash(frozenset(pairs.items()))
+    if basic_type == BasicNumericTypes.REAL:
+        return hash(BasicNumericTypes.REAL)
+    if basic_type in (
+        BasicNumericTypes.INTEGER,
+        BasicBooleanTypes.BOOLEAN,
+        BasicStringTypes.TEXT,
+        BasicNothingTypes.NOTHING,
+        BasicStringTypes.ANY,
+        BasicStringTypes.UNKNOWN,
+    ):
+        try:
+            return hash(value.data)
+        except TypeError:
+            return None
+    return None
+
+
 @define
 class ExceptionValue:
     """An exception that was thrown while executing the user context."""
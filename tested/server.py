@@ -0,0 +1,339 @@
+"""
+Run TESTed as a long-running server.
+
+Starting TESTed for each submission means paying for the imports, the language
+modules and parsing the test suite every time. In server mode, a single warm
+process does this once, and judges submissions as they arrive.
+
+A client connects to the server (on a Unix socket or a local TCP port), sends the
+configuration (the same JSON as for ``python -m tested``) on a single line, and
+receives the output of the judge on the same connection. The output is streamed
+while the judgement is running.
+
+Each submission is judged in its own process, forked from the server. This
+isolates the judgements from each other (e.g. the locale), while keeping all
+work done by the server (imports, parsed test suites, resource files) available
+to them. The forked process also reads the configuration and parses the test
+suite, so a slow client or test suite does not hold up the server. A test suite
+that was parsed by a forked process is passed back to the server, which keeps it
+for later submissions.
+"""
+import importlib
+import importlib.util
+import io
+import json
+import logging
+import os
+import pickle
+import shutil
+import socketserver
+import sys
+import tempfile
+from argparse import ArgumentParser
+from collections import OrderedDict
+from pathlib import Path
+
+from tested.configs import DodonaConfig, ValueHashes, create_bundle
+from tested.dodona import (
+    CloseJudgement,
+    StartJudgement,
+    Status,
+    StatusMessage,
+    report_update,
+)
+from tested.internationalization import get_i18n_string, set_locale
+from tested.judge import judge
+from tested.languages import LANGUAGES
+from tested.main import read_test_suite
+from tested.oracles.value import hash_expected_values
+from tested.parsing import get_converter
+from tested.testsuite import (
+    FileOutputChannel,
+    MainInput,
+    Suite,
+    TextChannelType,
+    TextData,
+)
+from tested.utils import ResourceCache
+
+_logger = logging.getLogger(__name__)
+
+# How long the server waits for a client to send its configuration.
+REQUEST_TIMEOUT = 10
+# The maximal number of test suites the server keeps.
+SUITE_CACHE_SIZE = 32
+
+SuiteKey = tuple[Path, int, int]
+
+
+def warm_up():
+    """
+    Do the work that would otherwise be done for each submission, so the forked
+    processes can reuse it. This loads the language modules and the translations.
+    """
+    for language in LANGUAGES:
+        module = f"tested.languages.{language}.generators"
+        if importlib.util.find_spec(module) is not None:
+            importlib.import_module(module)
+    for locale in ("en", "nl"):
+        set_locale(locale)
+        get_i18n_string("judge.core.invalid.source-code")
+    set_locale("en")
+
+
+class _JudgeHandler(socketserver.StreamRequestHandler):
+    """
+    Reads the configuration of a request and judges the submission. This runs in
+    the forked process.
+    """
+
+    server: "JudgeServer"
+
+    timeout = REQUEST_TIMEOUT
+
+    def handle(self):
+        out = io.TextIOWrapper(self.wfile, encoding="utf-8", write_through=True)
+        parsed = None
+        try:
+            try:
+                config = get_converter().loads(self.rfile.readline(), DodonaConfig)
+                self.connection.settimeout(None)
+                suite, hashes, parsed = self.server.get_suite(config)
+            except Exception as e:
+                _logger.exception("Invalid request", exc_info=e)
+                report_update(out, StartJudgement())
+                _report_internal_error(out)
+                return
+            try:
+                bundle = create_bundle(
+                    config,
+                    out,
+                    suite,
+                    resource_cache=self.server.resources,
+                    value_hashes=hashes,
+                )
+                judge(bundle)
+            except Exception as e:
+                _logger.exception("Judgement failed", exc_info=e)
+                _report_internal_error(out)
+        finally:
+            out.detach()
+            if parsed is not None:
+                self.server.report_suite(config, *parsed)
+
+
+def _report_internal_error(out: io.TextIOBase):
+    report_update(
+        out,
+        CloseJudgement(
+            accepted=False, status=StatusMessage(enum=Status.INTERNAL_ERROR)
+        ),
+    )
+
+
+class JudgeServer(socketserver.ForkingMixIn, socketserver.BaseServer):
+    """
+    Base class for the servers. Each request is handled in a forked process.
+
+    The test suites are cached for later submissions (together with the hashes of
+    the expected values and the resource files used by the test suite). A test
+    suite that is not cached is parsed by the forked process, which then passes it
+    back to the server: it is stored in a file, whose name is sent through a pipe.
+    The forked processes also report which cached test suites they use.
+    A test suite is parsed again if the file changes. The least recently used test
+    suites and resource files are removed (see SUITE_CACHE_SIZE and
+    ResourceCache).
+    """
+
+    suites: OrderedDict[SuiteKey, tuple[Suite, ValueHashes]]
+    resources: ResourceCache
+
+    def __init__(self, *args, workers: int, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_children = workers
+        self.suites = OrderedDict()
+        self.resources = ResourceCache()
+        self._parsed_directory = tempfile.mkdtemp(prefix="tested-suites-")
+        self._messages_reader, self._messages_writer = os.pipe()
+        os.set_blocking(self._messages_reader, False)
+        self._messages_buffer = b""
+
+    def get_suite(
+        self, config: DodonaConfig
+    ) -> tuple[Suite, ValueHashes, tuple[SuiteKey, Suite, ValueHashes] | None]:
+        """
+        Get the test suite of a request, parsing it if it is not cached.
+
+        :return: The test suite, the hashes of its expected values and, if the test
+                 suite was parsed, what must be passed back to the server.
+        """
+        path = Path(config.resources, config.test_suite).resolve()
+        stat = path.stat()
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        if key in self.suites:
+            # Let the server know the test suite is used, for the eviction order.
+            self._notify({"used": [str(path), key[1], key[2]]})
+            return *self.suites[key], None
+        _logger.debug(f"Parsing test suite {path}")
+        suite = read_test_suite(config)
+        hashes = hash_expected_values(suite)
+        return suite, hashes, (key, suite, hashes)
+
+    def report_suite(
+        self, config: DodonaConfig, key: SuiteKey, suite: Suite, hashes: ValueHashes
+    ):
+        """
+        Pass a test suite that was parsed in a forked process back to the server.
+        """
+        try:
+            with tempfile.NamedTemporaryFile(
+                dir=self._parsed_directory, suffix=".pickle", delete=False
+            ) as file:
+                pickle.dump((config.resources, key, suite, hashes), file)
+            self._notify({"parsed": file.name})
+        except Exception as e:
+            _logger.warning("Could not pass the test suite to the server", exc_info=e)
+
+    def _notify(self, message: dict):
+        # Short writes to a pipe are atomic, so the messages are not interleaved.
+        os.write(self._messages_writer, json.dumps(message).encode() + b"\n")
+
+    def service_actions(self):
+        super().service_actions()
+        try:
+            self._messages_buffer += os.read(self._messages_reader, 65536)
+        except BlockingIOError:
+            return
+        *messages, self._messages_buffer = self._messages_buffer.split(b"\n")
+        for message in map(json.loads, messages):
+            if "used" in message:
+                path, mtime, size = message["used"]
+                key = (Path(path), mtime, size)
+                if key in self.suites:
+                    self.suites.move_to_end(key)
+                continue
+            try:
+                with open(message["parsed"], "rb") as file:
+                    resources, key, suite, hashes = pickle.load(file)
+                os.unlink(message["parsed"])
+            except Exception as e:
+                _logger.warning("Could not load a parsed test suite", exc_info=e)
+                continue
+            # The hashes are keyed by the id of the values, which changed.
+            hashes = {id(value): (value, h) for value, h in hashes.values()}
+            self.add_suite(resources, key, suite, hashes)
+
+    def add_suite(
+        self, resources: Path, key: SuiteKey, suite: Suite, hashes: ValueHashes
+    ):
+        """
+        Cache a test suite, together with the resource files it uses.
+        """
+        for other in [k for k in self.suites if k[0] == key[0]]:
+            del self.suites[other]
+        self.suites[key] = (suite, hashes)
+        while len(self.suites) > SUITE_CACHE_SIZE:
+            self.suites.popitem(last=False)
+        self.read_resources(resources, suite)
+
+    def read_resources(self, resources: Path, suite: Suite):
+        """
+        Read the resource files used by the test suite into the resource cache.
+        """
+        for tab in suite.tabs:
+            for context in tab.contexts:
+                for testcase in context.testcases:
+                    output = testcase.output
+                    channels = [output.stdout, output.stderr, output.file]
+                    if isinstance(testcase.input, MainInput):
+                        channels.append(testcase.input.stdin)
+                    for channel in channels:
+                        if isinstance(channel, FileOutputChannel) or (
+                            isinstance(channel, TextData)
+                            and channel.type == TextChannelType.FILE
+                        ):
+                            try:
+                                channel.get_data_as_string(resources, self.resources)
+                            except OSError:
+                                # Reported when judging the submission.
+                                pass
+
+    def server_close(self):
+        super().server_close()
+        os.close(self._messages_reader)
+        os.close(self._messages_writer)
+        shutil.rmtree(self._parsed_directory, ignore_errors=True)
+
+
+class UnixJudgeServer(JudgeServer, socketserver.UnixStreamServer):
+    pass
+
+
+class TCPJudgeServer(JudgeServer, socketserver.TCPServer):
+    allow_reuse_address = True
+
+
+def create_server(
+    socket_path: Path | None = None, port: int | None = None, workers: int = 1
+) -> JudgeServer:
+    """
+    Create a server listening on a Unix socket or on a TCP port on localhost.
+
+    :param socket_path: The path of the Unix socket.
+    :param port: The TCP port, if no Unix socket is given.
+    :param workers: The maximal number of submissions judged concurrently.
+    """
+    warm_up()
+    if socket_path is not None:
+        return UnixJudgeServer(str(socket_path), _JudgeHandler, workers=workers)
+    assert port is not None, "A socket or a port is required."
+    return TCPJudgeServer(("127.0.0.1", port), _JudgeHandler, workers=workers)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Run TESTed as a long-running server.")
+    address = parser.add_mutually_exclusive_group(required=True)
+    address.add_argument(
+        "-s",
+        "--socket",
+        type=Path,
+        help="Path of the Unix socket to listen on",
+        default=None,
+    )
+    address.add_argument(
+        "-p",
+        "--port",
+        type=int,
+        help="TCP port to listen on (on localhost)",
+        default=None,
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        help="Maximal number of submissions judged concurrently",
+        default=os.cpu_count() or 1,
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        dest="verbose",
+        help="Include verbose logs.",
+        action="store_true",
+    )
+    args = parser.parse_args()
+
+    if args.verbose:
+        log = logging.getLogger()
+        log.setLevel(logging.DEBUG)
+        ch = logging.StreamHandler(stream=sys.stderr)
+        formatter = logging.Formatter("%(name)s:%(levelname)s:%(message)s")
+        ch.setFormatter(formatter)
+        log.addHandler(ch)
+
+    with create_server(args.socket, args.port, args.workers) as server:
+        print(f"Listening on {server.server_address}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
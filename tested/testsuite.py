@@ -39,7 +39,7 @@ from tested.serialisation import (
     Value,
     WithFunctions,
 )
-from tested.utils import flatten, is_statement_strict
+from tested.utils import ResourceCache, flatten, is_statement_strict
 
 
 @unique
@@ -220,6 +220,13 @@ def _resolve_path(working_directory, file_path):
         return path.abspath(path.join(working_directory, file_path))
 
 
+def _read_file(file_path: str, cache: ResourceCache | None) -> str:
+    if cache is not None:
+        return cache.read_text(file_path)
+    with open(file_path, "r") as file:
+        return file.read()
+
+
 @define
 class TextData(WithFeatures):
     """Describes textual data: either directly or in a file."""
@@ -227,14 +234,20 @@ class TextData(WithFeatures):
     data: str
     type: TextChannelType = TextChannelType.TEXT
 
-    def get_data_as_string(self, working_directory: Path) -> str:
-        """Get the data as a string, reading the file if necessary."""
+    def get_data_as_string(
+        self, working_directory: Path, cache: ResourceCache | None = None
+    ) -> str:
+        """
+        Get the data as a string, reading the file if necessary.
+
+        :param working_directory: The directory relative paths are resolved against.
+        :param cache: Optional cache to read the file from.
+        """
         if self.type == TextChannelType.TEXT:
             return self.data
         elif self.type == TextChannelType.FILE:
             file_path = _resolve_path(working_directory, self.data)
-            with open(file_path, "r") as file:
-                return file.read()
+            return _read_file(file_path, cache)
         else:
             raise AssertionError(f"Unknown enum type {self.type}")
 
@@ -266,10 +279,14 @@ class FileOutputChannel(WithFeatures):
     def get_used_features(self) -> FeatureSet:
         return NOTHING
 
-    def get_data_as_string(self, resources: Path) -> str:
-        file_path = _resolve_path(resources, self.expected_path)
-        with open(file_path, "r") as file:
-            return file.read()
+    def get_expected_file(self, resources: Path) -> str:
+        """Get the absolute path to the file with the expected contents."""
+        return _resolve_path(resources, self.expected_path)
+
+    def get_data_as_string(
+        self, resources: Path, cache: ResourceCache | None = None
+    ) -> str:
+        return _read_file(self.get_expected_file(resources), cache)
 
 
 @fallback_field(get_converter(), {"evaluator": "oracle"})
@@ -366,6 +383,46 @@ class ExitCodeOutputChannel(WithFeatures):
         return NOTHING
 
 
+@unique
+class TimeMeasure(StrEnum):
+    """The time that is measured for a testcase."""
+
+    WALL = auto()
+    """The elapsed (wall-clock) time."""
+    CPU = auto()
+    """The processor time used by the process."""
+
+
+@define
+class TimeOutputChannel(WithFeatures):
+    """
+    Handles the time needed to execute the statement or expression of a testcase.
+
+    The testcase is correct if the measured time does not exceed the budget,
+    increased by the tolerance. The budget is a fixed number of seconds: TESTed does
+    not time the reference solution itself, so its time must be measured
+    beforehand. Only Python, JavaScript and C support measuring the time.
+    """
+
+    budget: float = field()
+    """The budget, in seconds."""
+    tolerance: float = 0.0
+    """The allowed excess, relative to the budget (e.g. 0.5 allows 50% more)."""
+    measure: TimeMeasure = TimeMeasure.WALL
+
+    @budget.validator  # type: ignore
+    def check_budget(self, _, value: float):
+        if value <= 0:
+            raise ValueError("The time budget must be positive.")
+
+    def get_used_features(self) -> FeatureSet:
+        return FeatureSet({Construct.TIMING}, set(), set())
+
+    @property
+    def limit(self) -> float:
+        return self.budget * (1 + self.tolerance)
+
+
 @unique
 class EmptyChannel(WithFeatures, StrEnum):
     """There is nothing on this output channel."""
@@ -392,7 +449,7 @@ OracleOutputChannel = Union[
     TextOutputChannel, FileOutputChannel, ValueOutputChannel, ExceptionOutputChannel
 ]
 
-NormalOutputChannel = OracleOutputChannel | ExitCodeOutputChannel
+NormalOutputChannel = OracleOutputChannel | ExitCodeOutputChannel | TimeOutputChannel
 
 OutputChannel = NormalOutputChannel | SpecialOutputChannel
 
@@ -401,6 +458,7 @@ FileOutput = FileOutputChannel | IgnoredChannel
 ExceptionOutput = ExceptionOutputChannel | SpecialOutputChannel
 ValueOutput = ValueOutputChannel | SpecialOutputChannel
 ExitOutput = ExitCodeOutputChannel | IgnoredChannel | EmptyChannel
+TimeOutput = TimeOutputChannel | IgnoredChannel
 
 
 @define
@@ -413,6 +471,7 @@ class Output(WithFeatures):
     exception: ExceptionOutput = EmptyChannel.NONE
     result: ValueOutput = EmptyChannel.NONE
     exit_code: ExitOutput = IgnoredChannel.IGNORED
+    time: TimeOutput = IgnoredChannel.IGNORED
 
     def get_used_features(self) -> FeatureSet:
         return combine_features(
@@ -422,6 +481,7 @@ class Output(WithFeatures):
                 self.file.get_used_features(),
                 self.exception.get_used_features(),
                 self.result.get_used_features(),
+                self.time.get_used_features(),
             ]
         )
 
@@ -466,11 +526,13 @@ class MainInput(WithFeatures, WithFunctions):
     arguments: list[str] = field(factory=list)
     main_call: Literal[True] = True
 
-    def get_as_string(self, working_directory: Path) -> str:
+    def get_as_string(
+        self, working_directory: Path, cache: ResourceCache | None = None
+    ) -> str:
         if self.stdin == EmptyChannel.NONE:
             return ""
         else:
-            return self.stdin.get_data_as_string(working_directory)
+            return self.stdin.get_data_as_string(working_directory, cache)
 
     def get_used_features(self) -> FeatureSet:
         if self.arguments:
@@ -602,11 +664,11 @@ class Context(WithFeatures, WithFunctions):
     def get_functions(self) -> Iterable[FunctionCall]:
         return flatten(x.get_functions() for x in self.testcases)
 
-    def get_stdin(self, resources: Path) -> str:
+    def get_stdin(self, resources: Path, cache: ResourceCache | None = None) -> str:
         first_testcase = self.testcases[0]
         if self.has_main_testcase():
             assert isinstance(first_testcase.input, MainInput)
-            return first_testcase.input.get_as_string(resources)
+            return first_testcase.input.get_as_string(resources, cache)
         else:
             return ""
 
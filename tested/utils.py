@@ -1,11 +1,16 @@
 import contextlib
+import io
 import itertools
 import logging
+import mmap
+import operator
+import os
 import random
 import string
 import sys
-from collections.abc import Callable, Iterable
-from itertools import zip_longest
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
 from pathlib import Path
 from typing import IO, TYPE_CHECKING, Any, TypeGuard, TypeVar
 from typing import get_args as typing_get_args
@@ -167,131 +172,215 @@ def sorted_no_duplicates(
     key: Callable[[T], K] = lambda x: x,
     recursive_key: Callable[[K], K] | None = None,
 ) -> list[T]:
-    # Order functions
-    def type_order(x: Any, y: Any) -> int:
-        """
-        Determine order for different types
-        :param x: value one
-        :param y: value two
-        :return: order index of type
-        """
-        x, y = str(type(x)), str(type(y))
-        return int(x < y) - int(x > y)
+    """
+    Sort the values and remove duplicates.
 
-    def order_iterable(iter0: Iterable[Any], iter1: Iterable[Any]) -> int:
-        """
-        Determine order between two iterables
+    Values of a different type are ordered by the name of their type. Values of the
+    same type are ordered by their natural order, where iterables (except strings)
+    are compared element by element.
 
-        :param iter0: first iterable
-        :param iter1: second iterable
-        :return: 1 if iter0 < iter1 else -1 if iter0 > iter1 else 0
-        """
-        for x, y in zip_longest(iter0, iter1):
-            cmp = order(x, y)
-            if cmp != 0:
-                return cmp
-        return 0
+    This computes a sort key for each value once, after which the built-in sort is
+    used. Of values that are considered equal, the first one is kept.
+
+    :param iterable: The values to sort.
+    :param key: The part of the value that is used to sort.
+    :param recursive_key: Applied to the key and, recursively, to the elements of
+                          the key if it is an iterable, before comparing them.
+    :return: The sorted values, without duplicates.
+    """
+    type_names: dict[type, str] = dict()
+
+    def sort_key(x: Any) -> tuple[str, Any]:
+        if recursive_key is not None and x is not None:
+            x = recursive_key(x)
+        x_type = type(x)
+        type_name = type_names.get(x_type)
+        if type_name is None:
+            type_name = type_names[x_type] = str(x_type)
+        if not isinstance(x, str) and isinstance(x, Iterable):
+            return type_name, tuple(sort_key(y) for y in x)
+        return type_name, x
+
+    keyed = sorted(
+        ((sort_key(key(v)), v) for v in iterable), key=operator.itemgetter(0)
+    )
+    no_dup = []
+    last_key = None
+    for v_key, v in keyed:
+        if not no_dup or v_key != last_key:
+            no_dup.append(v)
+            last_key = v_key
+    return no_dup
 
-    def order(x: Any, y: Any) -> int:
+
+class MemoCache:
+    """
+    Memoises computations on objects, by the identity of the object.
+
+    The cache keeps the objects alive, so their identity cannot be reused while the
+    result is in the cache. If a maximal size is given, the least recently used
+    results are removed. The number of hits and misses is tracked, to allow
+    checking if the cache is useful.
+    """
+
+    __slots__ = ["maxsize", "hits", "misses", "_entries", "_lock"]
+
+    def __init__(self, maxsize: int | None = None):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[
+            tuple[int, Hashable], tuple[Any, Any]
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, obj: Any, key: Hashable, compute: Callable[[], T]) -> T:
         """
-        Determine order between two types
+        Get the result of a computation on an object, computing it if needed.
 
-        :param x: first value
-        :param y: second value
-        :return: 1 if x < y else -1 if x > y else 0
+        :param obj: The object the computation is about.
+        :param key: Identifies the computation (and its other parameters).
+        :param compute: Does the computation.
+
+        :return: The (possibly cached) result.
         """
-        if recursive_key:  # Parent function parameter
-            if x is not None:
-                x = recursive_key(x)
-            if y is not None:
-                y = recursive_key(y)
-        cmp = type_order(x, y)
-        if cmp != 0:
-            return cmp
-        elif not isinstance(x, str) and isinstance(x, Iterable):
-            return order_iterable(x, y)
-        else:
-            return int(x < y) - int(x > y)
+        entry_key = (id(obj), key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(entry_key)
+                return entry[1]
+            self.misses += 1
+        result = compute()
+        with self._lock:
+            self._entries[entry_key] = (obj, result)
+            if self.maxsize is not None:
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return result
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+# Resource files of at least this size are memory-mapped instead of read, so their
+# decoded text is not kept in memory.
+MMAP_THRESHOLD = 1024 * 1024
+# The maximal size of the resource files that are cached, in bytes.
+RESOURCE_CACHE_SIZE = 256 * 1024 * 1024
+
+
+class ResourceCache:
+    """
+    Caches the contents of resource files, such as files with the expected output.
+
+    The contents are keyed by the path, the size and the modification time of the
+    file, so a file is read again if it changes. Small files are kept as a string.
+    Large files (see MMAP_THRESHOLD) are memory-mapped instead, so they are not
+    kept in memory as a decoded string: they are decoded each time they are read.
+    The least recently used files are removed once the cached files are larger
+    than the maximal size (in bytes, see RESOURCE_CACHE_SIZE).
+    """
 
-    # Sort functions, custom implementation needed for efficient recursive ordering
-    # of values that have different types
-    def insertion_sort(list_t: list[T], start: int, end: int) -> list[T]:
+    __slots__ = ["threshold", "maxsize", "reads", "size", "_entries", "_lock"]
+
+    def __init__(
+        self, threshold: int = MMAP_THRESHOLD, maxsize: int | None = RESOURCE_CACHE_SIZE
+    ):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.reads = 0
+        self.size = 0
+        self._entries: OrderedDict[
+            str, tuple[tuple[int, int], str | mmap.mmap]
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, file_path: str | Path) -> str | mmap.mmap:
         """
-        Insertion sort
-        :param list_t: list to sort
-        :param start: start of range to sort
-        :param end: end of range to sort
-        :return: the list itself
+        Get the contents of a file, reading it if needed.
+
+        :param file_path: The absolute path to the file.
+        :return: The contents as a string, or a read-only memory map for large files.
         """
-        for i in range(start + 1, end):
-            j = i - 1
-            item = list_t[i]
-            item_key = key(item)
-            while j >= start and order(key(list_t[j]), item_key) < 0:
-                list_t[j + 1] = list_t[j]
-                j -= 1
-            list_t[j + 1] = item
-        return list_t
-
-    def merge(to_list: list[T], from_list: list[T], start: int, middle: int, end: int):
+        file_path = str(file_path)
+        stat = os.stat(file_path)
+        version = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(file_path)
+                return entry[1]
+
+        contents: str | mmap.mmap
+        if 0 < self.threshold <= stat.st_size:
+            with open(file_path, "rb") as file:
+                contents = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            with open(file_path, "r") as file:
+                contents = file.read()
+        with self._lock:
+            self.reads += 1
+            previous = self._entries.pop(file_path, None)
+            if previous is not None:
+                self.size -= previous[0][0]
+            self._entries[file_path] = (version, contents)
+            self.size += stat.st_size
+            if self.maxsize is not None:
+                # The file that was just read is kept, even if it is too large.
+                while self.size > self.maxsize and len(self._entries) > 1:
+                    _, ((evicted, _), _) = self._entries.popitem(last=False)
+                    self.size -= evicted
+        return contents
+
+    def read_text(self, file_path: str | Path) -> str:
         """
-        Merge two sorted sublist to sorted list
-
-        :param to_list: output list
-        :param from_list: input list
-        :param start: start of first half
-        :param middle: end of first half, start of second half
-        :param end: end of second half
-        :return: No return value
+        Get the contents of a file as a string, like reading it in text mode.
+
+        :param file_path: The absolute path to the file.
+        :return: The contents of the file.
         """
-        i, j, k = start, middle, start
-        while i < middle and j < end:
-            if order(key(from_list[i]), key(from_list[j])) > 0:
-                to_list[k] = from_list[i]
-                i += 1
-            else:
-                to_list[k] = from_list[j]
-                j += 1
-            k += 1
-        if i < middle:
-            to_list[k:end] = from_list[i:middle]
-        else:
-            to_list[k:end] = from_list[j:end]
+        contents = self.get(file_path)
+        if isinstance(contents, str):
+            return contents
+        with self.open_text(file_path) as text:
+            return text.read()
 
-    def timsort(list_t: list[T], timgroup: int = 32) -> list[T]:
+    def open_text(self, file_path: str | Path) -> IO[str]:
         """
-        Time sort algorithm
-        :param list_t: the modifiable list to sort
-        :param timgroup: the number of elements to sort with insertion sort
-        :return: The sort list
+        Open a file in text mode, reading from the cached contents.
+
+        This allows reading large files incrementally, without decoding them
+        completely.
+
+        :param file_path: The absolute path to the file.
+        :return: The opened file.
         """
-        len_list_t = len(list_t)
-        for i in range(0, len_list_t, timgroup):
-            insertion_sort(list_t, i, min(i + timgroup, len_list_t))
-        copy = list(list_t)
-        while timgroup < len_list_t:
-            for start in range(0, len_list_t, 2 * timgroup):
-                middle = min(len_list_t, start + timgroup)
-                end = min(len_list_t, start + 2 * timgroup)
-                merge(list_t, copy, start, middle, end)
-            list_t, copy = copy, list_t
-            timgroup *= 2
-        return copy
-
-    # Sort and filterout duplicates
-    first, last_key, no_dup, list_iter = True, None, [], list(iterable)
-    for v in timsort(list_iter):
-        if not first:
-            key_v = key(v)
-            if order(key_v, last_key) == 0:
-                continue
-            else:
-                no_dup.append(v)
-                last_key = key_v
-        else:
-            first, last_key = False, key(v)
-            no_dup.append(v)
-    return no_dup
+        contents = self.get(file_path)
+        if isinstance(contents, str):
+            return io.StringIO(contents, newline=None)
+        return io.TextIOWrapper(io.BufferedReader(_MappedReader(contents)))
+
+
+class _MappedReader(io.RawIOBase):
+    """
+    Reads from a memory map, without closing the memory map when closed.
+    """
+
+    def __init__(self, mapped: mmap.mmap):
+        self._mapped = mapped
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), len(self._mapped) - self._position)
+        buffer[:size] = self._mapped[self._position : self._position + size]
+        self._position += size
+        return size
 
 
 def is_statement_strict(statement: Any) -> TypeGuard["Assignment"]:
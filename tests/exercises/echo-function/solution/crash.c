@@ -0,0 +1,9 @@
+#include <signal.h>
+#include <string.h>
+
+char* echo(char* content) {
+    if (strcmp(content, "input-2") == 0) {
+        raise(SIGSEGV);
+    }
+    return content;
+}
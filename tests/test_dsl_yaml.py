@@ -31,8 +31,11 @@ from tested.testsuite import (
     FileUrl,
     GenericTextOracle,
     GenericValueOracle,
+    IgnoredChannel,
     LanguageLiterals,
     TextOutputChannel,
+    TimeMeasure,
+    TimeOutputChannel,
     ValueOutputChannel,
     parse_test_suite,
 )
@@ -1100,3 +1103,27 @@ def test_empty_text_data_newlines():
     suite = parse_test_suite(json_str)
     actual_stderr = suite.tabs[0].contexts[0].testcases[0].output.stderr.data
     assert actual_stderr == "\n"
+
+
+def test_time_channel():
+    yaml_str = """
+- tab: "Timed"
+  testcases:
+  - expression: 'sort(data)'
+    time: 0.5
+  - expression: 'sort(data)'
+    time:
+      budget: 2
+      tolerance: 0.25
+      measure: cpu
+  - expression: 'sort(data)'
+        """
+    json_str = translate_to_test_suite(yaml_str)
+    suite = parse_test_suite(json_str)
+    testcases = [context.testcases[0] for context in suite.tabs[0].contexts]
+    assert testcases[0].output.time == TimeOutputChannel(budget=0.5)
+    assert testcases[1].output.time == TimeOutputChannel(
+        budget=2, tolerance=0.25, measure=TimeMeasure.CPU
+    )
+    assert testcases[1].output.time.limit == 2.5
+    assert testcases[2].output.time == IgnoredChannel.IGNORED
@@ -6,26 +6,54 @@ make them usable for multiple languages.
 Running the tests should happen in with the root directory (the one with src/ and
 tests/) as the working directory.
 """
+import json
 import shutil
 import sys
+import time
 from pathlib import Path
 
 import pytest
 
 from tested.configs import create_bundle
-from tested.datatypes import BasicBooleanTypes, BasicNumericTypes, BasicStringTypes
-from tested.judge.execution import ExecutionResult
+from tested.datatypes import (
+    BasicBooleanTypes,
+    BasicNumericTypes,
+    BasicObjectTypes,
+    BasicSequenceTypes,
+    BasicStringTypes,
+)
+from tested.judge import judge
+from tested.judge.execution import ExecutionResult, _StreamedChannel
+from tested.judge.planning import PlanStrategy, plan_test_suite
 from tested.languages import LANGUAGES
 from tested.languages.conventionalize import submission_name
-from tested.languages.generation import generate_statement, get_readable_input
+from tested.languages.generation import (
+    generate_execution,
+    generate_statement,
+    generate_suite_statement,
+    get_readable_input,
+)
+from tested.languages.preparation import SECRET_VARIABLES
+from tested.main import read_test_suite
 from tested.serialisation import (
     BooleanType,
     FunctionCall,
     FunctionType,
     NumberType,
+    ObjectKeyValuePair,
+    ObjectType,
+    SequenceType,
     StringType,
 )
-from tested.testsuite import Context, MainInput, Suite, Tab, Testcase, TextData
+from tested.testsuite import (
+    Context,
+    MainInput,
+    Suite,
+    Tab,
+    Testcase,
+    TextData,
+    parse_test_suite,
+)
 from tests.manual_utils import assert_valid_output, configuration, execute_config
 
 COMPILE_LANGUAGES = [
@@ -800,6 +828,280 @@ def test_javascript_exception_missing_message(tmp_path: Path, pytestconfig):
     assert updates.find_status_enum() == ["wrong"]
 
 
+@pytest.mark.parametrize("language", ALL_LANGUAGES)
+def test_generated_code_does_not_depend_on_secrets(
+    language: str, tmp_path: Path, pytestconfig
+):
+    conf = configuration(
+        pytestconfig, "echo-function", language, tmp_path, "one.tson", "correct"
+    )
+    with open(conf.resources / "one.tson", "r") as f:
+        suite = parse_test_suite(f.read())
+
+    generated = []
+    for attempt in ("first", "second"):
+        bundle = create_bundle(conf, sys.stdout, suite)
+        destination = tmp_path / attempt
+        destination.mkdir()
+        unit = plan_test_suite(bundle, PlanStrategy.OPTIMAL)[0]
+        name, _ = generate_execution(bundle, destination, unit)
+        generated.append((destination / name).read_text())
+        assert bundle.testcase_separator_secret not in generated[-1]
+        assert bundle.context_separator_secret not in generated[-1]
+
+    assert generated[0] == generated[1]
+
+
+class _TimedOutput:
+    """Records when each line of output was written."""
+
+    def __init__(self):
+        self.lines: list[tuple[float, str]] = []
+
+    def write(self, text: str) -> int:
+        self.lines.append((time.perf_counter(), text))
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def _slow_echo_configuration(
+    pytestconfig, tmp_path: Path, delay: int, time_limit: int = 3600
+):
+    evaluation = tmp_path / "evaluation"
+    evaluation.mkdir()
+    (evaluation / "suite.yaml").write_text(
+        "- tab: 'Echo'\n"
+        "  contexts:\n"
+        "    - testcases:\n"
+        "        - expression: 'echo(\"a\")'\n"
+        "          return: 'a'\n"
+        "    - testcases:\n"
+        "        - expression: 'echo(\"b\")'\n"
+        "          return: 'b'\n"
+        "    - testcases:\n"
+        "        - expression: 'echo(\"slow\")'\n"
+        "          return: 'slow'\n"
+    )
+    solution = tmp_path / "solution.py"
+    solution.write_text(
+        "import time\n"
+        "def echo(value):\n"
+        "    if value == 'slow':\n"
+        f"        time.sleep({delay})\n"
+        "    return value\n"
+    )
+    workdir = tmp_path / "workdir"
+    workdir.mkdir()
+    return configuration(
+        pytestconfig,
+        "echo-function",
+        "python",
+        workdir,
+        "suite.yaml",
+        options={
+            "resources": evaluation,
+            "source": solution,
+            "time_limit": time_limit,
+            "options": {"stream_contexts": True},
+        },
+    )
+
+
+def test_contexts_are_reported_while_unit_is_running(tmp_path: Path, pytestconfig):
+    conf = _slow_echo_configuration(pytestconfig, tmp_path, delay=3)
+    output = _TimedOutput()
+    judge(create_bundle(conf, output, read_test_suite(conf)))
+    result = "".join(text for _, text in output.lines)
+    updates = assert_valid_output(result, pytestconfig)
+    assert updates.find_status_enum() == ["correct", "correct", "correct"]
+
+    first_context = next(t for t, text in output.lines if "close-context" in text)
+    end = output.lines[-1][0]
+    assert end - first_context > 2
+
+
+def test_completed_contexts_are_reported_on_timeout(tmp_path: Path, pytestconfig):
+    conf = _slow_echo_configuration(pytestconfig, tmp_path, delay=100, time_limit=5)
+    result = execute_config(conf)
+    updates = assert_valid_output(result, pytestconfig)
+    assert updates.find_status_enum() == [
+        "correct",
+        "correct",
+        "time limit exceeded",
+        "time limit exceeded",
+    ]
+
+
+@pytest.mark.parametrize("new_session", [False, True])
+def test_processes_started_by_submission_do_not_block_judgement(
+    new_session: bool, tmp_path: Path, pytestconfig
+):
+    evaluation = tmp_path / "evaluation"
+    evaluation.mkdir()
+    (evaluation / "suite.yaml").write_text(
+        "- tab: 'Echo'\n"
+        "  contexts:\n"
+        "    - testcases:\n"
+        "        - expression: 'echo(\"a\")'\n"
+        "          return: 'a'\n"
+        "    - testcases:\n"
+        "        - expression: 'echo(\"b\")'\n"
+        "          return: 'b'\n"
+    )
+    solution = tmp_path / "solution.py"
+    solution.write_text(
+        "import subprocess\n"
+        f"subprocess.Popen(['sleep', '25'], start_new_session={new_session})\n"
+        "def echo(value):\n"
+        "    return value\n"
+    )
+    workdir = tmp_path / "workdir"
+    workdir.mkdir()
+    conf = configuration(
+        pytestconfig,
+        "echo-function",
+        "python",
+        workdir,
+        "suite.yaml",
+        options={
+            "resources": evaluation,
+            "source": solution,
+            "time_limit": 4,
+            "options": {"stream_contexts": True},
+        },
+    )
+    start = time.perf_counter()
+    result = execute_config(conf)
+    assert time.perf_counter() - start < 15
+    updates = assert_valid_output(result, pytestconfig)
+    if new_session:
+        # The process keeps the output of the submission open.
+        assert "time limit exceeded" in updates.find_status_enum()
+    else:
+        # The process is stopped together with the submission.
+        assert updates.find_status_enum() == ["correct", "correct"]
+
+
+_LEAKING_SOLUTIONS = {
+    "python": (
+        "solution.py",
+        "import os, subprocess\n"
+        "names = {names}\n"
+        "child = subprocess.run(['env'], capture_output=True, text=True).stdout\n"
+        "leaked = any(n in os.environ or f'{{n}}=' in child for n in names)\n"
+        "print('leaked' if leaked else input())\n",
+    ),
+    "javascript": (
+        "solution.js",
+        "const names = {names};\n"
+        "const child = require('child_process').execSync('env').toString();\n"
+        "const leaked = names.some(n => n in process.env || child.includes(`${{n}}=`));\n"
+        "const input = require('fs').readFileSync(0).toString().trimEnd();\n"
+        "console.log(leaked ? 'leaked' : input);\n",
+    ),
+    "c": (
+        "solution.c",
+        "#include <stdio.h>\n"
+        "#include <stdlib.h>\n"
+        "int main() {{\n"
+        "    const char* names[] = {{{c_names}}};\n"
+        "    int leaked = system(\"env | grep -q '^TESTED_'\") == 0;\n"
+        "    for (int i = 0; i < {count}; i++) leaked |= getenv(names[i]) != NULL;\n"
+        "    char line[100];\n"
+        "    fgets(line, sizeof line, stdin);\n"
+        '    printf("%s", leaked ? "leaked\\n" : line);\n'
+        "}}\n",
+    ),
+    "bash": (
+        "solution.sh",
+        "leaked=0\n"
+        "env | grep -q '^TESTED_' && leaked=1\n"
+        "for name in {sh_names}; do [[ -v $name ]] && leaked=1; done\n"
+        "read -r line\n"
+        'if ((leaked)); then echo leaked; else echo "$line"; fi\n',
+    ),
+}
+
+
+@pytest.mark.parametrize("language", list(_LEAKING_SOLUTIONS))
+def test_submission_cannot_read_secrets(language: str, tmp_path: Path, pytestconfig):
+    name, template = _LEAKING_SOLUTIONS[language]
+    solution = tmp_path / name
+    solution.write_text(
+        template.format(
+            names=json.dumps(SECRET_VARIABLES),
+            c_names=", ".join(json.dumps(n) for n in SECRET_VARIABLES),
+            count=len(SECRET_VARIABLES),
+            sh_names=" ".join(SECRET_VARIABLES),
+        )
+    )
+    workdir = tmp_path / "workdir"
+    workdir.mkdir()
+    conf = configuration(
+        pytestconfig,
+        "echo",
+        language,
+        workdir,
+        "one.tson",
+        options={"source": solution},
+    )
+    result = execute_config(conf)
+    updates = assert_valid_output(result, pytestconfig)
+    assert updates.find_status_enum() == ["correct"]
+
+
+@pytest.mark.parametrize(
+    "exercise,suite,solution",
+    [
+        ("isbn", "full.tson", "solution"),
+        ("echo-function", "programmed.tson", "correct"),
+        ("echo", "one.tson", "wrong"),
+    ],
+)
+def test_oracle_pool_preserves_output(
+    tmp_path: Path, pytestconfig, exercise: str, suite: str, solution: str
+):
+    results = []
+    for pool in (False, True):
+        options = {"options": {"parallel": True, "parallel_oracles": pool}}
+        workdir = tmp_path / str(pool)
+        workdir.mkdir()
+        conf = configuration(
+            pytestconfig, exercise, "python", workdir, suite, solution, options
+        )
+        results.append(execute_config(conf))
+    assert_valid_output(results[1], pytestconfig)
+    assert results[0] == results[1]
+
+
+def test_oracle_pool_reports_failing_oracle(tmp_path: Path, pytestconfig):
+    origin = Path(pytestconfig.rootdir) / "tests" / "exercises" / "echo"
+    evaluation = tmp_path / "evaluation"
+    shutil.copytree(origin / "evaluation", evaluation)
+    with open(evaluation / "evaluator.py", "a") as evaluator:
+        evaluator.write(
+            "\n\ndef evaluate_crash(_context):\n    import os\n    os._exit(1)\n"
+        )
+    suite = (evaluation / "one-programmed-correct.tson").read_text()
+    suite = suite.replace("evaluate_correct", "evaluate_crash")
+    (evaluation / "crash.tson").write_text(suite)
+    workdir = tmp_path / "workdir"
+    workdir.mkdir()
+    options = {
+        "resources": evaluation,
+        "options": {"parallel": True, "parallel_oracles": True},
+    }
+    conf = configuration(
+        pytestconfig, "echo", "python", workdir, "crash.tson", "correct", options
+    )
+    result = execute_config(conf)
+    updates = assert_valid_output(result, pytestconfig)
+    assert updates.find_status_enum() == ["internal error"]
+    assert len(updates.find_all("start-testcase")) == 1
+
+
 def test_timeouts_propagate_to_contexts():
     execution_result = ExecutionResult(
         stdout="--PaqJwrEn0-- SEP--pBoq4YdEP-- SEP",
@@ -846,6 +1148,119 @@ def test_function_arguments_without_brackets(tmp_path: Path, pytestconfig):
     )
 
 
+def test_generate_statement_truncates_large_values(tmp_path: Path, pytestconfig):
+    conf = configuration(pytestconfig, "", "python", tmp_path)
+    bundle = create_bundle(conf, sys.stdout, Suite())
+    statement = SequenceType(
+        type=BasicSequenceTypes.SEQUENCE,
+        data=[
+            NumberType(type=BasicNumericTypes.INTEGER, data=i) for i in range(100000)
+        ],
+    )
+
+    result = generate_statement(bundle, statement, limit=30)
+    assert result.startswith("[0, 1, 2, 3")
+    assert result.endswith(", ...]")
+    assert len(result) < 40
+    # The value itself is not changed.
+    assert len(statement.data) == 100000
+
+    result = generate_statement(bundle, statement)
+    assert result.endswith(", 99999]")
+
+
+def test_generate_statement_truncates_long_strings(tmp_path: Path, pytestconfig):
+    conf = configuration(pytestconfig, "", "python", tmp_path)
+    bundle = create_bundle(conf, sys.stdout, Suite())
+    statement = StringType(type=BasicStringTypes.TEXT, data="a" * 1000)
+    result = generate_statement(bundle, statement, limit=20)
+    # The marker is not part of the string literal.
+    assert result.startswith("'aaaa")
+    assert result.endswith("'...")
+    assert len(result) <= 20
+
+    statement = StringType(type=BasicStringTypes.TEXT, data="\n" * 1000)
+    result = generate_statement(bundle, statement, limit=20)
+    assert result.endswith("\\n'...")
+    assert len(result) <= 20
+
+
+@pytest.mark.parametrize("language", ["python", "javascript"])
+def test_generate_statement_truncates_between_elements(
+    language: str, tmp_path: Path, pytestconfig
+):
+    conf = configuration(pytestconfig, "", language, tmp_path)
+    bundle = create_bundle(conf, sys.stdout, Suite())
+    statement = ObjectType(
+        type=BasicObjectTypes.MAP,
+        data=[
+            ObjectKeyValuePair(
+                key=StringType(type=BasicStringTypes.TEXT, data=f"key-{i}"),
+                value=NumberType(type=BasicNumericTypes.REAL, data=i / 3),
+            )
+            for i in range(1000)
+        ],
+    )
+    full = generate_statement(bundle, statement)
+    result = generate_statement(bundle, statement, limit=100)
+    assert len(result) <= 100
+    kept, _, rest = result.rpartition(", ...")
+    # The kept elements are the same as in the full value.
+    assert full.startswith(kept + ", ")
+    assert rest in ("}", ": ...}")
+
+
+def _function_call_suite(testcases: int) -> Suite:
+    contexts = [
+        Context(
+            testcases=[
+                Testcase(
+                    input=FunctionCall(
+                        type=FunctionType.FUNCTION,
+                        name="echo",
+                        arguments=[
+                            StringType(type=BasicStringTypes.TEXT, data=f"input-{i}")
+                        ],
+                    )
+                )
+            ]
+        )
+        for i in range(testcases)
+    ]
+    return Suite(tabs=[Tab(contexts=contexts, name="tab")])
+
+
+def test_readable_input_is_memoised(tmp_path: Path, pytestconfig):
+    conf = configuration(pytestconfig, "", "python", tmp_path)
+    suite = _function_call_suite(3)
+    bundle = create_bundle(conf, sys.stdout, suite)
+    testcases = [c.testcases[0] for c in suite.tabs[0].contexts]
+
+    first = [get_readable_input(bundle, case) for case in testcases]
+    second = [get_readable_input(bundle, case) for case in testcases]
+    assert first == second
+    assert first[0][0].description == "echo('input-0')"
+    assert generate_suite_statement(bundle, testcases[0].input) == "echo('input-0')"
+    # The statements were rendered once, for the first readable input.
+    assert bundle.render_cache.hits == 4
+    assert bundle.render_cache.misses == 6
+
+
+@pytest.mark.benchmark
+def test_readable_input_benchmark(tmp_path: Path, pytestconfig):
+    conf = configuration(pytestconfig, "", "python", tmp_path)
+    suite = _function_call_suite(5000)
+    bundle = create_bundle(conf, sys.stdout, suite)
+    testcases = [c.testcases[0] for c in suite.tabs[0].contexts]
+
+    for _ in range(3):
+        for case in testcases:
+            get_readable_input(bundle, case)
+    cache = bundle.render_cache
+    assert cache.misses == 2 * len(testcases)
+    assert cache.hits == 2 * len(testcases)
+
+
 @pytest.mark.parametrize(
     "language_and_expected",
     [
@@ -1081,3 +1496,117 @@ def test_stdin_token_is_unique(tmp_path: Path, pytestconfig):
     assert (
         actual.description == "$ submission hello << 'STDINN'\nOne line\nSTDIN\nSTDINN"
     )
+
+
+@pytest.mark.parametrize("language", ["python", "javascript", "c"])
+def test_time_channel(language: str, tmp_path: Path, pytestconfig):
+    conf = configuration(
+        pytestconfig, "echo-function", language, tmp_path, "timed.yaml", "correct"
+    )
+    result = execute_config(conf)
+    updates = assert_valid_output(result, pytestconfig)
+    channels = [x["channel"] for x in updates.find_all("start-test")]
+    assert channels == ["return", "time"] * 3
+    # The last testcase has an impossible budget.
+    assert updates.find_status_enum() == ["correct"] * 5 + ["wrong"]
+
+
+def test_time_channel_needs_support_of_language(tmp_path: Path, pytestconfig):
+    conf = configuration(
+        pytestconfig, "echo-function", "bash", tmp_path, "timed.yaml", "correct"
+    )
+    result = execute_config(conf)
+    updates = assert_valid_output(result, pytestconfig)
+    assert updates.find_status_enum() == ["internal error"]
+    messages = updates.find_all("append-message")
+    assert len(messages) == 1
+    assert "c, javascript, python" in str(messages[0]["message"])
+
+
+def test_crash_keeps_results_of_previous_contexts(tmp_path: Path, pytestconfig):
+    conf = configuration(
+        pytestconfig, "echo-function", "c", tmp_path, "two-contexts.yaml", "crash"
+    )
+    result = execute_config(conf)
+    updates = assert_valid_output(result, pytestconfig)
+    statuses = updates.find_status_enum()
+    assert statuses[0] == "correct"
+    assert "correct" not in statuses[1:]
+
+
+def _python_output_configuration(
+    pytestconfig, tmp_path: Path, suite: str, solution: str
+):
+    evaluation = tmp_path / "evaluation"
+    evaluation.mkdir()
+    (evaluation / "suite.yaml").write_text(suite)
+    source = tmp_path / "solution.py"
+    source.write_text(solution)
+    workdir = tmp_path / "workdir"
+    workdir.mkdir()
+    return configuration(
+        pytestconfig,
+        "echo-function",
+        "python",
+        workdir,
+        "suite.yaml",
+        options={"resources": evaluation, "source": source},
+    )
+
+
+def test_python_output_is_attributed_to_its_testcase(tmp_path: Path, pytestconfig):
+    suite = "- tab: 'Echo'\n  contexts:\n"
+    for context in ("a", "b"):
+        suite += "    - testcases:\n"
+        for testcase in ("1", "2", "3"):
+            suite += (
+                f"        - expression: 'echo(\"{context}{testcase}\")'\n"
+                f"          return: '{context}{testcase}'\n"
+                f'          stdout: "{context}{testcase}\\n"\n'
+                f'          stderr: "error {context}{testcase}\\n"\n'
+            )
+    solution = (
+        "import sys\n"
+        "def echo(value):\n"
+        "    print(value)\n"
+        "    print('error', value, file=sys.stderr)\n"
+        "    return value\n"
+    )
+    conf = _python_output_configuration(pytestconfig, tmp_path, suite, solution)
+    result = execute_config(conf)
+    updates = assert_valid_output(result, pytestconfig)
+    assert updates.find_status_enum() == ["correct"] * 18
+
+
+def test_python_output_is_kept_when_submission_exits(tmp_path: Path, pytestconfig):
+    suite = (
+        "- tab: 'Echo'\n"
+        "  contexts:\n"
+        "    - testcases:\n"
+        "        - expression: 'echo(\"a\")'\n"
+        "          return: 'a'\n"
+        '          stdout: "a\\n"\n'
+        "    - testcases:\n"
+        "        - expression: 'echo(\"exit\")'\n"
+        '          stdout: "exit\\n"\n'
+    )
+    solution = (
+        "import sys\n"
+        "def echo(value):\n"
+        "    print(value)\n"
+        "    if value == 'exit':\n"
+        "        sys.exit(0)\n"
+        "    return value\n"
+    )
+    conf = _python_output_configuration(pytestconfig, tmp_path, suite, solution)
+    result = execute_config(conf)
+    updates = assert_valid_output(result, pytestconfig)
+    assert updates.find_status_enum() == ["correct"] * 3
+
+
+def test_streamed_channel_splits_contexts_over_chunks():
+    channel = _StreamedChannel("--")
+    for chunk in ("--a", "b-", "-c", "d--", "e", "f", "--"):
+        channel.append(chunk)
+    assert channel.positions == [0, 4, 8, 12]
+    assert [channel.context(i) for i in range(3)] == ["ab", "cd", "ef"]
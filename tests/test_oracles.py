@@ -1,22 +1,40 @@
+import math
+import random
 import sys
+import tracemalloc
 from pathlib import Path
 from unittest.mock import ANY
 
+import pytest
+from attrs import evolve
+
 import tested
 from tested.configs import create_bundle
-from tested.datatypes import BasicObjectTypes, BasicSequenceTypes, BasicStringTypes
+from tested.datatypes import (
+    BasicBooleanTypes,
+    BasicNumericTypes,
+    BasicObjectTypes,
+    BasicSequenceTypes,
+    BasicStringTypes,
+)
 from tested.dodona import Status
 from tested.oracles.common import OracleConfig
 from tested.oracles.exception import evaluate as evaluate_exception
 from tested.oracles.text import evaluate_file, evaluate_text
+from tested.oracles.timing import evaluate as evaluate_timing
+from tested.oracles.value import _compare_numeric_sequences
 from tested.oracles.value import evaluate as evaluate_value
 from tested.parsing import get_converter
 from tested.serialisation import (
+    BooleanType,
     ExceptionValue,
+    NumberType,
     ObjectKeyValuePair,
     ObjectType,
     SequenceType,
     StringType,
+    structural_hash,
+    to_python_comparable,
 )
 from tested.testsuite import (
     ExceptionOutputChannel,
@@ -24,6 +42,8 @@ from tested.testsuite import (
     FileOutputChannel,
     Suite,
     TextOutputChannel,
+    TimeMeasure,
+    TimeOutputChannel,
     ValueOutputChannel,
 )
 from tests.manual_utils import configuration
@@ -132,19 +152,18 @@ def test_text_oracle_round_to(tmp_path: Path, pytestconfig):
     assert result.readable_actual == "1.5"
 
 
+def _file_channel(tmp_path: Path, expected: str, actual: str) -> FileOutputChannel:
+    (tmp_path / "expected.txt").write_text(expected)
+    (tmp_path / "actual.txt").write_text(actual)
+    return FileOutputChannel(
+        expected_path=str(tmp_path / "expected.txt"), actual_path="actual.txt"
+    )
+
+
 def test_file_oracle_full_wrong(tmp_path: Path, pytestconfig, mocker):
     config = oracle_config(tmp_path, pytestconfig, {"mode": "full"})
     s = mocker.spy(tested.oracles.text, name="compare_text")
-    mock_files = [
-        mocker.mock_open(read_data=content).return_value
-        for content in ["expected\nexpected", "actual\nactual"]
-    ]
-    mock_opener = mocker.mock_open()
-    mock_opener.side_effect = mock_files
-    mocker.patch("builtins.open", mock_opener)
-    channel = FileOutputChannel(
-        expected_path="expected.txt", actual_path="expected.txt"
-    )
+    channel = _file_channel(tmp_path, "expected\nexpected", "actual\nactual")
     result = evaluate_file(config, channel, "")
     s.assert_called_once_with(ANY, "expected\nexpected", "actual\nactual")
     assert result.result.enum == Status.WRONG
@@ -155,16 +174,7 @@ def test_file_oracle_full_wrong(tmp_path: Path, pytestconfig, mocker):
 def test_file_oracle_full_correct(tmp_path: Path, pytestconfig, mocker):
     config = oracle_config(tmp_path, pytestconfig, {"mode": "full"})
     s = mocker.spy(tested.oracles.text, name="compare_text")
-    mock_files = [
-        mocker.mock_open(read_data=content).return_value
-        for content in ["expected\nexpected", "expected\nexpected"]
-    ]
-    mock_opener = mocker.mock_open()
-    mock_opener.side_effect = mock_files
-    mocker.patch("builtins.open", mock_opener)
-    channel = FileOutputChannel(
-        expected_path="expected.txt", actual_path="expected.txt"
-    )
+    channel = _file_channel(tmp_path, "expected\nexpected", "expected\nexpected")
     result = evaluate_file(config, channel, "")
     s.assert_called_once_with(ANY, "expected\nexpected", "expected\nexpected")
     assert result.result.enum == Status.CORRECT
@@ -176,21 +186,11 @@ def test_file_oracle_line_wrong(tmp_path: Path, pytestconfig, mocker):
     config = oracle_config(
         tmp_path, pytestconfig, {"mode": "line", "stripNewlines": True}
     )
-    s = mocker.spy(tested.oracles.text, name="compare_text")
-    mock_files = [
-        mocker.mock_open(read_data=content).return_value
-        for content in ["expected\nexpected2", "actual\nactual2"]
-    ]
-    mock_opener = mocker.mock_open()
-    mock_opener.side_effect = mock_files
-    mocker.patch("builtins.open", mock_opener)
-    channel = FileOutputChannel(
-        expected_path="expected.txt", actual_path="expected.txt"
-    )
+    s = mocker.spy(tested.oracles.text, name="match_text")
+    channel = _file_channel(tmp_path, "expected\nexpected2", "actual\nactual2")
     result = evaluate_file(config, channel, "")
-    s.assert_any_call(ANY, "expected", "actual")
-    s.assert_any_call(ANY, "expected2", "actual2")
-    assert s.call_count == 2
+    # The comparison stops at the first difference.
+    s.assert_called_once_with(ANY, "expected", "actual")
     assert result.result.enum == Status.WRONG
     assert result.readable_expected == "expected\nexpected2"
     assert result.readable_actual == "actual\nactual2"
@@ -200,21 +200,11 @@ def test_file_oracle_line_correct(tmp_path: Path, pytestconfig, mocker):
     config = oracle_config(
         tmp_path, pytestconfig, {"mode": "line", "stripNewlines": True}
     )
-    s = mocker.spy(tested.oracles.text, name="compare_text")
-    mock_files = [
-        mocker.mock_open(read_data=content).return_value
-        for content in ["expected\nexpected2", "expected\nexpected2"]
-    ]
-    mock_opener = mocker.mock_open()
-    mock_opener.side_effect = mock_files
-    mocker.patch("builtins.open", mock_opener)
-    channel = FileOutputChannel(
-        expected_path="expected.txt", actual_path="expected.txt"
-    )
+    s = mocker.spy(tested.oracles.text, name="match_text")
+    channel = _file_channel(tmp_path, "expected\nexpected2", "expected\nexpected2")
     result = evaluate_file(config, channel, "")
-    s.assert_any_call(ANY, "expected", "expected")
-    s.assert_any_call(ANY, "expected2", "expected2")
-    assert s.call_count == 2
+    # Identical lines are not compared with the options.
+    s.assert_not_called()
     assert result.result.enum == Status.CORRECT
     assert result.readable_expected == "expected\nexpected2"
     assert result.readable_actual == "expected\nexpected2"
@@ -224,21 +214,11 @@ def test_file_oracle_strip_lines_correct(tmp_path: Path, pytestconfig, mocker):
     config = oracle_config(
         tmp_path, pytestconfig, {"mode": "line", "stripNewlines": True}
     )
-    s = mocker.spy(tested.oracles.text, name="compare_text")
-    mock_files = [
-        mocker.mock_open(read_data=content).return_value
-        for content in ["expected\nexpected2\n", "expected\nexpected2"]
-    ]
-    mock_opener = mocker.mock_open()
-    mock_opener.side_effect = mock_files
-    mocker.patch("builtins.open", mock_opener)
-    channel = FileOutputChannel(
-        expected_path="expected.txt", actual_path="expected.txt"
-    )
+    s = mocker.spy(tested.oracles.text, name="match_text")
+    channel = _file_channel(tmp_path, "expected\nexpected2\n", "expected\nexpected2")
     result = evaluate_file(config, channel, "")
-    s.assert_any_call(ANY, "expected", "expected")
-    s.assert_any_call(ANY, "expected2", "expected2")
-    assert s.call_count == 2
+    # Without the newlines, the lines are identical.
+    s.assert_not_called()
     assert result.result.enum == Status.CORRECT
     assert result.readable_expected == "expected\nexpected2\n"
     assert result.readable_actual == "expected\nexpected2"
@@ -248,26 +228,171 @@ def test_file_oracle_dont_strip_lines_correct(tmp_path: Path, pytestconfig, mock
     config = oracle_config(
         tmp_path, pytestconfig, {"mode": "line", "stripNewlines": False}
     )
-    s = mocker.spy(tested.oracles.text, name="compare_text")
-    mock_files = [
-        mocker.mock_open(read_data=content).return_value
-        for content in ["expected\nexpected2\n", "expected\nexpected2\n"]
-    ]
-    mock_opener = mocker.mock_open()
-    mock_opener.side_effect = mock_files
-    mocker.patch("builtins.open", mock_opener)
-    channel = FileOutputChannel(
-        expected_path="expected.txt", actual_path="expected.txt"
-    )
+    s = mocker.spy(tested.oracles.text, name="match_text")
+    channel = _file_channel(tmp_path, "expected\nexpected2\n", "expected\nexpected2\n")
     result = evaluate_file(config, channel, "")
-    s.assert_any_call(ANY, "expected\n", "expected\n")
-    s.assert_any_call(ANY, "expected2\n", "expected2\n")
-    assert s.call_count == 2
+    s.assert_not_called()
     assert result.result.enum == Status.CORRECT
     assert result.readable_expected == "expected\nexpected2\n"
     assert result.readable_actual == "expected\nexpected2\n"
 
 
+@pytest.mark.parametrize("separator", ["\n", "\x0c", "\x1e", "\u2028"])
+@pytest.mark.parametrize("limit", [None, 10])
+def test_file_oracle_line_boundaries(
+    tmp_path: Path, pytestconfig, separator: str, limit: int | None
+):
+    conf = configuration(
+        pytestconfig,
+        "",
+        "python",
+        tmp_path,
+        options={"options": {"readable_limit": limit}},
+    )
+    bundle = create_bundle(conf, sys.stdout, Suite())
+    options = {"mode": "line", "stripNewlines": True}
+    config = OracleConfig(bundle=bundle, options=options, context_dir=tmp_path)
+    channel = _file_channel(tmp_path, f"one{separator}two\n", "one\ntwo")
+    result = evaluate_file(config, channel, "")
+    assert result.result.enum == Status.CORRECT
+
+
+def test_file_oracle_large_files_are_streamed_by_default(
+    tmp_path: Path, pytestconfig, monkeypatch
+):
+    monkeypatch.setattr(tested.oracles.text, "MMAP_THRESHOLD", 1000)
+    config = oracle_config(tmp_path, pytestconfig, {"mode": "line"})
+    assert config.bundle.config.options.readable_limit is None
+    expected = _numbered_lines(10000)
+    actual = list(expected)
+    actual[5000] = "line five thousand\n"
+    channel = _file_channel(tmp_path, "".join(expected), "".join(actual))
+    result = evaluate_file(config, channel, "")
+    assert result.result.enum == Status.WRONG
+    assert "line five thousand\n" in result.readable_actual
+    assert len(result.readable_actual) < 1000
+
+
+def test_file_oracle_large_files_numbers_per_line(tmp_path: Path, pytestconfig, mocker):
+    config = _large_file_config(
+        tmp_path, pytestconfig, {"mode": "line", "tryFloatingPoint": True}
+    )
+    s = mocker.spy(tested.oracles.text, name="compare_files")
+    expected = "".join(f"{i}\n" for i in range(1000))
+    actual = "".join(f"{i}.0\n" for i in range(1000))
+    channel = _file_channel(tmp_path, expected, actual)
+    assert evaluate_file(config, channel, "").result.enum == Status.CORRECT
+    s.assert_called_once()
+    channel = _file_channel(tmp_path, expected, actual.replace("500.0", "500.5"))
+    result = evaluate_file(config, channel, "")
+    assert result.result.enum == Status.WRONG
+    assert "500.5\n" in result.readable_actual
+
+
+@pytest.mark.parametrize("mode", ["full", "line"])
+def test_file_oracle_large_files_try_floating_point(
+    tmp_path: Path, pytestconfig, mode: str
+):
+    config = _large_file_config(
+        tmp_path, pytestconfig, {"mode": mode, "tryFloatingPoint": True}
+    )
+    expected = "1" + "0" * 200
+    channel = _file_channel(tmp_path, f"{expected}\n", f"{expected}.0\n")
+    result = evaluate_file(config, channel, "")
+    assert result.result.enum == Status.CORRECT
+
+
+def test_file_oracle_reads_expected_file_once(tmp_path: Path, pytestconfig):
+    config = oracle_config(tmp_path, pytestconfig, {"mode": "full"})
+    channel = _file_channel(tmp_path, "expected\n", "expected\n")
+    for _ in range(3):
+        result = evaluate_file(config, channel, "")
+        assert result.result.enum == Status.CORRECT
+    assert config.bundle.resource_cache.reads == 1
+
+
+def _large_file_config(tmp_path: Path, pytestconfig, options: dict) -> OracleConfig:
+    conf = configuration(
+        pytestconfig,
+        "",
+        "python",
+        tmp_path,
+        options={"options": {"readable_limit": 100}},
+    )
+    bundle = create_bundle(conf, sys.stdout, Suite())
+    return OracleConfig(bundle=bundle, options=options, context_dir=tmp_path)
+
+
+def _numbered_lines(count: int) -> list[str]:
+    return [f"line {i}\n" for i in range(count)]
+
+
+@pytest.mark.parametrize("mode", ["full", "line"])
+def test_file_oracle_large_files_stop_at_difference(
+    tmp_path: Path, pytestconfig, mode: str
+):
+    config = _large_file_config(tmp_path, pytestconfig, {"mode": mode})
+    expected = _numbered_lines(10000)
+    actual = list(expected)
+    actual[5000] = "line five thousand\n"
+    channel = _file_channel(tmp_path, "".join(expected), "".join(actual))
+    result = evaluate_file(config, channel, "")
+    assert result.result.enum == Status.WRONG
+    assert "line 5000\n" in result.readable_expected
+    assert "line five thousand\n" in result.readable_actual
+    assert result.readable_expected.startswith("...")
+    assert result.readable_actual.endswith("...")
+    assert len(result.readable_expected) < 10000
+
+
+@pytest.mark.parametrize("mode", ["full", "line"])
+def test_file_oracle_large_files_correct(tmp_path: Path, pytestconfig, mode: str):
+    config = _large_file_config(
+        tmp_path, pytestconfig, {"mode": mode, "caseInsensitive": True}
+    )
+    expected = "".join(_numbered_lines(10000))
+    channel = _file_channel(tmp_path, expected, expected.upper())
+    result = evaluate_file(config, channel, "")
+    assert result.result.enum == Status.CORRECT
+    assert result.readable_expected.endswith("line 9999\n")
+    assert len(result.readable_actual) < 10000
+
+
+def test_file_oracle_large_files_ignore_trailing_whitespace(
+    tmp_path: Path, pytestconfig
+):
+    expected = "".join(_numbered_lines(10000))
+    config = _large_file_config(
+        tmp_path, pytestconfig, {"mode": "full", "ignoreWhitespace": True}
+    )
+    channel = _file_channel(tmp_path, expected, expected + "  \n\n")
+    assert evaluate_file(config, channel, "").result.enum == Status.CORRECT
+    channel = _file_channel(tmp_path, expected, expected + "  \nmore")
+    assert evaluate_file(config, channel, "").result.enum == Status.WRONG
+
+    config = _large_file_config(
+        tmp_path, pytestconfig, {"mode": "full", "ignoreWhitespace": False}
+    )
+    channel = _file_channel(tmp_path, expected, expected + "  \n\n")
+    assert evaluate_file(config, channel, "").result.enum == Status.WRONG
+
+
+@pytest.mark.benchmark
+def test_file_oracle_large_files_benchmark(tmp_path: Path, pytestconfig):
+    config = _large_file_config(tmp_path, pytestconfig, {"mode": "line"})
+    contents = "".join(_numbered_lines(2 * 10**6))
+    channel = _file_channel(tmp_path, contents, contents)
+    del contents
+
+    tracemalloc.start()
+    result = evaluate_file(config, channel, "")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # The files are not read completely.
+    assert result.result.enum == Status.CORRECT
+    assert peak < 10 * 1024 * 1024
+
+
 def test_exception_oracle_only_messages_correct(tmp_path: Path, pytestconfig):
     config = oracle_config(tmp_path, pytestconfig)
     channel = ExceptionOutputChannel(exception=ExpectedException(message="Test error"))
@@ -661,3 +786,210 @@ def test_values_identical_list_is_detected(tmp_path: Path, pytestconfig):
     config = oracle_config(tmp_path, pytestconfig, language="python")
     result = evaluate_value(config, channel, actual_value)
     assert result.result.enum == Status.CORRECT
+
+
+def _numbers(values: list) -> SequenceType:
+    data = []
+    for value in values:
+        if isinstance(value, list):
+            data.append(_numbers(value))
+        elif isinstance(value, float):
+            data.append(NumberType(type=BasicNumericTypes.REAL, data=value))
+        else:
+            data.append(NumberType(type=BasicNumericTypes.INTEGER, data=value))
+    return SequenceType(type=BasicSequenceTypes.SEQUENCE, data=data)
+
+
+def test_numeric_sequences_are_compared_with_tolerance(tmp_path: Path, pytestconfig):
+    channel = ValueOutputChannel(value=_numbers([0.1 + 0.2, math.nan, 1e300]))
+    actual_value = get_converter().dumps(_numbers([0.3, math.nan, 1e300]))
+    config = oracle_config(tmp_path, pytestconfig)
+    result = evaluate_value(config, channel, actual_value)
+    assert result.result.enum == Status.CORRECT
+    assert result.messages == []
+
+
+def test_numeric_sequences_report_first_difference(tmp_path: Path, pytestconfig):
+    channel = ValueOutputChannel(value=_numbers([1, 2, 3, 4]))
+    actual_value = get_converter().dumps(_numbers([1, 2, 5, 6]))
+    config = oracle_config(tmp_path, pytestconfig)
+    result = evaluate_value(config, channel, actual_value)
+    assert result.result.enum == Status.WRONG
+    assert len(result.messages) == 1
+    assert "[2]" in result.messages[0]
+
+
+def test_numeric_matrices_report_first_difference(tmp_path: Path, pytestconfig):
+    channel = ValueOutputChannel(value=_numbers([[1.0, 2.0], [3.0, 4.0]]))
+    actual_value = get_converter().dumps(_numbers([[1.0, 2.0], [3.5, 4.0]]))
+    config = oracle_config(tmp_path, pytestconfig)
+    result = evaluate_value(config, channel, actual_value)
+    assert result.result.enum == Status.WRONG
+    assert "[1][0]" in result.messages[0]
+
+
+def test_numeric_sequences_of_different_shape_are_wrong(tmp_path: Path, pytestconfig):
+    channel = ValueOutputChannel(value=_numbers([[1, 2], [3, 4]]))
+    actual_value = get_converter().dumps(_numbers([[1, 2, 3], [4]]))
+    config = oracle_config(tmp_path, pytestconfig)
+    result = evaluate_value(config, channel, actual_value)
+    assert result.result.enum == Status.WRONG
+    assert result.messages == []
+
+
+def test_numeric_fast_path_agrees_with_generic_comparison():
+    rng = random.Random(0)
+    pool = [0, 1, -1, 2**70, 0.5, 0.5 + 1e-12, 1e-300, math.nan, math.inf]
+    for _ in range(500):
+        length = rng.randint(1, 4)
+        expected = _numbers([rng.choice(pool) for _ in range(length)])
+        actual = _numbers([rng.choice(pool) for _ in range(length)])
+        fast = _compare_numeric_sequences(expected, actual)
+        generic = to_python_comparable(expected) == to_python_comparable(actual)
+        if fast is not None:
+            assert fast[0] == generic
+
+
+def _random_tested_value(rng: random.Random, depth: int = 0):
+    kinds = ["integer", "boolean", "real", "text"]
+    if depth < 2:
+        kinds += ["sequence", "set", "map"]
+    kind = rng.choice(kinds)
+    if kind == "integer":
+        return NumberType(type=BasicNumericTypes.INTEGER, data=rng.randint(0, 2))
+    if kind == "boolean":
+        return BooleanType(type=BasicBooleanTypes.BOOLEAN, data=rng.random() < 0.5)
+    if kind == "real":
+        return NumberType(type=BasicNumericTypes.REAL, data=rng.choice([0.5, 1.0]))
+    if kind == "text":
+        return StringType(type=BasicStringTypes.TEXT, data=rng.choice(["a", "b"]))
+    elements = [_random_tested_value(rng, depth + 1) for _ in range(rng.randint(0, 2))]
+    if kind == "map":
+        keys = [StringType(type=BasicStringTypes.TEXT, data=k) for k in ("a", "b")]
+        pairs = [ObjectKeyValuePair(key=k, value=v) for k, v in zip(keys, elements)]
+        rng.shuffle(pairs)
+        return ObjectType(type=BasicObjectTypes.MAP, data=pairs)
+    type_ = BasicSequenceTypes.SET if kind == "set" else BasicSequenceTypes.SEQUENCE
+    return SequenceType(type=type_, data=elements)
+
+
+def test_structural_hash_is_consistent_with_comparison():
+    rng = random.Random(0)
+    equal_pairs = 0
+    for _ in range(2000):
+        first, second = _random_tested_value(rng), _random_tested_value(rng)
+        try:
+            equal = to_python_comparable(first) == to_python_comparable(second)
+        except TypeError:
+            continue  # Sets of values that cannot be ordered.
+        first_hash, second_hash = structural_hash(first), structural_hash(second)
+        if equal and first_hash is not None and second_hash is not None:
+            equal_pairs += 1
+            assert first_hash == second_hash
+    assert equal_pairs > 0
+
+
+def _deep_map(leaf: str, depth: int = 10) -> ObjectType:
+    value = StringType(type=BasicStringTypes.TEXT, data=leaf)
+    for level in range(depth):
+        key = StringType(type=BasicStringTypes.TEXT, data=f"level-{level}")
+        value = ObjectType(
+            type=BasicObjectTypes.MAP,
+            data=[ObjectKeyValuePair(key=key, value=value)],
+        )
+    return value
+
+
+def test_different_hashes_skip_full_comparison(tmp_path: Path, pytestconfig, mocker):
+    channel = ValueOutputChannel(value=_deep_map("expected"))
+    config = oracle_config(tmp_path, pytestconfig)
+    spy = mocker.spy(tested.oracles.value, "to_python_comparable")
+
+    result = evaluate_value(config, channel, get_converter().dumps(_deep_map("wrong")))
+    assert result.result.enum == Status.WRONG
+    spy.assert_not_called()
+
+    result = evaluate_value(
+        config, channel, get_converter().dumps(_deep_map("expected"))
+    )
+    assert result.result.enum == Status.CORRECT
+
+
+def test_equal_values_are_not_hashed(tmp_path: Path, pytestconfig, mocker):
+    channel = ValueOutputChannel(value=_deep_map("expected"))
+    config = oracle_config(tmp_path, pytestconfig)
+    spy = mocker.spy(tested.oracles.value, "structural_hash")
+
+    actual = get_converter().dumps(_deep_map("expected"))
+    result = evaluate_value(config, channel, actual)
+    assert result.result.enum == Status.CORRECT
+    # Only the expected value is hashed, which is cached in the bundle.
+    spy.assert_called_once_with(channel.value)
+    assert config.bundle.value_hashes[id(channel.value)][0] is channel.value
+
+    evaluate_value(config, channel, actual)
+    spy.assert_called_once()
+
+
+def test_large_values_are_truncated_in_feedback(tmp_path: Path, pytestconfig):
+    channel = ValueOutputChannel(value=_numbers(list(range(10000))))
+    actual_value = get_converter().dumps(_numbers(list(range(1, 10001))))
+    config = oracle_config(tmp_path, pytestconfig)
+    config.bundle.config.options = evolve(
+        config.bundle.config.options, readable_limit=100
+    )
+    result = evaluate_value(config, channel, actual_value)
+    assert result.result.enum == Status.WRONG
+    assert len(result.readable_expected) < 120
+    assert len(result.readable_actual) < 120
+    assert result.readable_actual.endswith("...]")
+
+
+def test_truncated_values_show_the_difference(tmp_path: Path, pytestconfig):
+    def strings(values: list[str]) -> SequenceType:
+        data = [StringType(type=BasicStringTypes.TEXT, data=x) for x in values]
+        return SequenceType(type=BasicSequenceTypes.SEQUENCE, data=data)
+
+    expected = [str(x) for x in range(10000)]
+    channel = ValueOutputChannel(value=strings(expected))
+    actual = expected[:5000] + ["changed"] + expected[5001:]
+    actual_value = get_converter().dumps(strings(actual))
+    config = oracle_config(tmp_path, pytestconfig)
+    config.bundle.config.options = evolve(
+        config.bundle.config.options, readable_limit=100
+    )
+    result = evaluate_value(config, channel, actual_value)
+    assert result.result.enum == Status.WRONG
+    assert result.readable_expected == result.readable_actual
+    assert len(result.messages) == 1
+    assert "[5000]" in result.messages[0]
+
+
+def test_timing_oracle(tmp_path: Path, pytestconfig):
+    config = oracle_config(tmp_path, pytestconfig)
+    channel = TimeOutputChannel(budget=0.2, tolerance=0.5)
+    result = evaluate_timing(config, channel, "0.25 0.01")
+    assert result.result.enum == Status.CORRECT
+    assert result.readable_actual == "250 ms"
+
+    result = evaluate_timing(config, channel, "1.5 0.01")
+    assert result.result.enum == Status.WRONG
+    assert result.readable_actual == "1.5 s"
+    assert len(result.messages) == 1
+
+    channel = TimeOutputChannel(budget=0.2, measure=TimeMeasure.CPU)
+    assert evaluate_timing(config, channel, "1.5 0.01").result.enum == Status.CORRECT
+
+
+def test_timing_oracle_missing_time(tmp_path: Path, pytestconfig):
+    config = oracle_config(tmp_path, pytestconfig)
+    channel = TimeOutputChannel(budget=1, measure=TimeMeasure.CPU)
+    for value in ("", "0.25", "0.25 nan", "0.25 -1"):
+        result = evaluate_timing(config, channel, value)
+        assert result.result.enum == Status.WRONG
+        assert result.readable_actual == ""
+
+
+def test_time_channel_needs_positive_budget():
+    with pytest.raises(ValueError):
+        TimeOutputChannel(budget=0)
@@ -0,0 +1,86 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+import tested.judge.core
+import tested.languages.c.config
+from tested.judge.harness import HARNESS_FOLDER, MANIFEST_FILE
+from tested.prepare import prepare_exercise
+from tests.manual_utils import assert_valid_output, configuration, execute_config
+
+
+def _copy_exercise(pytestconfig, exercise: str, tmp_path: Path) -> Path:
+    origin = Path(pytestconfig.rootdir) / "tests" / "exercises" / exercise
+    destination = tmp_path / "exercise"
+    shutil.copytree(origin, destination)
+    return destination
+
+
+@pytest.mark.parametrize("language", ["python", "bash"])
+def test_prepared_harness_is_used(language: str, tmp_path: Path, pytestconfig, mocker):
+    exercise = _copy_exercise(pytestconfig, "echo-function", tmp_path)
+    prepared = prepare_exercise(exercise / "evaluation", "two.yaml", [language])
+    assert prepared[language] == exercise / "evaluation" / HARNESS_FOLDER / language
+    assert (prepared[language] / MANIFEST_FILE).is_file()
+
+    workdir = tmp_path / "workdir"
+    workdir.mkdir()
+    conf = configuration(
+        pytestconfig, "echo-function", language, workdir, "two.yaml", "correct"
+    )
+    conf.resources = exercise / "evaluation"
+    spy = mocker.spy(tested.judge.core, "generate_harness")
+    result = execute_config(conf)
+    updates = assert_valid_output(result, pytestconfig)
+    assert updates.find_status_enum() == ["correct"] * 2
+    spy.assert_not_called()
+
+
+def test_prepared_harness_is_ignored_for_other_suite(
+    tmp_path: Path, pytestconfig, mocker
+):
+    exercise = _copy_exercise(pytestconfig, "echo-function", tmp_path)
+    prepare_exercise(exercise / "evaluation", "one.tson", ["python"])
+
+    workdir = tmp_path / "workdir"
+    workdir.mkdir()
+    conf = configuration(
+        pytestconfig, "echo-function", "python", workdir, "two.yaml", "correct"
+    )
+    conf.resources = exercise / "evaluation"
+    spy = mocker.spy(tested.judge.core, "generate_harness")
+    result = execute_config(conf)
+    updates = assert_valid_output(result, pytestconfig)
+    assert updates.find_status_enum() == ["correct"] * 2
+    spy.assert_called_once()
+
+
+def test_prepared_harness_is_not_created_if_generation_uses_submission(
+    tmp_path: Path, pytestconfig
+):
+    exercise = _copy_exercise(pytestconfig, "echo-function", tmp_path)
+    prepared = prepare_exercise(exercise / "evaluation", "two.yaml", ["java"])
+    assert prepared["java"] is None
+    assert not (exercise / "evaluation" / HARNESS_FOLDER / "java").exists()
+
+
+def test_prepared_compiled_harness_is_used(tmp_path: Path, pytestconfig, mocker):
+    exercise = _copy_exercise(pytestconfig, "echo-function", tmp_path)
+    prepared = prepare_exercise(exercise / "evaluation", "two.yaml", ["c"])
+    compiled = exercise / "evaluation" / HARNESS_FOLDER / "compiled"
+    assert prepared["c"] is not None
+    assert prepared["c"].parent == compiled
+    assert (prepared["c"] / "values.o").is_file()
+
+    workdir = tmp_path / "workdir"
+    workdir.mkdir()
+    conf = configuration(
+        pytestconfig, "echo-function", "c", workdir, "two.yaml", "correct"
+    )
+    conf.resources = exercise / "evaluation"
+    spy = mocker.spy(tested.languages.c.config, "compiled_harness")
+    result = execute_config(conf)
+    updates = assert_valid_output(result, pytestconfig)
+    assert updates.find_status_enum() == ["correct"] * 2
+    assert spy.spy_return == prepared["c"]
@@ -0,0 +1,134 @@
+import csv
+import shutil
+from pathlib import Path
+
+from attrs import evolve
+
+from tested.configs import Options
+from tested.dodona import Status
+from tested.judge.harness import HARNESS_FOLDER
+from tested.regrade import (
+    SUMMARY_FILE,
+    exercise_config,
+    find_submissions,
+    percentile,
+    regrade,
+)
+from tests.manual_utils import assert_valid_output, configuration
+
+
+def test_regrade_judges_all_submissions(tmp_path: Path, pytestconfig):
+    origin = Path(pytestconfig.rootdir) / "tests" / "exercises" / "echo"
+    exercise = tmp_path / "exercise"
+    shutil.copytree(origin / "evaluation", exercise / "evaluation")
+
+    submissions = tmp_path / "submissions"
+    for solution in ("correct", "wrong", "run-error"):
+        (submissions / solution).mkdir(parents=True)
+        shutil.copy(origin / "solution" / f"{solution}.py", submissions / solution)
+    found = find_submissions(submissions, "python")
+    assert list(found) == [
+        "correct/correct.py",
+        "run-error/run-error.py",
+        "wrong/wrong.py",
+    ]
+
+    conf = configuration(pytestconfig, "echo", "python", tmp_path, "one.tson")
+    conf = evolve(conf, resources=exercise / "evaluation")
+    output = tmp_path / "output"
+    results = regrade(conf, found, output)
+
+    statuses = {r.submission: (r.status, r.correct, r.tests) for r in results}
+    assert statuses == {
+        "correct/correct.py": ("correct", 1, 1),
+        "run-error/run-error.py": ("runtime error", 0, 2),
+        "wrong/wrong.py": ("wrong", 0, 1),
+    }
+    for name in found:
+        assert_valid_output((output / f"{name}.out").read_text(), pytestconfig)
+    with open(output / SUMMARY_FILE) as summary:
+        rows = list(csv.DictReader(summary))
+    assert [row["status"] for row in rows] == ["correct", "runtime error", "wrong"]
+
+
+def test_find_submissions_in_manifest(tmp_path: Path):
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("# Submissions\na/submission.py\n\nb/submission.py\n")
+    assert find_submissions(manifest, "python") == {
+        "a/submission.py": tmp_path / "a/submission.py",
+        "b/submission.py": tmp_path / "b/submission.py",
+    }
+
+
+def test_percentile():
+    values = [float(x) for x in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile([3.0], 95) == 3.0
+
+
+def test_exercise_config_reads_evaluation_settings(tmp_path: Path):
+    config_file = {
+        "evaluation": {
+            "time_limit": 10,
+            "memory_limit": 1000,
+            "natural_language": "en",
+            "options": {"parallel": True, "readable_limit": 5},
+        }
+    }
+    config = exercise_config(tmp_path, config_file, "suite.yaml", "python")
+    assert config.resources == tmp_path / "evaluation"
+    assert (config.time_limit, config.memory_limit) == (10, 1000)
+    assert config.natural_language == "en"
+    assert config.options.parallel
+    assert config.options.readable_limit == 5
+
+    config = exercise_config(tmp_path, dict(), "suite.yaml", "python")
+    assert (config.time_limit, config.memory_limit) == (60, 536870912)
+    assert config.natural_language == "nl"
+    assert config.options == Options()
+
+
+def test_regrade_does_not_modify_exercise_or_submissions(tmp_path: Path, pytestconfig):
+    origin = Path(pytestconfig.rootdir) / "tests" / "exercises" / "echo"
+    exercise = tmp_path / "exercise"
+    shutil.copytree(origin / "evaluation", exercise / "evaluation")
+    submissions = tmp_path / "submissions"
+    submissions.mkdir()
+    submission = submissions / "shebang.py"
+    submission.write_text("#!tested python\nprint(input())\n")
+
+    conf = configuration(pytestconfig, "echo", "python", tmp_path, "one.tson")
+    conf = evolve(conf, resources=exercise / "evaluation")
+    output = tmp_path / "output"
+    results = regrade(conf, find_submissions(submissions, "python"), output)
+
+    assert [r.status for r in results] == ["correct"]
+    assert submission.read_text() == "#!tested python\nprint(input())\n"
+    assert not (exercise / "evaluation" / HARNESS_FOLDER).exists()
+    assert (output / HARNESS_FOLDER / "python").is_dir()
+
+
+def test_regrade_survives_stopped_worker(tmp_path: Path, pytestconfig):
+    origin = Path(pytestconfig.rootdir) / "tests" / "exercises" / "echo"
+    exercise = tmp_path / "exercise"
+    shutil.copytree(origin / "evaluation", exercise / "evaluation")
+    submissions = tmp_path / "submissions"
+    submissions.mkdir()
+    shutil.copy(origin / "solution" / "correct.py", submissions / "a.py")
+    # The parent of the submission is the worker judging it.
+    (submissions / "b.py").write_text(
+        "import os, signal\nos.kill(os.getppid(), signal.SIGKILL)\n"
+    )
+    shutil.copy(origin / "solution" / "wrong.py", submissions / "c.py")
+
+    conf = configuration(pytestconfig, "echo", "python", tmp_path, "one.tson")
+    conf = evolve(conf, resources=exercise / "evaluation")
+    results = regrade(conf, find_submissions(submissions, "python"), tmp_path / "out")
+
+    statuses = {r.submission: r.status for r in results}
+    assert statuses == {
+        "a.py": "correct",
+        "b.py": Status.INTERNAL_ERROR,
+        "c.py": "wrong",
+    }
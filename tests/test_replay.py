@@ -0,0 +1,80 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+import tested.judge.core
+from tested.configs import create_bundle
+from tested.judge.replay import judgement_key
+from tested.languages.python.config import Python
+from tested.main import read_test_suite
+from tests.manual_utils import assert_valid_output, configuration, execute_config
+
+
+def _cached_configuration(pytestconfig, tmp_path: Path, solution: str, options=None):
+    workdir = Path(tempfile.mkdtemp(dir=tmp_path))
+    all_options = {"replay_cache": str(tmp_path / "cache")}
+    if options:
+        all_options.update(options)
+    return configuration(
+        pytestconfig, "echo", "python", workdir, "one.tson", solution, all_options
+    )
+
+
+def test_identical_submission_is_replayed(tmp_path: Path, pytestconfig, mocker):
+    conf = _cached_configuration(pytestconfig, tmp_path, "correct")
+    first = execute_config(conf)
+
+    spy = mocker.spy(tested.judge.core, "_judge")
+    conf = _cached_configuration(pytestconfig, tmp_path, "correct")
+    second = execute_config(conf)
+    spy.assert_not_called()
+    assert second == first
+    updates = assert_valid_output(second, pytestconfig)
+    assert updates.find_status_enum() == ["correct"]
+
+
+def test_other_submission_is_not_replayed(tmp_path: Path, pytestconfig, mocker):
+    conf = _cached_configuration(pytestconfig, tmp_path, "correct")
+    execute_config(conf)
+
+    spy = mocker.spy(tested.judge.core, "_judge")
+    conf = _cached_configuration(pytestconfig, tmp_path, "wrong")
+    result = execute_config(conf)
+    spy.assert_called_once()
+    updates = assert_valid_output(result, pytestconfig)
+    assert updates.find_status_enum() == ["wrong"]
+
+
+def test_non_deterministic_exercise_is_not_replayed(
+    tmp_path: Path, pytestconfig, mocker
+):
+    options = {"options": {"linter": False, "deterministic": False}}
+    conf = _cached_configuration(pytestconfig, tmp_path, "correct", options)
+    execute_config(conf)
+
+    spy = mocker.spy(tested.judge.core, "_judge")
+    conf = _cached_configuration(pytestconfig, tmp_path, "correct", options)
+    execute_config(conf)
+    spy.assert_called_once()
+    assert not (tmp_path / "cache").exists()
+
+
+def test_other_toolchain_is_not_replayed(
+    tmp_path: Path, pytestconfig, mocker, monkeypatch
+):
+    conf = _cached_configuration(pytestconfig, tmp_path, "correct")
+    execute_config(conf)
+
+    # Another interpreter, as if Python was updated.
+    monkeypatch.setattr(Python, "toolchain", lambda self: ["sh"])
+    spy = mocker.spy(tested.judge.core, "_judge")
+    conf = _cached_configuration(pytestconfig, tmp_path, "correct")
+    execute_config(conf)
+    spy.assert_called_once()
+
+
+def test_missing_submission_is_not_replayed(tmp_path: Path, pytestconfig):
+    conf = _cached_configuration(pytestconfig, tmp_path, "correct")
+    conf.source = tmp_path / "missing.py"
+    bundle = create_bundle(conf, StringIO(), read_test_suite(conf))
+    assert judgement_key(bundle) is None
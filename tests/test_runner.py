@@ -0,0 +1,230 @@
+import sys
+from pathlib import Path
+
+import tested.judge.execution
+from tested.languages.python.config import Python
+from tested.languages.runhaskell.ghci_runner import Session
+from tests.manual_utils import assert_valid_output, configuration, execute_config
+
+# A runner for Python, implementing the protocol of tested.judge.runner. It stops
+# without replying at the given request (or never if it is -1).
+FAKE_RUNNER = """
+import os, subprocess, sys
+
+log = open(sys.argv[1], "a")
+stop_at = int(sys.argv[2])
+count = 0
+while directory := sys.stdin.readline().rstrip("\\n"):
+    main, argument, stdin, stdout, stderr, timeout, size = (
+        sys.stdin.readline().rstrip("\\n") for _ in range(7)
+    )
+    variables = dict(
+        sys.stdin.readline().rstrip("\\n").split("=", 1) for _ in range(int(size))
+    )
+    print(main, file=log, flush=True)
+    if count == stop_at:
+        sys.exit(3)
+    count += 1
+    file = next(f for f in os.listdir(directory) if f.startswith(main + "."))
+    arguments = [argument] if argument else []
+    with open(stdin or os.devnull) as i, open(stdout, "w") as o, open(stderr, "w") as e:
+        result = subprocess.run(
+            [sys.executable, "-u", file, *arguments],
+            cwd=directory,
+            stdin=i,
+            stdout=o,
+            stderr=e,
+            env={**os.environ, **variables},
+        )
+    print(result.returncode, flush=True)
+"""
+
+
+def _use_fake_runner(tmp_path: Path, mocker, stop_at: int = -1) -> Path:
+    runner = tmp_path / "runner.py"
+    runner.write_text(FAKE_RUNNER)
+    log = tmp_path / "requests.txt"
+    command = [sys.executable, str(runner), str(log), str(stop_at)]
+    mocker.patch.object(Python, "unit_runner", return_value=command)
+    return log
+
+
+def test_units_are_executed_by_runner(tmp_path: Path, pytestconfig, mocker):
+    log = _use_fake_runner(tmp_path, mocker)
+    spy = mocker.spy(tested.judge.execution, "execute_file")
+    workdir = tmp_path / "workdir"
+    workdir.mkdir()
+    conf = configuration(
+        pytestconfig,
+        "echo",
+        "python",
+        workdir,
+        "two.tson",
+        "correct",
+        {"options": {"single_process": True}},
+    )
+    result = execute_config(conf)
+    updates = assert_valid_output(result, pytestconfig)
+    assert updates.find_status_enum() == ["correct"] * 2
+    assert len(log.read_text().splitlines()) == 2
+    spy.assert_not_called()
+
+
+def test_runtime_error_in_runner(tmp_path: Path, pytestconfig, mocker):
+    _use_fake_runner(tmp_path, mocker)
+    workdir = tmp_path / "workdir"
+    workdir.mkdir()
+    conf = configuration(
+        pytestconfig,
+        "echo",
+        "python",
+        workdir,
+        "one.tson",
+        "run-error",
+        {"options": {"single_process": True}},
+    )
+    result = execute_config(conf)
+    updates = assert_valid_output(result, pytestconfig)
+    assert updates.find_status_enum() == ["runtime error", "wrong"]
+
+
+def test_runner_falls_back_to_process_per_unit(tmp_path: Path, pytestconfig, mocker):
+    log = _use_fake_runner(tmp_path, mocker, stop_at=0)
+    spy = mocker.spy(tested.judge.execution, "execute_file")
+    workdir = tmp_path / "workdir"
+    workdir.mkdir()
+    conf = configuration(
+        pytestconfig,
+        "echo",
+        "python",
+        workdir,
+        "two.tson",
+        "correct",
+        {"options": {"single_process": True}},
+    )
+    result = execute_config(conf)
+    updates = assert_valid_output(result, pytestconfig)
+    assert updates.find_status_enum() == ["correct"] * 2
+    # The runner is not used again once it stopped.
+    assert len(log.read_text().splitlines()) == 1
+    assert spy.call_count == 2
+
+
+def test_runner_is_not_used_by_default(tmp_path: Path, pytestconfig, mocker):
+    log = _use_fake_runner(tmp_path, mocker)
+    workdir = tmp_path / "workdir"
+    workdir.mkdir()
+    conf = configuration(pytestconfig, "echo", "python", workdir, "one.tson", "correct")
+    result = execute_config(conf)
+    updates = assert_valid_output(result, pytestconfig)
+    assert updates.find_status_enum() == ["correct"]
+    assert not log.exists()
+
+
+def test_bash_units_are_executed_by_runner(tmp_path: Path, pytestconfig, mocker):
+    spy = mocker.spy(tested.judge.execution, "execute_file")
+    conf = configuration(
+        pytestconfig,
+        "echo",
+        "bash",
+        tmp_path,
+        "two.tson",
+        "correct",
+        {"options": {"single_process": True}},
+    )
+    result = execute_config(conf)
+    updates = assert_valid_output(result, pytestconfig)
+    assert updates.find_status_enum() == ["correct"] * 2
+    spy.assert_not_called()
+
+
+def test_bash_runtime_error_in_runner(tmp_path: Path, pytestconfig):
+    conf = configuration(
+        pytestconfig,
+        "echo",
+        "bash",
+        tmp_path,
+        "one.tson",
+        "run-error",
+        {"options": {"single_process": True}},
+    )
+    result = execute_config(conf)
+    updates = assert_valid_output(result, pytestconfig)
+    # Like in its own process, the error is only visible on stderr.
+    assert updates.find_status_enum() == ["wrong", "wrong"]
+
+
+def test_bash_timeout_in_runner(tmp_path: Path, pytestconfig):
+    solution = tmp_path / "solution.sh"
+    solution.write_text("sleep 100\n")
+    workdir = tmp_path / "workdir"
+    workdir.mkdir()
+    conf = configuration(
+        pytestconfig,
+        "echo",
+        "bash",
+        workdir,
+        "one.tson",
+        options={
+            "source": solution,
+            "time_limit": 3,
+            "options": {"single_process": True},
+        },
+    )
+    result = execute_config(conf)
+    updates = assert_valid_output(result, pytestconfig)
+    assert "time limit exceeded" in updates.find_status_enum()
+
+
+# A GHCi that only logs the commands, and replies to the commands of the runner.
+FAKE_GHCI = """
+import sys
+
+log = open(sys.argv[1], "a")
+for line in sys.stdin:
+    print(line.rstrip("\\n"), file=log, flush=True)
+    marker = line.rsplit(" ", 1)[-1].strip().strip('"')
+    if line.startswith("TestedRunner.ready"):
+        print(marker, "ready", flush=True)
+    elif line.startswith("putStrLn"):
+        print(line.split('"')[1], flush=True)
+    elif line.startswith("TestedRunner.runUnit"):
+        print(marker, "0", flush=True)
+"""
+
+
+def test_ghci_session_loads_shared_modules_once(tmp_path: Path):
+    fake = tmp_path / "ghci.py"
+    fake.write_text(FAKE_GHCI)
+    log = tmp_path / "commands.txt"
+    ghci = tmp_path / "ghci"
+    ghci.write_text(f"#!/bin/sh\nexec {sys.executable} {fake} {log}\n")
+    ghci.chmod(0o755)
+
+    def unit(name: str, submission: str) -> Path:
+        directory = tmp_path / name
+        directory.mkdir()
+        (directory / "Submission.hs").write_text(submission)
+        (directory / "Values.hs").write_text("module Values where\n")
+        module = name.capitalize()
+        (directory / f"{module}.hs").write_text(f"module {module} where\n")
+        return directory
+
+    session = Session(str(ghci))
+    try:
+        for name, submission in [("unit0", "a"), ("unit1", "a"), ("unit2", "b")]:
+            directory = unit(name, submission)
+            module = name.capitalize()
+            assert session.load(directory, module)
+            reply = session.run(directory, module, [], [], "", "out", "err", 10)
+            assert reply == "0"
+    finally:
+        session.process.stdin.close()
+        session.process.wait()
+        session.close()
+
+    commands = log.read_text().splitlines()
+    # The submission is only loaded again once it changes.
+    assert len([c for c in commands if c.startswith(":load")]) == 2
+    assert len([c for c in commands if c.startswith(":add")]) == 3
+    assert not session.shared.exists()
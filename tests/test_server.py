@@ -0,0 +1,68 @@
+import socket
+import threading
+import time
+from pathlib import Path
+
+from tested.parsing import get_converter
+from tested.server import _JudgeHandler, create_server
+from tests.manual_utils import assert_valid_output, configuration
+
+
+def _judge_on_server(socket_path: Path, config_json: str) -> str:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(socket_path))
+        client.sendall(config_json.encode("utf-8") + b"\n")
+        with client.makefile("r", encoding="utf-8") as output:
+            return output.read()
+
+
+def test_server_judges_submissions(tmp_path: Path, pytestconfig):
+    socket_path = tmp_path / "tested.sock"
+    server = create_server(socket_path=socket_path, workers=2)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+    thread.start()
+    try:
+        cached = None
+        for solution, expected in (("correct", "correct"), ("wrong", "wrong")):
+            workdir = tmp_path / solution
+            workdir.mkdir()
+            conf = configuration(
+                pytestconfig, "echo", "python", workdir, "one.tson", solution
+            )
+            result = _judge_on_server(socket_path, get_converter().dumps(conf))
+            updates = assert_valid_output(result, pytestconfig)
+            assert updates.find_status_enum() == [expected]
+            # The test suite is parsed by the first judgement and then passed back.
+            deadline = time.monotonic() + 5
+            while not server.suites and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert len(server.suites) == 1
+            if cached is None:
+                cached = next(iter(server.suites.values()))
+            # The second judgement uses the cached test suite.
+            assert next(iter(server.suites.values())) is cached
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
+
+
+def test_server_reports_invalid_requests(tmp_path: Path, pytestconfig, monkeypatch):
+    monkeypatch.setattr(_JudgeHandler, "timeout", 2)
+    socket_path = tmp_path / "tested.sock"
+    server = create_server(socket_path=socket_path, workers=2)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+    thread.start()
+    try:
+        # A client that does not send its configuration does not block the server.
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as idle:
+            idle.connect(str(socket_path))
+            start = time.monotonic()
+            result = _judge_on_server(socket_path, "{}")
+            assert time.monotonic() - start < 2
+        updates = assert_valid_output(result, pytestconfig)
+        assert updates.find_status_enum() == ["internal error"]
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
@@ -1,10 +1,13 @@
 """
 Tests where full exercises are run. These are inherently slower.
 """
+import time
 from pathlib import Path
 
 import pytest
 
+import tested.languages.kotlin.config
+from tested.languages.python.config import Python
 from tests.manual_utils import assert_valid_output, configuration, execute_config
 
 
@@ -84,3 +87,86 @@ def test_full_echo(lang: str, tmp_path: Path, pytestconfig):
     updates = assert_valid_output(result, pytestconfig)
     assert len(updates.find_all("start-testcase")) == 50
     assert updates.find_status_enum() == ["correct"] * 50
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize(
+    "exercise",
+    [
+        ("isbn", "full.tson", "solution"),
+        ("lotto", "plan.tson", "correct"),
+        ("echo", "full.tson", "correct"),
+    ],
+)
+def test_kotlin_startup_benchmark(exercise, tmp_path: Path, pytestconfig, mocker):
+    name, suite, solution = exercise
+    durations = dict()
+    outputs = dict()
+    for runner in ("java", "launcher"):
+        if runner == "launcher":
+            mocker.patch.object(
+                tested.languages.kotlin.config,
+                "kotlin_runtime_classpath",
+                return_value=None,
+            )
+        workdir = tmp_path / runner
+        workdir.mkdir()
+        conf = configuration(pytestconfig, name, "kotlin", workdir, suite, solution)
+        start = time.perf_counter()
+        result = execute_config(conf)
+        durations[runner] = time.perf_counter() - start
+        outputs[runner] = assert_valid_output(result, pytestconfig).find_status_enum()
+    print(
+        f"Kotlin {name}: {durations['java']:.2f} s with java, "
+        f"{durations['launcher']:.2f} s with the launcher."
+    )
+    assert outputs["java"] == outputs["launcher"]
+
+
+@pytest.mark.benchmark
+def test_python_output_benchmark(tmp_path: Path, pytestconfig, mocker, monkeypatch):
+    monkeypatch.delenv("PYTHONUNBUFFERED", raising=False)
+    evaluation = tmp_path / "evaluation"
+    evaluation.mkdir()
+    lines = 200_000
+    (evaluation / "suite.yaml").write_text(
+        "- tab: 'Output'\n"
+        "  testcases:\n"
+        f"    - expression: 'echo({lines})'\n"
+        f"      return: {lines}\n"
+    )
+    source = tmp_path / "solution.py"
+    source.write_text(
+        "def echo(count):\n"
+        "    for i in range(count):\n"
+        "        print(i)\n"
+        "    return count\n"
+    )
+    durations = dict()
+    outputs = dict()
+    for mode in ("buffered", "unbuffered"):
+        if mode == "unbuffered":
+            mocker.patch.object(
+                Python,
+                "execution",
+                side_effect=lambda cwd, file, arguments: ["python3", "-u", file],
+            )
+        workdir = tmp_path / mode
+        workdir.mkdir()
+        conf = configuration(
+            pytestconfig,
+            "echo-function",
+            "python",
+            workdir,
+            "suite.yaml",
+            options={"resources": evaluation, "source": source},
+        )
+        start = time.perf_counter()
+        result = execute_config(conf)
+        durations[mode] = time.perf_counter() - start
+        outputs[mode] = assert_valid_output(result, pytestconfig).find_status_enum()
+    print(
+        f"Python printing {lines} lines: {durations['buffered']:.2f} s buffered, "
+        f"{durations['unbuffered']:.2f} s unbuffered."
+    )
+    assert outputs["buffered"] == outputs["unbuffered"]
@@ -1,9 +1,30 @@
+import functools
 import json
+import mmap
+import os
+import random
+import sys
+from collections.abc import Iterable
+from itertools import zip_longest
 from pathlib import Path
+from typing import Any
 
+import pytest
 import yaml
+from attrs import define
 
-from tested.utils import sorted_no_duplicates
+from tested.configs import create_bundle
+from tested.languages.haskell.config import ghc_info
+from tested.languages.kotlin.config import kotlin_runtime_classpath
+from tested.languages.utils import jvm_shared_archive
+from tested.testsuite import Suite
+from tested.utils import (
+    MMAP_THRESHOLD,
+    RESOURCE_CACHE_SIZE,
+    MemoCache,
+    ResourceCache,
+    sorted_no_duplicates,
+)
 from tests.manual_utils import assert_valid_output, configuration, execute_config
 
 
@@ -26,15 +47,16 @@ def test_javascript_ast_parse():
     from tested.judge.utils import run_command
 
     test_dir = Path(__file__).parent
-    parse_file = test_dir.parent / "tested" / "languages" / "javascript" / "parseAst.js"
+    parse_file = test_dir.parent / "tested" / "languages" / "javascript" / "analyse.js"
     demo_file = test_dir / "testJavascriptAstParserFile.js"
     output = run_command(
         demo_file.parent,
         timeout=None,
         command=["node", parse_file, demo_file.absolute()],
     )
-    namings = frozenset(output.stdout.strip().split(", "))
-    assert namings == expected
+    analysis = json.loads(output.stdout)
+    assert frozenset(analysis["identifiers"]) == expected
+    assert analysis["valid"]
 
 
 def test_run_doctests_tested_utils():
@@ -210,6 +232,188 @@ def test_sort_empty():
     assert [] == sorted_no_duplicates([])
 
 
+def _reference_sorted_no_duplicates(iterable, key=lambda x: x, recursive_key=None):
+    """
+    The comparator-based implementation, used to check the key-based one.
+    """
+
+    def order(x, y) -> int:
+        if recursive_key:
+            if x is not None:
+                x = recursive_key(x)
+            if y is not None:
+                y = recursive_key(y)
+        x_type, y_type = str(type(x)), str(type(y))
+        if x_type != y_type:
+            return int(x_type < y_type) - int(x_type > y_type)
+        elif not isinstance(x, str) and isinstance(x, Iterable):
+            for x_element, y_element in zip_longest(x, y):
+                cmp = order(x_element, y_element)
+                if cmp != 0:
+                    return cmp
+            return 0
+        else:
+            return int(x < y) - int(x > y)
+
+    result = []
+    compare = functools.cmp_to_key(lambda x, y: -order(key(x), key(y)))
+    for v in sorted(iterable, key=compare):
+        if not result or order(key(v), key(result[-1])) != 0:
+            result.append(v)
+    return result
+
+
+def _random_value(rng: random.Random, depth: int = 0):
+    kinds = ["int", "bool", "float", "str"]
+    if depth < 3:
+        kinds += ["tuple", "list"]
+    kind = rng.choice(kinds)
+    if kind == "int":
+        return rng.randint(-5, 5)
+    if kind == "bool":
+        return rng.choice([True, False])
+    if kind == "float":
+        return rng.choice([-1.5, 0.0, 0.5, 2.25])
+    if kind == "str":
+        return rng.choice(["", "a", "ab", "b"])
+    elements = [_random_value(rng, depth + 1) for _ in range(rng.randint(0, 3))]
+    return tuple(elements) if kind == "tuple" else elements
+
+
+@define
+class _Box:
+    data: Any
+
+
+def _boxed(value):
+    if isinstance(value, (list, tuple)):
+        return _Box(type(value)(_boxed(x) for x in value))
+    return _Box(value)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_sort_equivalent_to_comparator(seed: int):
+    rng = random.Random(seed)
+    data = [_random_value(rng) for _ in range(rng.randint(0, 60))]
+    assert sorted_no_duplicates(data) == _reference_sorted_no_duplicates(data)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_sort_key_equivalent_to_comparator(seed: int):
+    rng = random.Random(seed)
+    # Use unique keys, since the comparator does not keep the first duplicate.
+    keys = _reference_sorted_no_duplicates(
+        _random_value(rng) for _ in range(rng.randint(0, 60))
+    )
+    data = [(k, rng.randint(0, 10)) for k in keys]
+    rng.shuffle(data)
+    assert sorted_no_duplicates(
+        data, key=lambda x: x[0]
+    ) == _reference_sorted_no_duplicates(data, key=lambda x: x[0])
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_sort_recursive_equivalent_to_comparator(seed: int):
+    rng = random.Random(seed)
+    data = [_boxed(_random_value(rng)) for _ in range(rng.randint(0, 60))]
+    expected = _reference_sorted_no_duplicates(data, recursive_key=lambda x: x.data)
+    actual = sorted_no_duplicates(data, recursive_key=lambda x: x.data)
+    assert [id(x) for x in actual] == [id(x) for x in expected]
+
+
+@pytest.mark.benchmark
+def test_sort_large_set_benchmark():
+    rng = random.Random(0)
+    data = [(rng.randint(0, 10**6), str(rng.random())) for _ in range(10**5)]
+    data += [rng.random() for _ in range(10**5)]
+    result = sorted_no_duplicates(data)
+    assert len(result) == len(set(data))
+
+
+def test_memo_cache_uses_identity():
+    cache = MemoCache()
+    first, second = [1, 2], [1, 2]
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        return len(value)
+
+    assert cache.get(first, "len", lambda: compute(first)) == 2
+    assert cache.get(first, "len", lambda: compute(first)) == 2
+    assert cache.get(second, "len", lambda: compute(second)) == 2
+    assert calls == [first, second]
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert cache.hit_rate() == pytest.approx(1 / 3)
+
+
+def test_memo_cache_evicts_least_recently_used():
+    cache = MemoCache(maxsize=2)
+    a, b, c = object(), object(), object()
+    cache.get(a, "key", lambda: "a")
+    cache.get(b, "key", lambda: "b")
+    cache.get(a, "key", lambda: "a")
+    cache.get(c, "key", lambda: "c")
+    assert cache.get(a, "key", lambda: "new a") == "a"
+    assert cache.get(b, "key", lambda: "new b") == "new b"
+
+
+def test_resource_cache_reads_files_once(tmp_path: Path):
+    cache = ResourceCache()
+    resource = tmp_path / "expected.txt"
+    resource.write_text("first\n")
+    assert cache.read_text(resource) == "first\n"
+    assert cache.read_text(resource) == "first\n"
+    assert cache.reads == 1
+
+    resource.write_text("second line\n")
+    assert cache.read_text(resource) == "second line\n"
+    assert cache.reads == 2
+
+
+def test_resource_cache_maps_large_files(tmp_path: Path):
+    cache = ResourceCache(threshold=10)
+    resource = tmp_path / "expected.txt"
+    resource.write_bytes(b"one\r\ntwo\nthree\n")
+    assert isinstance(cache.get(resource), mmap.mmap)
+    with open(resource, "r") as file:
+        assert cache.read_text(resource) == file.read()
+    assert cache.reads == 1
+
+    empty = tmp_path / "empty.txt"
+    empty.write_text("")
+    assert cache.read_text(empty) == ""
+
+
+def test_resource_cache_keeps_text_of_small_files_only(tmp_path: Path):
+    cache = ResourceCache()
+    small = tmp_path / "small.txt"
+    small.write_text("small\n")
+    assert isinstance(cache.get(small), str)
+    large = tmp_path / "large.txt"
+    large.write_text("x" * MMAP_THRESHOLD)
+    assert isinstance(cache.get(large), mmap.mmap)
+    assert cache.read_text(large) == "x" * MMAP_THRESHOLD
+    assert cache.maxsize == RESOURCE_CACHE_SIZE
+
+
+def test_resource_cache_removes_least_recently_used_files(tmp_path: Path):
+    cache = ResourceCache(maxsize=10)
+    a, b, c = (tmp_path / name for name in "abc")
+    for resource in (a, b, c):
+        resource.write_text("1234")
+    cache.read_text(a)
+    cache.read_text(b)
+    cache.read_text(a)
+    cache.read_text(c)
+    assert cache.size == 8
+    assert cache.reads == 3
+    cache.read_text(a)
+    assert cache.reads == 3
+    cache.read_text(b)
+    assert cache.reads == 4
+
+
 def test_valid_yaml_and_json():
     """
     Test to validate if all YAML and JSON can be parsed correctly.
@@ -248,3 +452,227 @@ def test_invalid_utf8_output_is_caught(tmp_path: Path, pytestconfig):
     result = execute_config(conf)
     updates = assert_valid_output(result, pytestconfig)
     assert updates.find_status_enum() == ["wrong"] * 5
+
+
+def _fake_jdk(tmp_path: Path, monkeypatch) -> Path:
+    """A JDK whose java command only creates the shared archive."""
+    home = tmp_path / "jdk"
+    (home / "bin").mkdir(parents=True)
+    (home / "lib").mkdir()
+    (home / "release").write_text('JAVA_VERSION="21.0.1"\n')
+    (home / "lib" / "classlist").write_text("java/lang/Object\n")
+    java = home / "bin" / "java"
+    java.write_text(
+        "#!/bin/sh\n"
+        f"echo \"$@\" >> {tmp_path / 'calls.txt'}\n"
+        'for arg in "$@"; do\n'
+        '  case "$arg" in -XX:SharedArchiveFile=*) touch "${arg#*=}";; esac\n'
+        "done\n"
+    )
+    java.chmod(0o755)
+    monkeypatch.setenv("PATH", str(home / "bin"), prepend=os.pathsep)
+    return home
+
+
+def test_jvm_shared_archive_is_created_once(tmp_path: Path, monkeypatch):
+    _fake_jdk(tmp_path, monkeypatch)
+    cache = tmp_path / "cache"
+    archive = jvm_shared_archive(cache, "java")
+    assert archive is not None and archive.exists()
+    assert archive.parent == cache and archive.name.startswith("java-21.0.1-")
+    assert jvm_shared_archive(cache, "java") == archive
+    calls = (tmp_path / "calls.txt").read_text().splitlines()
+    assert len(calls) == 1 and "-Xshare:dump" in calls[0]
+    # Only the archive remains in the cache, not the temporary files.
+    assert list(cache.iterdir()) == [archive]
+
+
+def test_jvm_class_data_sharing_in_execution(tmp_path: Path, monkeypatch, pytestconfig):
+    _fake_jdk(tmp_path, monkeypatch)
+    conf = configuration(
+        pytestconfig, "", "java", tmp_path, options={"jvm_cache": str(tmp_path)}
+    )
+    bundle = create_bundle(conf, sys.stdout, Suite())
+    command = bundle.language.execution(tmp_path, "Selector.class", [])
+    archive = next(tmp_path.glob("java-*.jsa"))
+    assert f"-XX:SharedArchiveFile={archive}" in command
+
+    conf = configuration(pytestconfig, "", "java", tmp_path)
+    bundle = create_bundle(conf, sys.stdout, Suite())
+    command = bundle.language.execution(tmp_path, "Selector.class", [])
+    assert not any("SharedArchiveFile" in option for option in command)
+
+
+def test_kotlin_runs_directly_on_java(tmp_path: Path, monkeypatch, pytestconfig):
+    home = tmp_path / "kotlinc"
+    (home / "bin").mkdir(parents=True)
+    (home / "lib").mkdir()
+    (home / "bin" / "kotlin").touch(mode=0o755)
+    (home / "lib" / "kotlin-stdlib.jar").touch()
+    monkeypatch.setenv("PATH", str(home / "bin"), prepend=os.pathsep)
+    kotlin_runtime_classpath.cache_clear()
+    try:
+        conf = configuration(pytestconfig, "", "kotlin", tmp_path)
+        bundle = create_bundle(conf, sys.stdout, Suite())
+        command = bundle.language.execution(tmp_path, "ExecutionKt.class", ["a"])
+        toolchain = bundle.language.toolchain()
+    finally:
+        kotlin_runtime_classpath.cache_clear()
+    classpath = os.pathsep.join([str(home / "lib" / "kotlin-stdlib.jar"), "."])
+    assert command[0] == "java"
+    assert "java" in toolchain
+    assert command[-4:] == ["-cp", classpath, "ExecutionKt", "a"]
+
+
+def test_jvm_unit_runner(tmp_path: Path, pytestconfig):
+    conf = configuration(pytestconfig, "", "java", tmp_path)
+    bundle = create_bundle(conf, sys.stdout, Suite())
+    command = bundle.language.unit_runner()
+    assert command is not None
+    assert command[0] == "java"
+    assert Path(command[-1]).name == "UnitRunner.java" and Path(command[-1]).is_file()
+
+
+def test_javascript_analysis_checks_syntax(tmp_path: Path):
+    from tested.judge.utils import run_command
+
+    analyse = Path(__file__).parent.parent / "tested/languages/javascript/analyse.js"
+    valid = tmp_path / "valid.js"
+    valid.write_text("function echo(x) {\n    return x;\n}\n")
+    invalid = tmp_path / "invalid.js"
+    invalid.write_text("function echo(x {\n    return x;\n}\n")
+    strict = tmp_path / "strict.js"
+    strict.write_text("with (Math) {\n    abs(-1);\n}\n")
+
+    def is_valid(file: Path) -> bool:
+        output = run_command(tmp_path, None, ["node", str(analyse), str(file)])
+        return json.loads(output.stdout)["valid"]
+
+    assert is_valid(valid)
+    assert not is_valid(invalid)
+    # The submission is checked in strict mode, like it is executed.
+    assert not is_valid(strict)
+
+
+def test_ghci_runner_escapes_haskell_strings():
+    from tested.languages.runhaskell.ghci_runner import haskell_list, haskell_string
+
+    assert haskell_string("hello") == '"hello"'
+    assert haskell_string('a "b" \\ c') == '"a \\34\\&b\\34\\& \\92\\& c"'
+    assert haskell_string("é\n1") == '"\\233\\&\\10\\&1"'
+    assert haskell_list([haskell_string("a"), haskell_string("b")]) == '["a", "b"]'
+
+
+def test_runhaskell_unit_runner_needs_ghci(tmp_path: Path, pytestconfig, mocker):
+    import shutil
+
+    conf = configuration(pytestconfig, "", "runhaskell", tmp_path)
+    bundle = create_bundle(conf, sys.stdout, Suite())
+    mocker.patch.object(shutil, "which", return_value=None)
+    assert bundle.language.unit_runner() is None
+    mocker.patch.object(shutil, "which", return_value="/usr/bin/ghci")
+    command = bundle.language.unit_runner()
+    assert command is not None
+    assert Path(command[-1]).name == "ghci_runner.py" and Path(command[-1]).is_file()
+
+
+# A GHC that only "compiles" the modules given on the command line.
+FAKE_GHC = """#!/usr/bin/env python3
+import os, pathlib, sys
+
+if sys.argv[1:] == ["--info"]:
+    print('[("Project version","9.4.7")\\n,("GHC Dynamic","YES")\\n]')
+    sys.exit(0)
+if "-dynamic" in sys.argv and os.environ.get("FAKE_GHC_STATIC"):
+    sys.exit(1)
+for source in sys.argv[1:]:
+    if source.endswith(".hs"):
+        pathlib.Path(source[:-3] + ".hi").touch()
+        pathlib.Path(source[:-3] + ".o").touch()
+"""
+
+
+def _fake_ghc(tmp_path: Path, monkeypatch):
+    bin_directory = tmp_path / "bin"
+    bin_directory.mkdir()
+    ghc = bin_directory / "ghc"
+    ghc.write_text(FAKE_GHC)
+    ghc.chmod(0o755)
+    monkeypatch.setenv("PATH", str(bin_directory), prepend=os.pathsep)
+    ghc_info.cache_clear()
+
+
+def test_haskell_compilation_uses_compiled_harness(
+    tmp_path: Path, monkeypatch, pytestconfig
+):
+    _fake_ghc(tmp_path, monkeypatch)
+    cache = tmp_path / "cache"
+    conf = configuration(
+        pytestconfig, "", "haskell", tmp_path, options={"ghc_cache": str(cache)}
+    )
+    bundle = create_bundle(conf, sys.stdout, Suite())
+    command, _ = bundle.language.compilation(["Submission.hs", "Context.hs"])
+    harness = next(cache.glob("haskell-9.4.7-*"))
+    assert (harness / "Values.o").is_file()
+    assert (harness / "EvaluationUtils.hi").is_file()
+    assert command[:3] == ["ghc", "--make", "-j"]
+    assert "-dynamic" in command
+    assert command.index(f"-i{harness}") < command.index("-i.")
+
+    # The harness is shared by the next compilation.
+    bundle.language.compilation(["Submission.hs", "Context.hs"])
+    assert len(list(cache.iterdir())) == 1
+    ghc_info.cache_clear()
+
+
+def test_haskell_compilation_links_statically_without_dynamic_libraries(
+    tmp_path: Path, monkeypatch, pytestconfig
+):
+    _fake_ghc(tmp_path, monkeypatch)
+    monkeypatch.setenv("FAKE_GHC_STATIC", "1")
+    cache = tmp_path / "cache"
+    conf = configuration(
+        pytestconfig, "", "haskell", tmp_path, options={"ghc_cache": str(cache)}
+    )
+    bundle = create_bundle(conf, sys.stdout, Suite())
+    command, _ = bundle.language.compilation(["Submission.hs", "Context.hs"])
+    harness = next(cache.glob("haskell-9.4.7-*"))
+    assert "-dynamic" not in command
+    assert f"-i{harness}" in command
+    ghc_info.cache_clear()
+
+
+def test_haskell_compilation_links_statically_without_cache(
+    tmp_path: Path, monkeypatch, pytestconfig
+):
+    _fake_ghc(tmp_path, monkeypatch)
+    conf = configuration(pytestconfig, "", "haskell", tmp_path)
+    bundle = create_bundle(conf, sys.stdout, Suite())
+    command, _ = bundle.language.compilation(["Submission.hs", "Context.hs"])
+    # Without a compiled harness, it is not known if the libraries support it.
+    assert "-dynamic" not in command
+    assert not any(option.startswith("-i") for option in command)
+    ghc_info.cache_clear()
+
+
+def test_c_compilation_uses_compiled_harness(tmp_path: Path, pytestconfig):
+    cache = tmp_path / "cache"
+    for run in ("first", "second"):
+        workdir = tmp_path / run
+        workdir.mkdir()
+        conf = configuration(
+            pytestconfig,
+            "echo",
+            "c",
+            workdir,
+            "two.tson",
+            "correct",
+            {"gcc_cache": str(cache)},
+        )
+        result = execute_config(conf)
+        updates = assert_valid_output(result, pytestconfig)
+        assert updates.find_status_enum() == ["correct"] * 2
+    # Both judgements use the same harness.
+    (harness,) = cache.iterdir()
+    assert (harness / "values.o").is_file()
+    assert (harness / "evaluation_result.o").is_file()